@@ -37,14 +37,22 @@ class AccountClosingBalance(Document):
 	pass
 
 
-def make_closing_entries(closing_entries, voucher_name, company, closing_date):
+def make_closing_entries(closing_entries, voucher_name, company, closing_date, accounts=None):
+	"""
+	Insert the closing balances of the voucher, the previous voucher's balances carried forward.
+	With `accounts`, a list of account names, only the balances of those accounts.
+	Returns the number of closing balances inserted.
+	"""
 	accounting_dimensions = get_accounting_dimensions()
 
-	previous_closing_entries = get_previous_closing_entries(company, closing_date, accounting_dimensions)
+	previous_closing_entries = get_previous_closing_entries(
+		company, closing_date, accounting_dimensions, accounts=accounts
+	)
 	combined_entries = closing_entries + previous_closing_entries
 
 	merged_entries = aggregate_with_last_account_closing_balance(combined_entries, accounting_dimensions)
 
+	entries = []
 	for _key, value in merged_entries.items():
 		cle = frappe.new_doc("Account Closing Balance")
 		cle.update(value)
@@ -55,9 +63,21 @@ def make_closing_entries(closing_entries, voucher_name, company, closing_date):
 				"closing_date": closing_date,
 			}
 		)
-		cle.flags.ignore_permissions = True
-		cle.flags.ignore_links = True
-		cle.submit()
+		cle.docstatus = 1
+		cle.set_new_name()
+		cle.set_user_and_timestamp()
+		entries.append(cle)
+
+	if not entries:
+		return 0
+
+	values = [cle.get_valid_dict(convert_dates_to_str=True) for cle in entries]
+	fields = list(values[0])
+	frappe.db.bulk_insert(
+		"Account Closing Balance", fields, [[d.get(field) for field in fields] for d in values]
+	)
+
+	return len(entries)
 
 
 def aggregate_with_last_account_closing_balance(entries, accounting_dimensions):
@@ -109,7 +129,7 @@ def generate_key(entry, accounting_dimensions):
 	return tuple(key), key_values
 
 
-def get_previous_closing_entries(company, closing_date, accounting_dimensions):
+def get_previous_closing_entries(company, closing_date, accounting_dimensions, accounts=None):
 	entries = []
 	last_period_closing_voucher = frappe.db.get_all(
 		"Period Closing Voucher",
@@ -141,6 +161,9 @@ def get_previous_closing_entries(company, closing_date, accounting_dimensions):
 		query = query.where(
 			account_closing_balance.period_closing_voucher == last_period_closing_voucher[0].name
 		)
+		if accounts:
+			query = query.where(account_closing_balance.account.isin(accounts))
+
 		entries = query.run(as_dict=1)
 
 	return entries
@@ -6,6 +6,8 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 
+from erpnext.accounts.posting_periods import clear_period_index, get_closed_accounting_period
+
 
 class OverlapError(frappe.ValidationError):
 	pass
@@ -39,6 +41,12 @@ class AccountingPeriod(Document):
 	def before_insert(self):
 		self.bootstrap_doctypes_for_closing()
 
+	def on_update(self):
+		clear_period_index()
+
+	def on_trash(self):
+		clear_period_index()
+
 	def autoname(self):
 		company_abbr = frappe.get_cached_value("Company", self.company, "abbr")
 		self.name = " - ".join([self.period_name, company_abbr])
@@ -104,27 +112,12 @@ def validate_accounting_period_on_doc_save(doc, method=None):
 	else:
 		date = doc.posting_date
 
-	ap = frappe.qb.DocType("Accounting Period")
-	cd = frappe.qb.DocType("Closed Document")
-
-	accounting_period = (
-		frappe.qb.from_(ap)
-		.from_(cd)
-		.select(ap.name)
-		.where(
-			(ap.name == cd.parent)
-			& (ap.company == doc.company)
-			& (cd.closed == 1)
-			& (cd.document_type == doc.doctype)
-			& (date >= ap.start_date)
-			& (date <= ap.end_date)
-		)
-	).run(as_dict=1)
+	accounting_period = get_closed_accounting_period(doc.company, date, doc.doctype)
 
 	if accounting_period:
 		frappe.throw(
 			_("You cannot create a {0} within the closed Accounting Period {1}").format(
-				doc.doctype, frappe.bold(accounting_period[0]["name"])
+				doc.doctype, frappe.bold(accounting_period)
 			),
 			ClosedAccountingPeriod,
 		)
@@ -37,6 +37,18 @@ class TestAccountingPeriod(unittest.TestCase):
 		doc = create_sales_invoice(do_not_save=1, cost_center="_Test Company - _TC", warehouse="Stores - _TC")
 		self.assertRaises(ClosedAccountingPeriod, doc.save)
 
+	def test_reopened_accounting_period(self):
+		ap1 = create_accounting_period(period_name="Test Accounting Period 3")
+		ap1.save()
+
+		doc = create_sales_invoice(do_not_save=1, cost_center="_Test Company - _TC", warehouse="Stores - _TC")
+		self.assertRaises(ClosedAccountingPeriod, doc.save)
+
+		# closed periods are looked up from a cached index, which is cleared on save
+		ap1.closed_documents[0].closed = 0
+		ap1.save()
+		doc.save()
+
 	def tearDown(self):
 		for d in frappe.get_all("Accounting Period"):
 			frappe.delete_doc("Accounting Period", d.name)
@@ -33,10 +33,13 @@ class AccountsSettings(Document):
 		book_deferred_entries_based_on: DF.Literal["Days", "Months"]
 		book_deferred_entries_via_journal_entry: DF.Check
 		book_tax_discount_loss: DF.Check
+		bulk_gl_posting: DF.Check
+		bulk_gl_posting_threshold: DF.Int
 		calculate_depr_using_total_days: DF.Check
 		check_supplier_invoice_uniqueness: DF.Check
 		create_pr_in_draft_status: DF.Check
 		credit_controller: DF.Link | None
+		daily_account_balances_built: DF.Check
 		delete_linked_ledger_entries: DF.Check
 		determine_address_tax_category_from: DF.Literal["Billing Address", "Shipping Address"]
 		enable_common_party_accounting: DF.Check
@@ -46,8 +49,14 @@ class AccountsSettings(Document):
 		frozen_accounts_modifier: DF.Link | None
 		general_ledger_remarks_length: DF.Int
 		ignore_account_closing_balance: DF.Check
+		maintain_daily_account_balances: DF.Check
+		maintain_monthly_account_balances: DF.Check
+		maintain_voucher_outstandings: DF.Check
 		make_payment_via_journal_entry: DF.Check
+		match_pricing_rules_in_memory: DF.Check
 		merge_similar_account_heads: DF.Check
+		monthly_account_balances_built: DF.Check
+		monthly_account_balances_upto: DF.Date | None
 		over_billing_allowance: DF.Currency
 		post_change_gl_entries: DF.Check
 		receivable_payable_remarks_length: DF.Int
@@ -61,6 +70,7 @@ class AccountsSettings(Document):
 		submit_journal_entries: DF.Check
 		unlink_advance_payment_on_cancelation_of_order: DF.Check
 		unlink_payment_on_cancellation_of_invoice: DF.Check
+		voucher_outstandings_built: DF.Check
 	# end: auto-generated types
 
 	def validate(self):
@@ -87,6 +97,15 @@ class AccountsSettings(Document):
 		if old_doc.acc_frozen_upto != self.acc_frozen_upto:
 			self.validate_pending_reposts()
 
+		if old_doc.maintain_daily_account_balances != self.maintain_daily_account_balances:
+			self.rebuild_daily_account_balances()
+
+		if old_doc.maintain_monthly_account_balances != self.maintain_monthly_account_balances:
+			self.rebuild_monthly_account_balances()
+
+		if old_doc.maintain_voucher_outstandings != self.maintain_voucher_outstandings:
+			self.rebuild_voucher_outstandings()
+
 		if clear_cache:
 			frappe.clear_cache()
 
@@ -111,6 +130,30 @@ class AccountsSettings(Document):
 				validate_fields_for_doctype=False,
 			)
 
+	def rebuild_daily_account_balances(self):
+		self.daily_account_balances_built = 0
+		frappe.enqueue(
+			"erpnext.accounts.doctype.daily_account_balance.daily_account_balance.rebuild_daily_account_balances",
+			queue="long",
+			enqueue_after_commit=True,
+		)
+
+	def rebuild_monthly_account_balances(self):
+		self.monthly_account_balances_built = 0
+		frappe.enqueue(
+			"erpnext.accounts.doctype.monthly_account_balance.monthly_account_balance.rebuild_monthly_account_balances",
+			queue="long",
+			enqueue_after_commit=True,
+		)
+
+	def rebuild_voucher_outstandings(self):
+		self.voucher_outstandings_built = 0
+		frappe.enqueue(
+			"erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding.rebuild_voucher_outstandings",
+			queue="long",
+			enqueue_after_commit=True,
+		)
+
 	def validate_pending_reposts(self):
 		if self.acc_frozen_upto:
 			check_pending_reposting(self.acc_frozen_upto)
@@ -0,0 +1,196 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import cint, flt, getdate
+
+from erpnext.accounts.utils import (
+	get_currency_precision,
+	get_ledger_balance_name,
+	upsert_ledger_balances,
+)
+
+BALANCE_KEY = (
+	"company",
+	"account",
+	"party_type",
+	"party",
+	"cost_center",
+	"account_currency",
+	"posting_date",
+	"is_period_closing",
+)
+AMOUNT_FIELDS = ("debit", "credit", "debit_in_account_currency", "credit_in_account_currency")
+
+
+class DailyAccountBalance(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		account: DF.Link | None
+		account_currency: DF.Link | None
+		company: DF.Link | None
+		cost_center: DF.Link | None
+		credit: DF.Currency
+		credit_in_account_currency: DF.Currency
+		debit: DF.Currency
+		debit_in_account_currency: DF.Currency
+		gl_entries: DF.Int
+		is_period_closing: DF.Check
+		party: DF.DynamicLink | None
+		party_type: DF.Link | None
+		posting_date: DF.Date | None
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Daily Account Balance", ["account", "posting_date"])
+	frappe.db.add_index("Daily Account Balance", ["party_type", "party", "posting_date"])
+
+
+def is_daily_account_balance_enabled():
+	return cint(
+		frappe.db.get_single_value("Accounts Settings", "maintain_daily_account_balances", cache=True)
+	)
+
+
+def use_daily_account_balances():
+	"""Balances are read from the GL till the daily balances are built"""
+	return is_daily_account_balance_enabled() and cint(
+		frappe.db.get_single_value("Accounts Settings", "daily_account_balances_built", cache=True)
+	)
+
+
+def update_daily_account_balances(gl_entries, sign=1):
+	"""Add (or with `sign` -1, remove) the active GL entries to the daily balances"""
+	if not gl_entries or not is_daily_account_balance_enabled():
+		return
+
+	precision = get_currency_precision()
+	balances = {}
+	for entry in gl_entries:
+		if entry.get("is_cancelled"):
+			continue
+
+		balance = balances.setdefault(
+			get_balance_key(entry), dict.fromkeys((*AMOUNT_FIELDS, "gl_entries"), 0)
+		)
+		for fieldname in AMOUNT_FIELDS:
+			balance[fieldname] += sign * flt(entry.get(fieldname), precision)
+		balance["gl_entries"] += sign
+
+	upsert_ledger_balances("Daily Account Balance", BALANCE_KEY, balances)
+
+	if sign < 0:
+		frappe.db.delete(
+			"Daily Account Balance",
+			{"name": ("in", [get_ledger_balance_name(key) for key in balances]), "gl_entries": ("<=", 0)},
+		)
+
+
+def get_balance_key(entry):
+	return (
+		entry.get("company"),
+		entry.get("account"),
+		entry.get("party_type") or None,
+		entry.get("party") or None,
+		entry.get("cost_center") or None,
+		entry.get("account_currency") or None,
+		getdate(entry.get("posting_date")),
+		cint(entry.get("is_period_closing") or entry.get("voucher_type") == "Period Closing Voucher"),
+	)
+
+
+def get_balances_from_gl(company=None):
+	precision = get_currency_precision()
+	condition = "and company = %(company)s" if company else ""
+
+	gl_balances = frappe.db.sql(
+		f"""
+		select
+			company, account, party_type, party, cost_center, account_currency, posting_date,
+			case when voucher_type = 'Period Closing Voucher' then 1 else 0 end as is_period_closing,
+			sum(round(debit, %(precision)s)) as debit,
+			sum(round(credit, %(precision)s)) as credit,
+			sum(round(debit_in_account_currency, %(precision)s)) as debit_in_account_currency,
+			sum(round(credit_in_account_currency, %(precision)s)) as credit_in_account_currency,
+			count(*) as gl_entries
+		from `tabGL Entry`
+		where is_cancelled = 0 {condition}
+		group by
+			company, account, party_type, party, cost_center, account_currency, posting_date, is_period_closing
+		""",
+		{"company": company, "precision": precision},
+		as_dict=True,
+	)
+
+	# null and empty values are grouped separately by the database
+	balances = {}
+	for row in gl_balances:
+		balance = balances.setdefault(get_balance_key(row), dict.fromkeys((*AMOUNT_FIELDS, "gl_entries"), 0))
+		for fieldname in (*AMOUNT_FIELDS, "gl_entries"):
+			balance[fieldname] += flt(row[fieldname])
+
+	return balances
+
+
+def rebuild_daily_account_balances():
+	"""Rebuild the daily balances from scratch, balances are read from the GL till this is done"""
+	frappe.db.set_single_value("Accounts Settings", "daily_account_balances_built", 0)
+	frappe.db.delete("Daily Account Balance")
+
+	if not is_daily_account_balance_enabled():
+		return
+
+	upsert_ledger_balances("Daily Account Balance", BALANCE_KEY, get_balances_from_gl())
+	frappe.db.set_single_value("Accounts Settings", "daily_account_balances_built", 1)
+
+
+def get_daily_account_balance_differences(company=None):
+	"""Returns the daily balances which do not match the GL"""
+	precision = get_currency_precision()
+	expected_balances = get_balances_from_gl(company)
+	balances = {
+		get_balance_key(d): d
+		for d in frappe.get_all(
+			"Daily Account Balance",
+			filters={"company": company} if company else {},
+			fields=[*BALANCE_KEY, *AMOUNT_FIELDS, "gl_entries"],
+		)
+	}
+
+	differences = []
+	for key in set(expected_balances) | set(balances):
+		expected, actual = expected_balances.get(key, {}), balances.get(key, {})
+		if any(
+			flt(expected.get(fieldname), precision) != flt(actual.get(fieldname), precision)
+			for fieldname in (*AMOUNT_FIELDS, "gl_entries")
+		):
+			differences.append(
+				frappe._dict(dict(zip(BALANCE_KEY, key, strict=True)), expected=expected, actual=actual)
+			)
+
+	return differences
+
+
+def check_daily_account_balances():
+	"""Rebuild the daily balances if they have drifted from the GL"""
+	if not use_daily_account_balances():
+		return
+
+	differences = get_daily_account_balance_differences()
+	if differences:
+		frappe.log_error(
+			title=_("Daily Account Balances do not match the General Ledger"),
+			message=frappe.as_json(differences[:100]),
+		)
+		rebuild_daily_account_balances()
@@ -0,0 +1,45 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+from frappe.utils import today
+
+from erpnext.accounts.doctype.daily_account_balance.daily_account_balance import (
+	get_daily_account_balance_differences,
+	rebuild_daily_account_balances,
+)
+from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.utils import get_balance_on
+
+
+class TestDailyAccountBalance(FrappeTestCase):
+	@change_settings("Accounts Settings", {"maintain_daily_account_balances": 1})
+	def test_balances_on_submit_and_cancel(self):
+		bank_account = "_Test Bank - _TC"
+		expense_account = "_Test Account Cost for Goods Sold - _TC"
+
+		rebuild_daily_account_balances()
+		self.assertTrue(frappe.db.get_single_value("Accounts Settings", "daily_account_balances_built"))
+		self.assertFalse(get_daily_account_balance_differences("_Test Company"))
+
+		opening_balance = get_balance_on(bank_account, company="_Test Company")
+		je = make_journal_entry(bank_account, expense_account, 100, "_Test Cost Center - _TC", submit=True)
+
+		self.assertEqual(get_balance_on(bank_account, company="_Test Company"), opening_balance + 100)
+		self.assertTrue(
+			frappe.db.exists(
+				"Daily Account Balance",
+				{"account": expense_account, "posting_date": today(), "credit": (">=", 100)},
+			)
+		)
+		self.assertFalse(get_daily_account_balance_differences("_Test Company"))
+
+		je.cancel()
+		self.assertEqual(get_balance_on(bank_account, company="_Test Company"), opening_balance)
+		self.assertFalse(get_daily_account_balance_differences("_Test Company"))
+
+		# balances are read from the GL till they are rebuilt
+		frappe.db.set_single_value("Accounts Settings", "daily_account_balances_built", 0)
+		frappe.db.delete("Daily Account Balance")
+		self.assertEqual(get_balance_on(bank_account, company="_Test Company"), opening_balance)
@@ -8,6 +8,8 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.utils import add_days, add_years, cstr, getdate
 
+from erpnext.accounts.posting_periods import clear_period_index
+
 
 class FiscalYear(Document):
 	# begin: auto-generated types
@@ -68,10 +70,10 @@ class FiscalYear(Document):
 
 	def on_update(self):
 		check_duplicate_fiscal_year(self)
-		frappe.cache().delete_value("fiscal_years")
+		clear_period_index()
 
 	def on_trash(self):
-		frappe.cache().delete_value("fiscal_years")
+		clear_period_index()
 
 	def validate_overlap(self):
 		existing_fiscal_years = frappe.db.sql(
@@ -217,15 +217,18 @@ class GLEntry(Document):
 				)
 			)
 
-	def validate_account_details(self, adv_adj):
+	def validate_account_details(self, adv_adj, account_details=None):
 		"""Account must be ledger, active and not freezed"""
 
-		ret = frappe.db.sql(
-			"""select is_group, docstatus, company
+		ret = (
+			account_details
+			or frappe.db.sql(
+				"""select is_group, docstatus, company
 			from tabAccount where name=%s""",
-			self.account,
-			as_dict=1,
-		)[0]
+				self.account,
+				as_dict=1,
+			)[0]
+		)
 
 		if ret.is_group == 1:
 			frappe.throw(
@@ -297,6 +300,100 @@ class GLEntry(Document):
 		frappe.throw(msg)
 
 
+def make_gl_entries_in_bulk(gl_map, adv_adj, update_outstanding, from_repost=False):
+	"""
+	Insert the entries of a voucher with multi-row inserts.
+
+	Runs the same validations as `insert` (links and mandatory fields), `GLEntry.validate` and
+	`GLEntry.on_update`, but the ones depending on the account or the against voucher are run once
+	per voucher.
+	Document hooks of GL Entry are not run for these entries.
+	"""
+	entries = []
+	for args in gl_map:
+		gle = frappe.new_doc("GL Entry")
+		gle.update(args)
+		gle.flags.from_repost = from_repost
+		gle.flags.adv_adj = adv_adj
+		gle.flags.update_outstanding = update_outstanding or "Yes"
+		gle.docstatus = 1
+		# as set by `insert` for a submitted entry, links are validated depending on it
+		gle._action = "submit"
+		gle.set_new_name()
+		gle.set_user_and_timestamp()
+		gle._validate_links()
+		gle.validate()
+		gle._validate_mandatory()
+		entries.append(gle)
+
+	validate_entries = not from_repost and gl_map[0]["voucher_type"] != "Period Closing Voucher"
+	if validate_entries:
+		account_details = get_account_details({gle.account for gle in entries})
+		for gle in entries:
+			if not account_details.get(gle.account):
+				frappe.throw(
+					_("{0} {1}: Account {2} does not exist").format(
+						gle.voucher_type, gle.voucher_no, gle.account
+					),
+					frappe.LinkValidationError,
+				)
+
+			gle.validate_account_details(adv_adj, account_details.get(gle.account))
+			gle.validate_dimensions_for_pl_and_bs()
+
+		for account in account_details:
+			validate_frozen_account(account, adv_adj)
+
+	values = [gle.get_valid_dict(convert_dates_to_str=True) for gle in entries]
+	fields = list(values[0])
+	frappe.db.bulk_insert("GL Entry", fields, [[d.get(field) for field in fields] for d in values])
+
+	if validate_entries:
+		for account in account_details:
+			validate_balance_type(account, adv_adj)
+
+		update_outstanding_amounts(entries)
+
+	return entries
+
+
+def get_account_details(accounts):
+	return {
+		d.name: d
+		for d in frappe.get_all(
+			"Account",
+			filters={"name": ("in", list(accounts))},
+			fields=["name", "is_group", "docstatus", "company"],
+		)
+	}
+
+
+def update_outstanding_amounts(entries):
+	"""Update the outstanding amount of every against voucher once, same conditions as `GLEntry.on_update`"""
+	if (
+		entries[0].voucher_type == "Journal Entry"
+		and frappe.get_cached_value("Journal Entry", entries[0].voucher_no, "voucher_type")
+		== "Exchange Gain Or Loss"
+	) or frappe.flags.is_reverse_depr_entry:
+		return
+
+	against_vouchers = set()
+	for gle in entries:
+		if (
+			gle.against_voucher_type in ["Journal Entry", "Sales Invoice", "Purchase Invoice", "Fees"]
+			and gle.against_voucher
+			and gle.flags.update_outstanding == "Yes"
+			and frappe.get_cached_value("Account", gle.account, "account_type")
+			not in ["Receivable", "Payable"]
+		):
+			against_vouchers.add(
+				(gle.account, gle.party_type, gle.party, gle.against_voucher_type, gle.against_voucher)
+			)
+
+	for args in against_vouchers:
+		update_outstanding_amt(*args)
+
+
 def validate_balance_type(account, adv_adj=False):
 	if not adv_adj and account:
 		balance_must_be = frappe.get_cached_value("Account", account, "balance_must_be")
@@ -6,9 +6,11 @@ import unittest
 
 import frappe
 from frappe.model.naming import parse_naming_series
+from frappe.tests.utils import change_settings
 
-from erpnext.accounts.doctype.gl_entry.gl_entry import rename_gle_sle_docs
+from erpnext.accounts.doctype.gl_entry.gl_entry import make_gl_entries_in_bulk, rename_gle_sle_docs
 from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
 
 
 class TestGLEntry(unittest.TestCase):
@@ -79,3 +81,56 @@ class TestGLEntry(unittest.TestCase):
 			"SELECT current from tabSeries where name = %s", naming_series
 		)[0][0]
 		self.assertEqual(old_naming_series_current_value + 2, new_naming_series_current_value)
+
+	@change_settings("Accounts Settings", {"bulk_gl_posting": 1, "bulk_gl_posting_threshold": 2})
+	def test_bulk_gl_posting(self):
+		si = create_sales_invoice(qty=5, rate=100)
+
+		je = make_journal_entry("_Test Bank - _TC", "Debtors - _TC", 300, submit=False)
+		je.accounts[1].update(
+			{
+				"party_type": "Customer",
+				"party": si.customer,
+				"reference_type": "Sales Invoice",
+				"reference_name": si.name,
+			}
+		)
+		je.submit()
+
+		gl_entries = frappe.get_all(
+			"GL Entry",
+			fields=["account", "debit", "credit", "against_voucher", "to_rename"],
+			filters={"voucher_type": "Journal Entry", "voucher_no": je.name, "is_cancelled": 0},
+			order_by="account",
+		)
+		self.assertEqual(len(gl_entries), 2)
+		self.assertEqual(gl_entries[0].account, "_Test Bank - _TC")
+		self.assertEqual(gl_entries[0].debit, 300)
+		self.assertEqual(gl_entries[1].account, "Debtors - _TC")
+		self.assertEqual(gl_entries[1].credit, 300)
+		self.assertEqual(gl_entries[1].against_voucher, si.name)
+		self.assertTrue(all(entry.to_rename == 1 for entry in gl_entries))
+
+		self.assertTrue(
+			frappe.db.exists(
+				"Payment Ledger Entry",
+				{"voucher_no": je.name, "against_voucher_no": si.name, "amount": -300, "delinked": 0},
+			)
+		)
+		self.assertEqual(frappe.db.get_value("Sales Invoice", si.name, "outstanding_amount"), 200)
+
+		je.cancel()
+		self.assertEqual(frappe.db.get_value("Sales Invoice", si.name, "outstanding_amount"), 500)
+
+	def test_bulk_gl_posting_validates_links(self):
+		je = make_journal_entry(
+			"_Test Bank - _TC", "_Test Account Cost for Goods Sold - _TC", 100, "_Test Cost Center - _TC"
+		)
+
+		for fieldname, value in (
+			("cost_center", "_Test Missing Cost Center - _TC"),
+			("account", "_Test Missing Account - _TC"),
+		):
+			gl_map = je.build_gl_map()
+			gl_map[1][fieldname] = value
+			self.assertRaises(frappe.LinkValidationError, make_gl_entries_in_bulk, gl_map, False, "Yes")
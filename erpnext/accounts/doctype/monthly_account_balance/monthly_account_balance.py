@@ -0,0 +1,242 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Count, Min, Sum
+from frappe.utils import add_months, cint, flt, get_first_day, getdate, nowdate
+
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import get_accounting_dimensions
+from erpnext.accounts.utils import get_ledger_balance_name, upsert_ledger_balances
+
+AMOUNT_FIELDS = ("debit", "credit", "debit_in_account_currency", "credit_in_account_currency")
+
+
+class MonthlyAccountBalance(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		account: DF.Link | None
+		account_currency: DF.Link | None
+		company: DF.Link | None
+		cost_center: DF.Link | None
+		credit: DF.Currency
+		credit_in_account_currency: DF.Currency
+		debit: DF.Currency
+		debit_in_account_currency: DF.Currency
+		finance_book: DF.Link | None
+		fiscal_year: DF.Link | None
+		gl_entries: DF.Int
+		is_opening: DF.Literal["No", "Yes"]
+		is_period_closing_voucher_entry: DF.Check
+		period_start_date: DF.Date | None
+		project: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Monthly Account Balance", ["company", "period_start_date"])
+	frappe.db.add_index("Monthly Account Balance", ["account", "period_start_date"])
+
+
+def is_monthly_account_balance_enabled():
+	return cint(
+		frappe.db.get_single_value("Accounts Settings", "maintain_monthly_account_balances", cache=True)
+	)
+
+
+def get_monthly_account_balances_upto():
+	"""
+	Returns the first day of the open period, the entries posted before it are aggregated into the
+	monthly balances. None if the balances are not maintained.
+	"""
+	if not is_monthly_account_balance_enabled():
+		return
+
+	upto = frappe.db.get_single_value("Accounts Settings", "monthly_account_balances_upto", cache=True)
+	return getdate(upto) if upto else None
+
+
+def use_monthly_account_balances():
+	"""Reports read the GL till the monthly balances are built"""
+	return get_monthly_account_balances_upto() and cint(
+		frappe.db.get_single_value("Accounts Settings", "monthly_account_balances_built", cache=True)
+	)
+
+
+def get_balance_key_fields():
+	return (
+		"company",
+		"account",
+		"account_currency",
+		"cost_center",
+		"project",
+		"finance_book",
+		*get_accounting_dimensions(),
+		"period_start_date",
+		"fiscal_year",
+		"is_opening",
+		"is_period_closing_voucher_entry",
+	)
+
+
+def update_monthly_account_balances(gl_entries, sign=1):
+	"""
+	Add (or with `sign` -1, remove) the active GL entries of the closed months to the monthly balances,
+	the entries of the open period are read from the GL by the reports
+	"""
+	upto = get_monthly_account_balances_upto()
+	if not gl_entries or not upto:
+		return
+
+	key_fields = get_balance_key_fields()
+	balances = {}
+	for entry in gl_entries:
+		if entry.get("is_cancelled") or getdate(entry.get("posting_date")) >= upto:
+			continue
+
+		add_to_balances(balances, key_fields, entry, sign)
+
+	upsert_ledger_balances("Monthly Account Balance", key_fields, balances)
+
+	if sign < 0 and balances:
+		frappe.db.delete(
+			"Monthly Account Balance",
+			{"name": ("in", [get_ledger_balance_name(key) for key in balances]), "gl_entries": ("<=", 0)},
+		)
+
+
+def add_to_balances(balances, key_fields, entry, sign=1):
+	balance = balances.setdefault(
+		get_balance_key(key_fields, entry), dict.fromkeys((*AMOUNT_FIELDS, "gl_entries"), 0)
+	)
+	for fieldname in AMOUNT_FIELDS:
+		balance[fieldname] += sign * flt(entry.get(fieldname))
+	balance["gl_entries"] += sign * cint(entry.get("gl_entries") or 1)
+
+
+def get_balance_key(key_fields, entry):
+	key = []
+	for fieldname in key_fields:
+		if fieldname == "period_start_date":
+			value = get_first_day(entry.get("period_start_date") or entry.get("posting_date"))
+		elif fieldname == "is_opening":
+			value = entry.get("is_opening") or "No"
+		elif fieldname == "is_period_closing_voucher_entry":
+			value = cint(
+				entry.get("is_period_closing_voucher_entry")
+				or entry.get("voucher_type") == "Period Closing Voucher"
+			)
+		else:
+			# null and empty values are grouped separately by the database
+			value = entry.get(fieldname) or None
+
+		key.append(value)
+
+	return tuple(key)
+
+
+def get_balances_from_gl(from_date, to_date, key_fields=None):
+	"""Returns the monthly balances of the GL entries posted from `from_date` till before `to_date`"""
+	key_fields = key_fields or get_balance_key_fields()
+	gle = frappe.qb.DocType("GL Entry")
+
+	group_by_fields = [
+		gle[fieldname]
+		for fieldname in key_fields
+		if fieldname not in ("period_start_date", "is_period_closing_voucher_entry")
+	]
+	group_by_fields += [gle.posting_date, gle.voucher_type]
+
+	gl_balances = (
+		frappe.qb.from_(gle)
+		.select(
+			*group_by_fields,
+			*[Sum(gle[fieldname]).as_(fieldname) for fieldname in AMOUNT_FIELDS],
+			Count("*").as_("gl_entries"),
+		)
+		.where(
+			(gle.is_cancelled == 0)
+			& (gle.posting_date >= getdate(from_date))
+			& (gle.posting_date < getdate(to_date))
+		)
+		.groupby(*group_by_fields)
+	).run(as_dict=True)
+
+	balances = {}
+	for row in gl_balances:
+		add_to_balances(balances, key_fields, row)
+
+	return balances
+
+
+def build_monthly_account_balances(from_date, to_date):
+	"""Aggregate the GL entries of the months from `from_date` till before `to_date`, one month at a time"""
+	key_fields = get_balance_key_fields()
+	period_start_date = get_first_day(from_date)
+
+	while period_start_date < getdate(to_date):
+		period_end_date = add_months(period_start_date, 1)
+
+		frappe.db.delete("Monthly Account Balance", {"period_start_date": period_start_date})
+		upsert_ledger_balances(
+			"Monthly Account Balance",
+			key_fields,
+			get_balances_from_gl(period_start_date, period_end_date, key_fields),
+		)
+		frappe.db.commit()
+
+		period_start_date = period_end_date
+
+
+def rebuild_monthly_account_balances():
+	"""Rebuild the monthly balances from scratch, reports read the GL till this is done"""
+	frappe.db.set_single_value("Accounts Settings", "monthly_account_balances_built", 0)
+
+	if not is_monthly_account_balance_enabled():
+		frappe.db.set_single_value("Accounts Settings", "monthly_account_balances_upto", None)
+		frappe.db.delete("Monthly Account Balance")
+		return
+
+	# entries posted from now on are added to the balances of the closed months as they are rebuilt
+	upto = get_first_day(nowdate())
+	frappe.db.set_single_value("Accounts Settings", "monthly_account_balances_upto", upto)
+	frappe.db.delete("Monthly Account Balance")
+	frappe.db.commit()
+
+	gle = frappe.qb.DocType("GL Entry")
+	first_posting_date = (
+		frappe.qb.from_(gle).select(Min(gle.posting_date)).where(gle.is_cancelled == 0)
+	).run()[0][0]
+	if first_posting_date:
+		build_monthly_account_balances(first_posting_date, upto)
+
+	frappe.db.set_single_value("Accounts Settings", "monthly_account_balances_built", 1)
+
+
+def close_monthly_account_balances():
+	"""
+	Aggregate the months which have ended since the last run. The last closed month is aggregated
+	again to pick up the entries which were being posted while it was closed.
+	"""
+	upto = get_monthly_account_balances_upto()
+	if not upto or not use_monthly_account_balances():
+		return
+
+	# reports read the GL while the months are aggregated
+	open_period_start_date = get_first_day(nowdate())
+	frappe.db.set_single_value(
+		"Accounts Settings",
+		{"monthly_account_balances_upto": open_period_start_date, "monthly_account_balances_built": 0},
+	)
+	frappe.db.commit()
+
+	build_monthly_account_balances(min(upto, add_months(open_period_start_date, -1)), open_period_start_date)
+	frappe.db.set_single_value("Accounts Settings", "monthly_account_balances_built", 1)
@@ -0,0 +1,92 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, add_months, get_first_day, get_last_day, getdate, today
+
+from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.report.financial_statements import get_monthly_balances_upto_for_report
+
+
+class TestMonthlyAccountBalance(FrappeTestCase):
+	def setUp(self):
+		self.open_period_start_date = get_first_day(today())
+		frappe.db.set_single_value(
+			"Accounts Settings",
+			{
+				"maintain_monthly_account_balances": 1,
+				"monthly_account_balances_upto": self.open_period_start_date,
+				"monthly_account_balances_built": 1,
+			},
+		)
+		frappe.db.delete("Monthly Account Balance")
+
+	def test_balances_on_submit_and_cancel(self):
+		bank_account = "_Test Bank - _TC"
+		expense_account = "_Test Account Cost for Goods Sold - _TC"
+		posting_date = add_days(self.open_period_start_date, -1)
+
+		je = make_journal_entry(
+			bank_account,
+			expense_account,
+			100,
+			posting_date=posting_date,
+			project="_Test Project",
+			submit=True,
+		)
+		balance = frappe.db.get_value(
+			"Monthly Account Balance",
+			{"account": expense_account, "project": "_Test Project"},
+			["period_start_date", "credit", "gl_entries"],
+			as_dict=True,
+		)
+		self.assertEqual(balance.period_start_date, get_first_day(posting_date))
+		self.assertEqual(balance.credit, 100)
+		self.assertEqual(balance.gl_entries, 1)
+
+		# entries of the open period are read from the GL
+		make_journal_entry(
+			bank_account, expense_account, 100, posting_date=today(), project="_Test Project", submit=True
+		)
+		self.assertEqual(
+			frappe.db.count(
+				"Monthly Account Balance", {"account": expense_account, "project": "_Test Project"}
+			),
+			1,
+		)
+
+		je.cancel()
+		self.assertFalse(
+			frappe.db.exists(
+				"Monthly Account Balance", {"account": expense_account, "project": "_Test Project"}
+			)
+		)
+
+	def test_monthly_balances_upto_for_report(self):
+		year_start_date = add_months(self.open_period_start_date, -12)
+		period_list = [
+			frappe._dict(
+				from_date=add_months(year_start_date, i),
+				to_date=get_last_day(add_months(year_start_date, i)),
+				year_start_date=year_start_date,
+			)
+			for i in range(13)
+		]
+
+		self.assertEqual(
+			get_monthly_balances_upto_for_report(year_start_date, period_list[-1].to_date, period_list),
+			self.open_period_start_date,
+		)
+
+		# reports ending in a closed month read all their entries from the balances
+		self.assertEqual(
+			get_monthly_balances_upto_for_report(year_start_date, period_list[5].to_date, period_list[:6]),
+			getdate(period_list[6].from_date),
+		)
+
+		# periods which do not start on a month can only be read from the GL
+		period_list[1].from_date = add_days(period_list[1].from_date, 1)
+		self.assertIsNone(
+			get_monthly_balances_upto_for_report(year_start_date, period_list[-1].to_date, period_list)
+		)
@@ -16,7 +16,8 @@ from erpnext.accounts.doctype.gl_entry.gl_entry import (
 	validate_balance_type,
 	validate_frozen_account,
 )
-from erpnext.accounts.utils import update_voucher_outstanding
+from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import refresh_voucher_outstandings
+from erpnext.accounts.utils import update_voucher_outstanding, update_voucher_outstandings
 from erpnext.exceptions import InvalidAccountDimensionError, MandatoryAccountDimensionError
 
 
@@ -50,25 +51,33 @@ class PaymentLedgerEntry(Document):
 		voucher_type: DF.Link | None
 	# end: auto-generated types
 
-	def validate_account(self):
-		valid_account = frappe.db.get_list(
-			"Account",
-			"name",
-			filters={"name": self.account, "account_type": self.account_type, "company": self.company},
-			ignore_permissions=True,
-		)
+	def validate_account(self, account_details=None):
+		if account_details is not None:
+			valid_account = (
+				account_details.account_type == self.account_type and account_details.company == self.company
+			)
+		else:
+			valid_account = frappe.db.get_list(
+				"Account",
+				"name",
+				filters={"name": self.account, "account_type": self.account_type, "company": self.company},
+				ignore_permissions=True,
+			)
 		if not valid_account:
 			frappe.throw(_("{0} account is not of type {1}").format(self.account, self.account_type))
 
-	def validate_account_details(self):
+	def validate_account_details(self, account_details=None):
 		"""Account must be ledger, active and not freezed"""
 
-		ret = frappe.db.sql(
-			"""select is_group, docstatus, company
+		ret = (
+			account_details
+			or frappe.db.sql(
+				"""select is_group, docstatus, company
 			from tabAccount where name=%s""",
-			self.account,
-			as_dict=1,
-		)[0]
+				self.account,
+				as_dict=1,
+			)[0]
+		)
 
 		if ret.is_group == 1:
 			frappe.throw(
@@ -179,6 +188,63 @@ class PaymentLedgerEntry(Document):
 			)
 
 
+def make_payment_ledger_entries_in_bulk(ple_map, adv_adj, update_outstanding, from_repost=False):
+	"""
+	Insert the entries of a voucher with multi-row inserts, validating the accounts with a single
+	query and updating the outstanding of every against voucher once.
+	Document hooks of Payment Ledger Entry are not run for these entries.
+	"""
+	account_details = {
+		d.name: d
+		for d in frappe.get_all(
+			"Account",
+			filters={"name": ("in", list({d.account for d in ple_map}))},
+			fields=["name", "account_type", "is_group", "docstatus", "company"],
+		)
+	}
+
+	entries = []
+	for entry in ple_map:
+		ple = frappe.get_doc(entry)
+		ple.docstatus = 1
+		ple.set_new_name()
+		ple.set_user_and_timestamp()
+		ple.validate_account(account_details.get(ple.account, frappe._dict()))
+
+		if not from_repost and not ple.delinked:
+			ple.validate_account_details(account_details.get(ple.account))
+			ple.validate_dimensions_for_pl_and_bs()
+			ple.validate_allowed_dimensions()
+
+		entries.append(ple)
+
+	if not from_repost:
+		for account in account_details:
+			validate_frozen_account(account, adv_adj)
+
+	values = [ple.get_valid_dict(convert_dates_to_str=True) for ple in entries]
+	fields = list(values[0])
+	frappe.db.bulk_insert(
+		"Payment Ledger Entry", fields, [[d.get(field) for field in fields] for d in values]
+	)
+
+	if not from_repost:
+		for account in account_details:
+			validate_balance_type(account, adv_adj)
+
+	refresh_voucher_outstandings({(ple.against_voucher_type, ple.against_voucher_no) for ple in entries})
+
+	if update_outstanding != "Yes" or frappe.flags.is_reverse_depr_entry:
+		return
+
+	update_voucher_outstandings(
+		[
+			(ple.against_voucher_type, ple.against_voucher_no, ple.account, ple.party_type, ple.party)
+			for ple in entries
+		]
+	)
+
+
 def on_doctype_update():
 	frappe.db.add_index("Payment Ledger Entry", ["against_voucher_no", "against_voucher_type"])
 	frappe.db.add_index("Payment Ledger Entry", ["voucher_no", "voucher_type"])
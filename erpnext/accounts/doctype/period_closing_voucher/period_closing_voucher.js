@@ -37,5 +37,11 @@ frappe.ui.form.on("Period Closing Voucher", {
 				"fa fa-table"
 			);
 		}
+
+		if (frm.doc.docstatus === 1 && frm.doc.closing_balance_status === "Failed") {
+			frm.add_custom_button(__("Retry Closing Balances"), function () {
+				frm.call("retry_closing_balances").then(() => frm.reload_doc());
+			});
+		}
 	},
 });
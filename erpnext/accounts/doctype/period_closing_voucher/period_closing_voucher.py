@@ -5,14 +5,21 @@
 import frappe
 from frappe import _
 from frappe.query_builder.functions import Sum
-from frappe.utils import add_days, flt
+from frappe.utils import add_days, add_to_date, create_batch, flt, now_datetime
+from frappe.utils.background_jobs import is_job_enqueued
 
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 )
+from erpnext.accounts.posting_periods import clear_period_index
 from erpnext.accounts.utils import get_account_currency, get_fiscal_year, validate_fiscal_year
 from erpnext.controllers.accounts_controller import AccountsController
 
+PARTITION_DOCTYPE = "Period Closing Voucher Partition"
+# accounts per closing balance job, and the number of GL entries in the period above which jobs are used
+CLOSING_BALANCE_PARTITION_SIZE = 100
+CLOSING_BALANCE_BACKGROUND_THRESHOLD = 100000
+
 
 class PeriodClosingVoucher(AccountsController):
 	# begin: auto-generated types
@@ -23,8 +30,14 @@ class PeriodClosingVoucher(AccountsController):
 	if TYPE_CHECKING:
 		from frappe.types import DF
 
+		from erpnext.accounts.doctype.period_closing_voucher_partition.period_closing_voucher_partition import (
+			PeriodClosingVoucherPartition,
+		)
+
 		amended_from: DF.Link | None
 		closing_account_head: DF.Link
+		closing_balance_partitions: DF.Table[PeriodClosingVoucherPartition]
+		closing_balance_status: DF.Literal["", "In Progress", "Completed", "Failed"]
 		company: DF.Link
 		error_message: DF.Text | None
 		fiscal_year: DF.Link
@@ -40,6 +53,7 @@ class PeriodClosingVoucher(AccountsController):
 		self.validate_posting_date()
 
 	def on_submit(self):
+		clear_period_index()
 		self.db_set("gle_processing_status", "In Progress")
 		get_opening_entries = False
 
@@ -52,6 +66,7 @@ class PeriodClosingVoucher(AccountsController):
 
 	def on_cancel(self):
 		self.validate_future_closing_vouchers()
+		clear_period_index()
 		self.db_set("gle_processing_status", "In Progress")
 		self.ignore_linked_doctypes = ("GL Entry", "Stock Ledger Entry", "Payment Ledger Entry")
 		gle_count = frappe.db.count(
@@ -163,8 +178,7 @@ class PeriodClosingVoucher(AccountsController):
 
 	def make_gl_entries(self, get_opening_entries=False):
 		gl_entries = self.get_gl_entries()
-		closing_entries = self.get_grouped_gl_entries(get_opening_entries=get_opening_entries)
-		if len(gl_entries + closing_entries) > 3000:
+		if len(gl_entries) > 3000:
 			frappe.enqueue(
 				process_gl_entries,
 				gl_entries=gl_entries,
@@ -172,28 +186,95 @@ class PeriodClosingVoucher(AccountsController):
 				timeout=3000,
 			)
 
-			frappe.enqueue(
-				process_closing_entries,
-				gl_entries=gl_entries,
-				closing_entries=closing_entries,
-				voucher_name=self.name,
-				company=self.company,
-				closing_date=self.posting_date,
-				timeout=3000,
-			)
-
 			frappe.msgprint(
 				_("The GL Entries will be processed in the background, it can take a few minutes."),
 				alert=True,
 			)
 		else:
 			process_gl_entries(gl_entries, self.name)
-			process_closing_entries(gl_entries, closing_entries, self.name, self.company, self.posting_date)
 
-	def get_grouped_gl_entries(self, get_opening_entries=False):
+		self.make_closing_balances(gl_entries, get_opening_entries=get_opening_entries)
+
+	def make_closing_balances(self, gl_entries, get_opening_entries=False):
+		"""
+		Build the Account Closing Balances for ranges of accounts, one background job per range for
+		large periods. Each range is committed on its own and can be retried if its job fails or dies.
+		"""
+		self.set_closing_balance_partitions()
+		period_gl_entries = frappe.db.count(
+			"GL Entry",
+			{
+				"company": self.company,
+				"posting_date": ("between", [self.year_start_date, self.posting_date]),
+				"is_cancelled": 0,
+			},
+		)
+		in_background = period_gl_entries > CLOSING_BALANCE_BACKGROUND_THRESHOLD
+		self.db_set("closing_balance_status", "In Progress")
+
+		for partition in self.closing_balance_partitions:
+			accounts = set(get_partition_accounts(partition))
+			partition_gl_entries = [d for d in gl_entries if d.account in accounts]
+
+			if in_background:
+				enqueue_closing_balance_partition(
+					self.name, partition.name, partition_gl_entries, get_opening_entries
+				)
+			else:
+				make_partition_closing_balances(
+					self.name, partition.name, partition_gl_entries, get_opening_entries
+				)
+
+		if in_background:
+			frappe.msgprint(
+				_(
+					"The Account Closing Balances will be processed in the background, it can take a few minutes."
+				),
+				alert=True,
+			)
+
+	def set_closing_balance_partitions(self):
+		accounts = frappe.get_all(
+			"Account", filters={"company": self.company, "is_group": 0}, order_by="name", pluck="name"
+		)
+		# closing account head is always included, it may be a group in the chart of accounts
+		accounts = sorted(set(accounts) | {self.closing_account_head})
+
+		self.set("closing_balance_partitions", [])
+		for batch in create_batch(accounts, CLOSING_BALANCE_PARTITION_SIZE):
+			partition = self.append(
+				"closing_balance_partitions",
+				{
+					"from_account": batch[0],
+					"to_account": batch[-1],
+					"accounts": len(batch),
+					"account_list": frappe.as_json(batch, indent=None),
+					"status": "Queued",
+				},
+			)
+			partition.db_insert()
+
+	@frappe.whitelist()
+	def retry_closing_balances(self):
+		"""Queue the partitions which have failed, or whose job has died, again"""
+		self.check_permission("submit")
+		if self.docstatus != 1:
+			return
+
+		if self.gle_processing_status != "Completed":
+			frappe.throw(_("The GL Entries of this voucher are still being processed or have failed"))
+
+		queue_closing_balance_partitions(
+			self, [d.name for d in self.closing_balance_partitions if d.status != "Completed"]
+		)
+
+	def get_grouped_gl_entries(self, get_opening_entries=False, accounts=None):
 		closing_entries = []
 		for acc in self.get_balances_based_on_dimensions(
-			group_by_account=True, for_aggregation=True, get_opening_entries=get_opening_entries
+			group_by_account=True,
+			for_aggregation=True,
+			get_opening_entries=get_opening_entries,
+			accounts=accounts,
 		):
 			closing_entries.append(self.get_closing_entries(acc))
 
@@ -301,9 +382,14 @@ class PeriodClosingVoucher(AccountsController):
 			gl_entry.update({dimension: acc.get(dimension)})
 
 	def get_balances_based_on_dimensions(
-		self, group_by_account=False, report_type=None, for_aggregation=False, get_opening_entries=False
+		self,
+		group_by_account=False,
+		report_type=None,
+		for_aggregation=False,
+		get_opening_entries=False,
+		accounts=None,
 	):
-		"""Get balance for dimension-wise pl accounts"""
+		"""Get balance for dimension-wise pl accounts, optionally for the given list of accounts only"""
 
 		qb_dimension_fields = ["cost_center", "finance_book", "project"]
 
@@ -314,13 +400,13 @@ class PeriodClosingVoucher(AccountsController):
 		if group_by_account:
 			qb_dimension_fields.append("account")
 
-		account_filters = {
-			"company": self.company,
-			"is_group": 0,
-		}
+		account_filters = [["company", "=", self.company], ["is_group", "=", 0]]
 
 		if report_type:
-			account_filters.update({"report_type": report_type})
+			account_filters.append(["report_type", "=", report_type])
+
+		if accounts:
+			account_filters.append(["name", "in", accounts])
 
 		accounts = frappe.get_all("Account", filters=account_filters, pluck="name")
 
@@ -386,17 +472,156 @@ def process_gl_entries(gl_entries, voucher_name):
 		frappe.db.set_value("Period Closing Voucher", voucher_name, "gle_processing_status", "Failed")
 
 
-def process_closing_entries(gl_entries, closing_entries, voucher_name, company, closing_date):
-	from erpnext.accounts.doctype.account_closing_balance.account_closing_balance import (
-		make_closing_entries,
+def queue_closing_balance_partitions(pcv, partitions):
+	get_opening_entries = not frappe.db.exists(
+		"Period Closing Voucher",
+		{
+			"company": pcv.company,
+			"docstatus": 1,
+			"posting_date": ("<", pcv.posting_date),
+			"name": ("!=", pcv.name),
+		},
 	)
 
+	# the voucher's own entries are read from the ledger, they were passed to the jobs when submitted
+	gl_entries = frappe.get_all(
+		"GL Entry",
+		filters={"voucher_type": "Period Closing Voucher", "voucher_no": pcv.name, "is_cancelled": 0},
+		fields=["*"],
+	)
+	for entry in gl_entries:
+		entry["is_period_closing_voucher_entry"] = 1
+
+	frappe.db.set_value("Period Closing Voucher", pcv.name, "closing_balance_status", "In Progress")
+	for partition in pcv.closing_balance_partitions:
+		if partition.name not in partitions:
+			continue
+
+		frappe.db.set_value(PARTITION_DOCTYPE, partition.name, "status", "Queued")
+		accounts = set(get_partition_accounts(partition))
+		enqueue_closing_balance_partition(
+			pcv.name, partition.name, [d for d in gl_entries if d.account in accounts], get_opening_entries
+		)
+
+
+def get_partition_accounts(partition):
+	"""
+	Accounts of the partition. They are listed rather than filtered by range since the database
+	and Python do not sort account names the same way.
+	"""
+	return frappe.parse_json(partition.account_list)
+
+
+def enqueue_closing_balance_partition(voucher_name, partition, gl_entries, get_opening_entries=False):
+	job_id = f"period_closing_voucher_partition::{partition}"
+	if is_job_enqueued(job_id):
+		return
+
+	frappe.enqueue(
+		process_closing_balance_partition,
+		voucher_name=voucher_name,
+		partition=partition,
+		gl_entries=gl_entries,
+		get_opening_entries=get_opening_entries,
+		queue="long",
+		timeout=3000,
+		job_id=job_id,
+		enqueue_after_commit=True,
+	)
+
+
+def process_closing_balance_partition(voucher_name, partition, gl_entries, get_opening_entries=False):
 	try:
-		if gl_entries + closing_entries:
-			make_closing_entries(gl_entries + closing_entries, voucher_name, company, closing_date)
+		make_partition_closing_balances(voucher_name, partition, gl_entries, get_opening_entries)
 	except Exception as e:
 		frappe.db.rollback()
 		frappe.log_error(e)
+		frappe.db.set_value(PARTITION_DOCTYPE, partition, "status", "Failed")
+		frappe.db.set_value("Period Closing Voucher", voucher_name, "closing_balance_status", "Failed")
+
+
+def make_partition_closing_balances(voucher_name, partition, gl_entries, get_opening_entries=False):
+	"""Replace the Account Closing Balances of the voucher for the range of accounts of the partition"""
+	from erpnext.accounts.doctype.account_closing_balance.account_closing_balance import (
+		make_closing_entries,
+	)
+
+	# a partition queued again while its earlier job is still running waits for it here
+	partition_doc = frappe.db.get_value(
+		PARTITION_DOCTYPE, partition, ["account_list", "status"], as_dict=True, for_update=True
+	)
+	if partition_doc.status == "Completed":
+		return
+
+	accounts = get_partition_accounts(partition_doc)
+	pcv = frappe.get_doc("Period Closing Voucher", voucher_name)
+
+	# rows left behind by an earlier attempt
+	closing_balance = frappe.qb.DocType("Account Closing Balance")
+	frappe.qb.from_(closing_balance).delete().where(
+		(closing_balance.period_closing_voucher == voucher_name) & closing_balance.account.isin(accounts)
+	).run()
+
+	closing_entries = pcv.get_grouped_gl_entries(get_opening_entries=get_opening_entries, accounts=accounts)
+	closing_balances = make_closing_entries(
+		[frappe._dict(d) for d in gl_entries] + closing_entries,
+		voucher_name,
+		pcv.company,
+		pcv.posting_date,
+		accounts=accounts,
+	)
+
+	frappe.db.set_value(
+		PARTITION_DOCTYPE, partition, {"status": "Completed", "closing_balances": closing_balances}
+	)
+	update_closing_balance_status(voucher_name)
+
+
+def update_closing_balance_status(voucher_name):
+	"""Mark the voucher completed once all the partitions are, the locking reads see the other jobs' commits"""
+	pcv = frappe.qb.DocType("Period Closing Voucher")
+	frappe.qb.from_(pcv).select(pcv.name).where(pcv.name == voucher_name).for_update().run()
+
+	partition = frappe.qb.DocType(PARTITION_DOCTYPE)
+	pending = (
+		frappe.qb.from_(partition)
+		.select(partition.name)
+		.where(
+			(partition.parent == voucher_name)
+			& (partition.parenttype == "Period Closing Voucher")
+			& (partition.status != "Completed")
+		)
+		.for_update()
+	).run()
+
+	if not pending:
+		frappe.db.set_value("Period Closing Voucher", voucher_name, "closing_balance_status", "Completed")
+
+
+def requeue_stalled_closing_balance_partitions():
+	"""Queue the partitions whose job has died again, the ones still in the queue are skipped"""
+	partition = frappe.qb.DocType(PARTITION_DOCTYPE)
+	pcv = frappe.qb.DocType("Period Closing Voucher")
+	stalled = (
+		frappe.qb.from_(partition)
+		.join(pcv)
+		.on(pcv.name == partition.parent)
+		.select(partition.parent, partition.name)
+		.where(
+			(partition.parenttype == "Period Closing Voucher")
+			& (partition.status == "Queued")
+			& (partition.modified < add_to_date(now_datetime(), hours=-1))
+			& (pcv.docstatus == 1)
+			& (pcv.gle_processing_status == "Completed")
+		)
+	).run(as_dict=True)
+
+	partitions_by_voucher = {}
+	for d in stalled:
+		partitions_by_voucher.setdefault(d.parent, []).append(d.name)
+
+	for voucher_name, partitions in partitions_by_voucher.items():
+		queue_closing_balance_partitions(frappe.get_doc("Period Closing Voucher", voucher_name), partitions)
 
 
 def make_reverse_gl_entries(voucher_type, voucher_no):
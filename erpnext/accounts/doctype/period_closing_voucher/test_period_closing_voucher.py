@@ -3,12 +3,17 @@
 
 
 import unittest
+from unittest.mock import patch
 
 import frappe
 from frappe.utils import today
 
 from erpnext.accounts.doctype.finance_book.test_finance_book import create_finance_book
 from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.doctype.period_closing_voucher.period_closing_voucher import (
+	get_partition_accounts,
+	make_partition_closing_balances,
+)
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
 from erpnext.accounts.utils import get_fiscal_year
 
@@ -317,6 +322,85 @@ class TestPeriodClosingVoucher(unittest.TestCase):
 		repost_doc.posting_date = today()
 		repost_doc.save()
 
+	@patch(
+		"erpnext.accounts.doctype.period_closing_voucher.period_closing_voucher.CLOSING_BALANCE_PARTITION_SIZE",
+		5,
+	)
+	def test_closing_balance_partitions(self):
+		frappe.db.sql("delete from `tabGL Entry` where company='Test PCV Company'")
+		frappe.db.sql("delete from `tabPeriod Closing Voucher` where company='Test PCV Company'")
+		frappe.db.sql("delete from `tabAccount Closing Balance` where company='Test PCV Company'")
+
+		company = create_company()
+		cost_center = create_cost_center("Test Cost Center 1")
+
+		jv = make_journal_entry(
+			posting_date="2021-03-15",
+			amount=400,
+			account1="Cash - TPC",
+			account2="Sales - TPC",
+			cost_center=cost_center,
+			save=False,
+		)
+		jv.company = company
+		jv.save()
+		jv.submit()
+
+		pcv = self.make_period_closing_voucher(posting_date="2021-03-31")
+		pcv.reload()
+
+		self.assertEqual(pcv.closing_balance_status, "Completed")
+		self.assertTrue(len(pcv.closing_balance_partitions) > 1)
+		self.assertEqual({d.status for d in pcv.closing_balance_partitions}, {"Completed"})
+		# every account is in exactly one partition
+		partition_accounts = [
+			account for d in pcv.closing_balance_partitions for account in get_partition_accounts(d)
+		]
+		self.assertEqual(len(partition_accounts), len(set(partition_accounts)))
+		self.assertIn("Sales - TPC", partition_accounts)
+		self.assertEqual(
+			sum(d.closing_balances for d in pcv.closing_balance_partitions),
+			frappe.db.count("Account Closing Balance", {"period_closing_voucher": pcv.name}),
+		)
+
+		def get_sales_closing_balance():
+			return frappe.db.get_all(
+				"Account Closing Balance",
+				filters={
+					"account": "Sales - TPC",
+					"period_closing_voucher": pcv.name,
+					"is_period_closing_voucher_entry": 0,
+				},
+				pluck="credit",
+			)
+
+		self.assertEqual(get_sales_closing_balance(), [400])
+
+		# a failed partition is rebuilt without duplicating the balances left by the earlier attempt
+		partition = next(
+			d for d in pcv.closing_balance_partitions if "Sales - TPC" in get_partition_accounts(d)
+		)
+		frappe.db.set_value(partition.doctype, partition.name, "status", "Failed")
+		gl_entries = frappe.get_all(
+			"GL Entry",
+			filters={
+				"voucher_no": pcv.name,
+				"is_cancelled": 0,
+				"account": ("in", get_partition_accounts(partition)),
+			},
+			fields=["*"],
+		)
+		for entry in gl_entries:
+			entry["is_period_closing_voucher_entry"] = 1
+
+		make_partition_closing_balances(pcv.name, partition.name, gl_entries)
+
+		self.assertEqual(get_sales_closing_balance(), [400])
+		self.assertEqual(frappe.db.get_value(partition.doctype, partition.name, "status"), "Completed")
+		self.assertEqual(
+			frappe.db.get_value("Period Closing Voucher", pcv.name, "closing_balance_status"), "Completed"
+		)
+
 	def make_period_closing_voucher(self, posting_date=None, submit=True):
 		surplus_account = create_account()
 		cost_center = create_cost_center("Test Cost Center 1")
@@ -0,0 +1,28 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+
+from frappe.model.document import Document
+
+
+class PeriodClosingVoucherPartition(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		account_list: DF.LongText | None
+		accounts: DF.Int
+		closing_balances: DF.Int
+		from_account: DF.Link | None
+		parent: DF.Data
+		parentfield: DF.Data
+		parenttype: DF.Data
+		status: DF.Literal["Queued", "Completed", "Failed"]
+		to_account: DF.Link | None
+	# end: auto-generated types
+
+	pass
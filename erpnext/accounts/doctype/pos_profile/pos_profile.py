@@ -45,6 +45,7 @@ class POSProfile(Document):
 		income_account: DF.Link | None
 		item_groups: DF.Table[POSItemGroup]
 		letter_head: DF.Link | None
+		load_item_catalog: DF.Check
 		payments: DF.Table[POSPaymentMethod]
 		print_format: DF.Link | None
 		select_print_heading: DF.Link | None
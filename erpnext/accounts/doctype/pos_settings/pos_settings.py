@@ -2,8 +2,11 @@
 # For license information, please see license.txt
 
 
+import frappe
 from frappe.model.document import Document
 
+from erpnext.stock.doctype.item_search_index.item_search_index import is_item_search_index_enabled
+
 
 class POSSettings(Document):
 	# begin: auto-generated types
@@ -23,3 +26,17 @@ class POSSettings(Document):
 
 	def validate(self):
 		pass
+
+	def on_update(self):
+		doc_before_save = self.get_doc_before_save()
+		search_fields = {d.fieldname for d in self.pos_search_fields}
+		if doc_before_save and search_fields != {d.fieldname for d in doc_before_save.pos_search_fields}:
+			# the search fields are indexed along with the fields of the items
+			if is_item_search_index_enabled():
+				frappe.db.set_single_value("Stock Settings", "item_search_index_built", 0)
+				frappe.enqueue(
+					"erpnext.stock.doctype.item_search_index.item_search_index.rebuild_item_search_index",
+					queue="long",
+					timeout=7200,
+					enqueue_after_commit=True,
+				)
@@ -0,0 +1,145 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""
+Pricing of all the rows of a transaction at once. The masters the rows are matched on (the items, the
+party and the item group, customer group, territory and warehouse trees) are fetched in bulk before
+the rows are priced, and the data the rows share (the items a rule applies on and the cumulative
+quantity and amount of a rule) is computed once for the document.
+
+	with document_pricing(args, rows):
+		for row in rows:
+			get_pricing_rule_for_item(...)
+"""
+
+from contextlib import contextmanager
+
+import frappe
+from frappe.query_builder import Criterion
+from frappe.utils import cstr
+
+from erpnext.accounts.doctype.pricing_rule.utils import get_tree_root
+
+TREE_DOCTYPES = ("Item Group", "Customer Group", "Territory", "Supplier Group", "Warehouse")
+
+
+@contextmanager
+def document_pricing(args, rows):
+	"""
+	Prefetch the masters of the rows (a list of dicts with the item_code and optionally the item_group
+	and warehouse) of the transaction in `args`, for the rows priced in the block
+	"""
+	if frappe.flags.document_pricing is not None:
+		# already pricing the document, e.g. `get_item_details` called while validating it
+		yield frappe.flags.document_pricing
+		return
+
+	frappe.flags.document_pricing = context = get_document_pricing_context(args, rows)
+	try:
+		yield context
+	finally:
+		frappe.flags.document_pricing = None
+
+
+def get_document_pricing():
+	return frappe.flags.document_pricing
+
+
+def get_document_pricing_context(args, rows):
+	item_codes = list({row.get("item_code") for row in rows if row.get("item_code")})
+	context = frappe._dict(items={}, parties={}, rule_data={})
+
+	if item_codes:
+		context.items = {
+			d.name: d
+			for d in frappe.get_all(
+				"Item",
+				filters={"name": ("in", item_codes)},
+				fields=["name", "item_group", "brand", "variant_of"],
+			)
+		}
+
+	if args.get("customer") and args.get("quotation_to") in (None, "", "Customer"):
+		context.parties[("Customer", args.get("customer"))] = frappe.db.get_value(
+			"Customer", args.get("customer"), ["customer_group", "territory"]
+		)
+
+	if args.get("supplier"):
+		context.parties[("Supplier", args.get("supplier"))] = frappe.db.get_value(
+			"Supplier", args.get("supplier"), "supplier_group"
+		)
+
+	tree_names = {doctype: set() for doctype in TREE_DOCTYPES}
+	for row in rows:
+		item = context.items.get(row.get("item_code"))
+		tree_names["Item Group"].update((row.get("item_group"), item and item.item_group))
+		tree_names["Warehouse"].add(row.get("warehouse"))
+
+	customer = context.parties.get(("Customer", args.get("customer"))) or (None, None)
+	tree_names["Customer Group"].update((args.get("customer_group"), customer[0]))
+	tree_names["Territory"].update((args.get("territory"), customer[1]))
+	tree_names["Supplier Group"].update(
+		(args.get("supplier_group"), context.parties.get(("Supplier", args.get("supplier"))))
+	)
+	tree_names["Warehouse"].add(args.get("warehouse"))
+
+	for doctype, names in tree_names.items():
+		prefetch_tree_groups(doctype, names)
+
+	return context
+
+
+def prefetch_tree_groups(parenttype, names):
+	"""Fill the cache of `utils.get_tree_groups` for all the names in two queries"""
+	if not frappe.flags.tree_groups:
+		frappe.flags.tree_groups = {}
+
+	names = [name for name in names if name and (parenttype, name) not in frappe.flags.tree_groups]
+	if not names:
+		return
+
+	nodes = frappe.get_all(parenttype, filters={"name": ("in", names)}, fields=["name", "lft", "rgt"])
+	if not nodes:
+		# invalid names are reported by `get_tree_groups`
+		return
+
+	tree = frappe.qb.DocType(parenttype)
+	ancestors = (
+		frappe.qb.from_(tree)
+		.select(tree.name, tree.lft, tree.rgt)
+		.where(Criterion.any([(tree.lft <= d.lft) & (tree.rgt >= d.rgt) for d in nodes]))
+	).run(as_dict=True)
+	root = get_tree_root(parenttype)
+
+	for node in nodes:
+		parent_groups = [d.name for d in ancestors if d.lft <= node.lft and d.rgt >= node.rgt]
+		if root:
+			parent_groups.append(root)
+
+		frappe.flags.tree_groups[(parenttype, node.name)] = parent_groups
+
+
+def get_prefetched_item(item_code):
+	context = get_document_pricing()
+	if context:
+		return context.items.get(item_code)
+
+
+def get_prefetched_party(party_type, party):
+	"""Returns (customer_group, territory) of a customer or the supplier group of a supplier"""
+	context = get_document_pricing()
+	if context and (party_type, party) in context.parties:
+		return context.parties[(party_type, party)]
+
+
+def get_document_cached_value(key, method, *args):
+	"""Returns the result of `method` computed once for the document being priced, for the rule in `key`"""
+	context = get_document_pricing()
+	if not context:
+		return method(*args)
+
+	key = tuple(cstr(d) for d in key)
+	if key not in context.rule_data:
+		context.rule_data[key] = method(*args)
+
+	return context.rule_data[key]
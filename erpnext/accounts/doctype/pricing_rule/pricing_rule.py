@@ -394,6 +394,10 @@ class PricingRule(Document):
 
 	def on_change(self, verbose=False):
 		from ftp.ftp_invent.redis.api import try_update_redis_inventory
+
+		from erpnext.accounts.doctype.pricing_rule.pricing_rule_index import clear_pricing_rule_index
+
+		clear_pricing_rule_index()
 		if self.apply_on == 'Item Code' and self.items:
 			message = ""
 			for row in self.items:  # pylint: disable=not-an-iterable
@@ -405,6 +409,11 @@ class PricingRule(Document):
 
 		self.on_update_children(child_docfield_name='items')
 
+	def on_trash(self):
+		from erpnext.accounts.doctype.pricing_rule.pricing_rule_index import clear_pricing_rule_index
+
+		clear_pricing_rule_index()
+
 
 # --------------------------------------------------------------------------------
 
@@ -453,6 +462,7 @@ def apply_pricing_rule(args, doc=None):
 	#	When used by Daily and Sales Orders, 'args' must contain 1 additional element: 'coupon_codes'
 	#	To accomplish this, I should modify the JS code, and add Coupon Code Set to it's payload.
 	# ---------------
+	from erpnext.accounts.doctype.pricing_rule.document_pricing import document_pricing
 
 	validate_datatype('args', args, (dict, str), mandatory=True)
 	validate_datatype('doc', doc, Document, mandatory=False)
@@ -474,22 +484,13 @@ def apply_pricing_rule(args, doc=None):
 	item_list = args.get("items")
 	args.pop("items")  # DH: Frappe could have just done this on line above
 
-	item_code_list = tuple(item.get("item_code") for item in item_list)
-	query_items = frappe.get_all(
-		"Item",
-		fields=["item_code", "has_serial_no"],
-		filters=[["item_code", "in", item_code_list]],
-		as_list=1,
-	)
-	serialized_items = dict()
-	for item_code, val in query_items:
-		serialized_items.setdefault(item_code, val)
-
-	for item in item_list:
-		args_copy = copy.deepcopy(args)
-		args_copy.update(item)  # merge the Order Line dictionary (item) into the 'args' dictionary.
-		data = get_pricing_rule_for_item(args_copy, doc=doc)
-		out.append(data)
+	# the masters of all the rows are fetched once, see `document_pricing`
+	with document_pricing(args, item_list):
+		for item in item_list:
+			args_copy = copy.deepcopy(args)
+			args_copy.update(item)  # merge the Order Line dictionary (item) into the 'args' dictionary.
+			data = get_pricing_rule_for_item(args_copy, doc=doc)
+			out.append(data)
 
 	return out
 
@@ -773,8 +774,20 @@ def update_args_for_pricing_rule(args):
 	"""
 	Offical Upstream Function: But I'm unsure the point of it.
 	"""
+	from erpnext.accounts.doctype.pricing_rule.document_pricing import (
+		get_prefetched_item,
+		get_prefetched_party,
+	)
+
+	prefetched_item = get_prefetched_item(args.item_code)
+	if prefetched_item and "variant_of" not in args:
+		args.variant_of = prefetched_item.variant_of
+
 	if not (args.item_group and args.brand):
-		item = frappe.get_cached_value("Item", args.item_code, ("item_group", "brand"))
+		if prefetched_item:
+			item = (prefetched_item.item_group, prefetched_item.brand)
+		else:
+			item = frappe.get_cached_value("Item", args.item_code, ("item_group", "brand"))
 		if not item:
 			return
 
@@ -788,7 +801,9 @@ def update_args_for_pricing_rule(args):
 			if args.quotation_to and args.quotation_to != "Customer":
 				customer = frappe._dict()
 			else:
-				customer = frappe.get_cached_value("Customer", args.customer, ["customer_group", "territory"])
+				customer = get_prefetched_party("Customer", args.customer) or frappe.get_cached_value(
+					"Customer", args.customer, ["customer_group", "territory"]
+				)
 
 			if customer:
 				args.customer_group, args.territory = customer
@@ -796,7 +811,9 @@ def update_args_for_pricing_rule(args):
 		args.supplier = args.supplier_group = None
 
 	elif args.supplier and not args.supplier_group:
-		args.supplier_group = frappe.get_cached_value("Supplier", args.supplier, "supplier_group")
+		args.supplier_group = get_prefetched_party("Supplier", args.supplier) or frappe.get_cached_value(
+			"Supplier", args.supplier, "supplier_group"
+		)
 		args.customer = args.customer_group = args.territory = None
 
 
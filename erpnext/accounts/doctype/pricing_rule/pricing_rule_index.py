@@ -0,0 +1,201 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""
+Index of the enabled Pricing Rules held in process memory, to match the rules of transaction items
+without querying them for every item. It matches the same rules, in the same order, as the queries
+of `utils._get_pricing_rules`.
+
+Every worker keeps its own copy for each site, rebuilt when the version stored in the cache changes.
+The version is cleared when a Pricing Rule or Promotional Scheme is changed.
+"""
+
+from collections import defaultdict
+
+import frappe
+from frappe.utils import cint, cstr, getdate
+
+from erpnext.accounts.doctype.pricing_rule.utils import get_tree_groups, selling_doctypes
+
+INDEX_VERSION_KEY = "pricing_rule_index_version"
+APPLY_ON_FIELDS = {"Item Code": "item_code", "Item Group": "item_group", "Brand": "brand"}
+PARTY_FIELDS = ("company", "customer", "supplier", "campaign", "sales_partner")
+PARTY_GROUPS = ("Customer Group", "Territory", "Supplier Group")
+
+# site: (version, index)
+_indexes = {}
+
+
+def is_pricing_rule_index_enabled():
+	return cint(frappe.db.get_single_value("Accounts Settings", "match_pricing_rules_in_memory", cache=True))
+
+
+def get_pricing_rule_index():
+	"""Returns the index of the site, checked against the cached version once per request"""
+	if frappe.flags.pricing_rule_index is not None:
+		return frappe.flags.pricing_rule_index
+
+	version = frappe.cache().get_value(INDEX_VERSION_KEY)
+	if not version:
+		version = frappe.generate_hash(length=10)
+		frappe.cache().set_value(INDEX_VERSION_KEY, version)
+
+	site_index = _indexes.get(frappe.local.site)
+	if not site_index or site_index[0] != version:
+		site_index = (version, build_pricing_rule_index())
+		_indexes[frappe.local.site] = site_index
+
+	frappe.flags.pricing_rule_index = site_index[1]
+	return site_index[1]
+
+
+def build_pricing_rule_index():
+	"""
+	Returns the enabled rules by name, with their child rows of each "Apply On" and the names of the
+	rules by transaction type, "Apply On" field and the value of the field in their child rows (or in
+	their "Apply Rule On Other" field)
+	"""
+	rules = {d.name: d for d in frappe.get_all("Pricing Rule", filters={"disable": 0}, fields=["*"])}
+	index = frappe._dict(
+		rules=rules,
+		transaction_types={
+			transaction_type: any(cint(d.get(transaction_type)) for d in rules.values())
+			for transaction_type in ("selling", "buying")
+		},
+		child_rows={},
+		rules_by_value=defaultdict(set),
+	)
+
+	for apply_on, fieldname in APPLY_ON_FIELDS.items():
+		child_rows = index.child_rows[fieldname] = defaultdict(list)
+		child = frappe.qb.DocType(f"Pricing Rule {apply_on}")
+		for row in (
+			frappe.qb.from_(child).select(child.parent, child[fieldname], child.uom).orderby(child.idx)
+		).run(as_dict=True):
+			if row.parent in rules:
+				child_rows[row.parent].append(row)
+
+		for name, rule in rules.items():
+			values = {row.get(fieldname) for row in child_rows.get(name, [])}
+			if rule.apply_rule_on_other is not None and child_rows.get(name):
+				values.add(rule.get(f"other_{fieldname}"))
+
+			for transaction_type in ("selling", "buying"):
+				if cint(rule.get(transaction_type)):
+					for value in values:
+						index.rules_by_value[(transaction_type, fieldname, value)].add(name)
+
+	return index
+
+
+def has_pricing_rules(transaction_type):
+	return get_pricing_rule_index().transaction_types.get(transaction_type)
+
+
+def match_pricing_rules(apply_on, args):
+	"""Returns the rules `utils._get_pricing_rules` would return for the item in `args`, without queries"""
+	apply_on_field = frappe.scrub(apply_on)
+	if not args.get(apply_on_field):
+		return []
+
+	if apply_on_field == "item_code" and "variant_of" not in args:
+		args.variant_of = frappe.get_cached_value("Item", args.item_code, "variant_of")
+
+	if not args.price_list:
+		args.price_list = None
+
+	index = get_pricing_rule_index()
+	item_values = get_item_values(apply_on_field, args)
+	names = set()
+	for value in {*item_values, args.get(apply_on_field)}:
+		names |= index.rules_by_value.get((args.transaction_type, apply_on_field, value), set())
+
+	pricing_rules = []
+	for name in names:
+		rule = index.rules[name]
+		if not rule_matches(rule, args):
+			continue
+
+		for row in index.child_rows[apply_on_field].get(name, []):
+			if row_matches(rule, row, apply_on_field, item_values, args):
+				pricing_rule = frappe._dict(rule)
+				pricing_rule.update({apply_on_field: row.get(apply_on_field), "uom": row.uom})
+				pricing_rules.append(pricing_rule)
+
+	# same order as the query: priority (a select field) and name, both descending
+	return sorted(pricing_rules, key=lambda d: (cstr(d.priority), d.name), reverse=True)
+
+
+def get_item_values(apply_on_field, args):
+	"""Values of the child rows of the "Apply On" table which match the item"""
+	if apply_on_field == "item_group":
+		return set(get_tree_groups("Item Group", args.item_group))
+
+	values = {args.get(apply_on_field)}
+	if apply_on_field == "item_code" and args.variant_of:
+		values.add(args.variant_of)
+
+	return values
+
+
+def row_matches(rule, row, apply_on_field, item_values, args):
+	# rules applied on other items match on the "Apply Rule On Other" field, for all their rows
+	other_value = rule.get(f"other_{apply_on_field}")
+	if rule.apply_rule_on_other is not None and other_value == args.get(apply_on_field):
+		return True
+
+	uom_matches = not args.get("uom") or cstr(row.uom) in ("", args.get("uom"))
+	if apply_on_field == "item_code":
+		return (row.item_code == args.item_code and uom_matches) or (
+			bool(args.variant_of) and row.item_code == args.variant_of
+		)
+	elif apply_on_field == "item_group":
+		return cstr(row.item_group) in item_values and uom_matches
+
+	return row.brand == args.brand
+
+
+def rule_matches(rule, args):
+	"""Conditions of `utils.get_other_conditions`, along with the warehouse and price list"""
+	for field in PARTY_FIELDS:
+		if cstr(rule.get(field)) not in ((args.get(field), "") if args.get(field) else ("",)):
+			return False
+
+	for parenttype in (*PARTY_GROUPS, "Warehouse"):
+		field = frappe.scrub(parenttype)
+		if args.get(field):
+			groups = get_tree_groups(parenttype, args.get(field))
+			if groups and cstr(rule.get(field)) not in (*groups, ""):
+				return False
+
+	for date_field, from_field, to_field in (
+		("transaction_date", "valid_from", "valid_upto"),
+		("price_date", "valid_from_price_date", "valid_to_price_date"),
+	):
+		if args.get(date_field) and not (
+			getdate(rule.get(from_field) or "2000-01-01")
+			<= getdate(args.get(date_field))
+			<= getdate(rule.get(to_field) or "2500-12-31")
+		):
+			return False
+
+	transaction_type = "selling" if args.get("doctype") in selling_doctypes else "buying"
+	if not cint(rule.get(transaction_type)) or not cint(rule.get(args.transaction_type)):
+		return False
+
+	return cstr(rule.for_price_list) in (args.price_list, "")
+
+
+def clear_pricing_rule_index():
+	"""
+	Clear the version now for the current transaction, and again once it is committed (or rolled back)
+	in case the index was rebuilt meanwhile from the rules being changed
+	"""
+	clear_cached_pricing_rule_index()
+	frappe.db.after_commit.add(clear_cached_pricing_rule_index)
+	frappe.db.after_rollback.add(clear_cached_pricing_rule_index)
+
+
+def clear_cached_pricing_rule_index():
+	frappe.cache().delete_value(INDEX_VERSION_KEY)
+	frappe.flags.pricing_rule_index = None
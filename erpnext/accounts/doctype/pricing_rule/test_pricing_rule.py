@@ -6,6 +6,7 @@ import unittest
 
 import frappe
 
+from erpnext.accounts.doctype.pricing_rule.pricing_rule_index import clear_cached_pricing_rule_index
 from erpnext.accounts.doctype.purchase_invoice.test_purchase_invoice import make_purchase_invoice
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
 from erpnext.controllers.sales_and_purchase_return import make_return_doc
@@ -1376,6 +1377,123 @@ class TestPricingRule(unittest.TestCase):
 		debit_note.delete()
 		pi.cancel()
 
+	def test_pricing_rule_index_matches_query(self):
+		from erpnext.accounts.doctype.pricing_rule.pricing_rule_index import match_pricing_rules
+		from erpnext.accounts.doctype.pricing_rule.utils import _get_pricing_rules
+
+		make_pricing_rule(title="_Test Item Rule", selling=1, discount_percentage=10)
+		make_pricing_rule(title="_Test Priority Rule", selling=1, priority=5, discount_percentage=15)
+		make_pricing_rule(title="_Test Buying Rule", buying=1, discount_percentage=5)
+		make_pricing_rule(
+			title="_Test Customer Rule",
+			selling=1,
+			applicable_for="Customer",
+			customer="_Test Customer",
+			discount_percentage=20,
+		)
+		make_pricing_rule(
+			title="_Test Item Group Rule",
+			selling=1,
+			apply_on="Item Group",
+			item_group="All Item Groups",
+			discount_percentage=25,
+		)
+		make_pricing_rule(
+			title="_Test Brand Rule", selling=1, apply_on="Brand", brand="_Test Brand", discount_percentage=30
+		)
+		price_list_rule = make_pricing_rule(title="_Test Price List Rule", selling=1, discount_percentage=35)
+		price_list_rule.db_set("for_price_list", "_Test Price List")
+		expired_rule = make_pricing_rule(title="_Test Expired Rule", selling=1, discount_percentage=40)
+		expired_rule.db_set({"valid_from": "2019-01-01", "valid_upto": "2019-12-31"})
+		disabled_rule = make_pricing_rule(title="_Test Disabled Rule", selling=1, discount_percentage=45)
+		disabled_rule.db_set("disable", 1)
+
+		base_args = {
+			"item_code": "_Test Item",
+			"item_group": "_Test Item Group",
+			"brand": "_Test Brand",
+			"company": "_Test Company",
+			"transaction_type": "selling",
+			"doctype": "Sales Order",
+			"transaction_date": "2024-01-15",
+		}
+		cases = [
+			{},
+			{"customer": "_Test Customer"},
+			{"customer": "_Test Customer 1"},
+			{"price_list": "_Test Price List"},
+			{"transaction_date": "2019-06-01"},
+			{"uom": "_Test UOM"},
+			{"item_code": "_Test Item 2", "item_group": "_Test Item Group Desktops", "brand": None},
+			{"transaction_type": "buying", "doctype": "Purchase Order"},
+		]
+
+		frappe.db.set_single_value("Accounts Settings", "match_pricing_rules_in_memory", 1)
+		self.addCleanup(frappe.db.set_single_value, "Accounts Settings", "match_pricing_rules_in_memory", 0)
+
+		for case in cases:
+			for apply_on in ("Item Code", "Item Group", "Brand"):
+				args = frappe._dict(base_args, **case)
+				expected = _get_pricing_rules(apply_on, frappe._dict(args), {})
+				pricing_rules = match_pricing_rules(apply_on, frappe._dict(args))
+
+				self.assertEqual(
+					[(d.name, d.get(frappe.scrub(apply_on)), d.uom) for d in pricing_rules],
+					[(d.name, d.get(frappe.scrub(apply_on)), d.uom) for d in expected],
+					msg=f"{apply_on}: {case}",
+				)
+
+	def test_document_pricing(self):
+		from erpnext.accounts.doctype.pricing_rule.document_pricing import document_pricing
+		from erpnext.accounts.doctype.pricing_rule.pricing_rule import (
+			apply_pricing_rule,
+			get_pricing_rule_for_item,
+		)
+		from erpnext.accounts.doctype.pricing_rule.utils import get_tree_groups
+
+		make_pricing_rule(title="_Test Item Rule", selling=1, discount_percentage=10)
+		make_pricing_rule(
+			title="_Test Item Group Rule",
+			selling=1,
+			apply_on="Item Group",
+			item_group="_Test Item Group",
+			discount_percentage=20,
+		)
+
+		args = {
+			"customer": "_Test Customer",
+			"company": "_Test Company",
+			"currency": "INR",
+			"price_list": "_Test Price List",
+			"doctype": "Sales Order",
+			"transaction_type": "selling",
+			"transaction_date": frappe.utils.nowdate(),
+		}
+		rows = [
+			{"doctype": "Sales Order Item", "item_code": "_Test Item", "qty": 1, "price_list_rate": 100},
+			{"doctype": "Sales Order Item", "item_code": "_Test Item 2", "qty": 2, "price_list_rate": 100},
+		]
+
+		# masters of the rows are fetched in bulk
+		frappe.flags.tree_groups = {}
+		with document_pricing(frappe._dict(args), rows) as context:
+			item_group = context.items["_Test Item"].item_group
+			prefetched_groups = frappe.flags.tree_groups[("Item Group", item_group)]
+			customer_group = context.parties[("Customer", "_Test Customer")][0]
+
+		frappe.flags.tree_groups = {}
+		self.assertEqual(sorted(prefetched_groups), sorted(get_tree_groups("Item Group", item_group)))
+		self.assertEqual(customer_group, frappe.db.get_value("Customer", "_Test Customer", "customer_group"))
+		self.assertIsNone(frappe.flags.document_pricing)
+
+		# rows priced together get the same rules as priced one by one
+		results = apply_pricing_rule(frappe._dict(args, items=rows))
+		for row, result in zip(rows, results, strict=True):
+			frappe.flags.tree_groups = {}
+			expected = get_pricing_rule_for_item(frappe._dict(args, **row))
+			self.assertEqual(result.get("pricing_rules"), expected.get("pricing_rules"))
+			self.assertEqual(result.get("discount_percentage"), expected.get("discount_percentage"))
+
 
 test_dependencies = ["Campaign"]
 
@@ -1452,6 +1570,8 @@ def delete_existing_pricing_rules():
 	]:
 		frappe.db.sql(f"delete from `tab{doctype}`")
 
+	clear_cached_pricing_rule_index()
+
 
 def make_item_price(item, price_list_name, item_price):
 	frappe.get_doc(
@@ -10,7 +10,7 @@ import math
 
 import frappe
 from frappe import _, bold
-from frappe.utils import cint, flt, fmt_money, get_link_to_form, getdate, today
+from frappe.utils import cint, cstr, flt, fmt_money, get_link_to_form, getdate, today
 
 from erpnext.setup.doctype.item_group.item_group import get_child_item_groups
 from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
@@ -23,6 +23,22 @@ class MultiplePricingRuleConflict(frappe.ValidationError):
 
 apply_on_table = {"Item Code": "items", "Item Group": "item_groups", "Brand": "brands"}
 
+# pricing rules of these doctypes are the ones for selling, others are for buying
+selling_doctypes = [
+	"Quotation",
+	"Quotation Item",
+	"Sales Order",
+	"Sales Order Item",
+	"Delivery Note",
+	"Delivery Note Item",
+	"Sales Invoice",
+	"Sales Invoice Item",
+	"POS Invoice",
+	"POS Invoice Item",
+	"Daily Order",			# FTP - This is extremely important, if you don't use it, ERPNext *assumes* you're Buying.  :eyeroll:
+	"Daily Order Item"		# FTP - This is extremely important, if you don't use it, ERPNext *assumes* you're Buying.  :eyeroll:
+]
+
 
 def get_pricing_rules(args, doc=None):
 	"""
@@ -67,17 +83,30 @@ def get_pricing_rules(args, doc=None):
 
 	"""
 	from erpnext.accounts.doctype.pricing_rule.pricing_rule import pricing_rule_matches_coupon_list
+	from erpnext.accounts.doctype.pricing_rule.pricing_rule_index import (
+		has_pricing_rules,
+		is_pricing_rule_index_enabled,
+		match_pricing_rules,
+	)
 
 	pricing_rules = []
 	values = {}
 
-	if not frappe.db.exists("Pricing Rule", {"disable": 0, args.transaction_type: 1}):
+	# rules are matched from the in-memory index if enabled, see `pricing_rule_index`
+	use_index = is_pricing_rule_index_enabled()
+	if use_index:
+		if not has_pricing_rules(args.transaction_type):
+			return
+	elif not frappe.db.exists("Pricing Rule", {"disable": 0, args.transaction_type: 1}):
 		return
 
 	# Begin by adding some potential Pricing Rules to the list 'pricing_rules':
 	for apply_on in ["Item Code", "Item Group", "Brand"]:
 		frappe.dprint(f"  * Searching for pricing rules based on {apply_on}", check_env='FTP_DEBUG_PRICING_RULE')
-		pricing_rules.extend(_get_pricing_rules(apply_on, args, values))
+		if use_index:
+			pricing_rules.extend(match_pricing_rules(apply_on, args))
+		else:
+			pricing_rules.extend(_get_pricing_rules(apply_on, args, values))
 		if pricing_rules and pricing_rules[0].has_priority:
 			continue
 
@@ -295,33 +324,11 @@ def _get_tree_conditions(args, parenttype, table, allow_blank=True):
 		if key in frappe.flags.tree_conditions:
 			return frappe.flags.tree_conditions[key]
 
-		try:
-			lft, rgt = frappe.db.get_value(parenttype, args.get(field), ["lft", "rgt"])
-		except TypeError:
-			frappe.throw(_("Invalid {0}").format(args.get(field)))
-
-		parent_groups = frappe.db.sql_list(
-			"""select name from `tab{}`
-			where lft<={} and rgt>={}""".format(parenttype, "%s", "%s"),
-			(lft, rgt),
-		)
-
-		if parenttype in ["Customer Group", "Item Group", "Territory"]:
-			parent_field = f"parent_{frappe.scrub(parenttype)}"
-			root_name = frappe.db.get_list(
-				parenttype,
-				{"is_group": 1, parent_field: ("is", "not set")},
-				"name",
-				as_list=1,
-				ignore_permissions=True,
-			)
-
-			if root_name and root_name[0][0]:
-				parent_groups.append(root_name[0][0])
+		parent_groups = get_tree_groups(parenttype, args.get(field))
 
 		if parent_groups:
 			if allow_blank:
-				parent_groups.append("")
+				parent_groups = [*parent_groups, ""]
 			condition = "ifnull({table}.{field}, '') in ({parent_groups})".format(
 				table=table, field=field, parent_groups=", ".join(frappe.db.escape(d) for d in parent_groups)
 			)
@@ -330,6 +337,51 @@ def _get_tree_conditions(args, parenttype, table, allow_blank=True):
 	return condition
 
 
+def get_tree_groups(parenttype, name):
+	"""Returns `name` and its ancestors (and the root of the grouping trees) for matching pricing rules"""
+	if not frappe.flags.tree_groups:
+		frappe.flags.tree_groups = {}
+	key = (parenttype, name)
+	if key in frappe.flags.tree_groups:
+		return frappe.flags.tree_groups[key]
+
+	try:
+		lft, rgt = frappe.db.get_value(parenttype, name, ["lft", "rgt"])
+	except TypeError:
+		frappe.throw(_("Invalid {0}").format(name))
+
+	parent_groups = frappe.db.sql_list(
+		"""select name from `tab{}`
+		where lft<={} and rgt>={}""".format(parenttype, "%s", "%s"),
+		(lft, rgt),
+	)
+
+	root_name = get_tree_root(parenttype)
+	if root_name:
+		parent_groups.append(root_name)
+
+	frappe.flags.tree_groups[key] = parent_groups
+	return parent_groups
+
+
+def get_tree_root(parenttype):
+	"""Root of the grouping trees, pricing rules for it apply to all the groups"""
+	if parenttype not in ["Customer Group", "Item Group", "Territory"]:
+		return
+
+	parent_field = f"parent_{frappe.scrub(parenttype)}"
+	root_name = frappe.db.get_list(
+		parenttype,
+		{"is_group": 1, parent_field: ("is", "not set")},
+		"name",
+		as_list=1,
+		ignore_permissions=True,
+	)
+
+	if root_name and root_name[0][0]:
+		return root_name[0][0]
+
+
 def get_other_conditions(conditions, values, args):
 	for field in ["company", "customer", "supplier", "campaign", "sales_partner"]:
 		if args.get(field):
@@ -354,20 +406,7 @@ def get_other_conditions(conditions, values, args):
 			AND IFNULL(`tabPricing Rule`.valid_to_price_date, '2500-12-31')"""
 		values['price_date'] = args.get('price_date')
 
-	if args.get("doctype") in [
-		"Quotation",
-		"Quotation Item",
-		"Sales Order",
-		"Sales Order Item",
-		"Delivery Note",
-		"Delivery Note Item",
-		"Sales Invoice",
-		"Sales Invoice Item",
-		"POS Invoice",
-		"POS Invoice Item",
-		"Daily Order",			# FTP - This is extremely important, if you don't use it, ERPNext *assumes* you're Buying.  :eyeroll:
-		"Daily Order Item"		# FTP - This is extremely important, if you don't use it, ERPNext *assumes* you're Buying.  :eyeroll:
-	]:
+	if args.get("doctype") in selling_doctypes:
 		conditions += """ and ifnull(`tabPricing Rule`.selling, 0) = 1"""
 	else:
 		conditions += """ and ifnull(`tabPricing Rule`.buying, 0) = 1"""
@@ -630,15 +669,8 @@ def get_qty_and_rate_for_other_item(doc, pr_doc, pricing_rules, row_item):
 	This creates a list of Pricing Rules based on the 'Apply Rule on Other' field.
 	"""
 	other_items = get_pricing_rule_items(pr_doc, other_items=True)
-	pricing_rule_apply_on = apply_on_table.get(pr_doc.get("apply_on"))
 	apply_on = frappe.scrub(pr_doc.get("apply_on"))
-
-	items = []
-	for d in pr_doc.get(pricing_rule_apply_on):
-		if apply_on == "item_group":
-			items.extend(get_child_item_groups(d.get(apply_on)))
-		else:
-			items.append(d.get(apply_on))
+	items = get_pricing_rule_items(pr_doc)
 
 	for row in doc.items:
 		if row.get(apply_on) in items:
@@ -655,11 +687,25 @@ def get_qty_and_rate_for_other_item(doc, pr_doc, pricing_rules, row_item):
 
 
 def get_qty_amount_data_for_cumulative(pr_doc, doc, items=None):
+	from erpnext.accounts.doctype.pricing_rule.document_pricing import get_document_cached_value
+
 	if items is None:
 		items = []
-	sum_qty, sum_amt = [0, 0]
 	doctype = doc.get("parenttype") or doc.doctype
 
+	# the submitted transactions are summed up once for all the rows of the document being priced
+	return get_document_cached_value(
+		("cumulative", pr_doc.name, doctype, *sorted(items, key=cstr)),
+		_get_qty_amount_data_for_cumulative,
+		pr_doc,
+		doctype,
+		items,
+	)
+
+
+def _get_qty_amount_data_for_cumulative(pr_doc, doctype, items):
+	sum_qty, sum_amt = [0, 0]
+
 	date_field = (
 		"transaction_date" if frappe.get_meta(doctype).has_field("transaction_date") else "posting_date"
 	)
@@ -887,6 +933,16 @@ def apply_pricing_rule_for_free_items(doc, pricing_rule_args):
 
 
 def get_pricing_rule_items(pr_doc, other_items=False) -> list:
+	from erpnext.accounts.doctype.pricing_rule.document_pricing import get_document_cached_value
+
+	return list(
+		get_document_cached_value(
+			("rule_items", pr_doc.name, other_items), _get_pricing_rule_items, pr_doc, other_items
+		)
+	)
+
+
+def _get_pricing_rule_items(pr_doc, other_items=False) -> list:
 	apply_on_data = []
 	apply_on = frappe.scrub(pr_doc.get("apply_on"))
 
@@ -6,6 +6,8 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 
+from erpnext.accounts.doctype.pricing_rule.pricing_rule_index import clear_pricing_rule_index
+
 pricing_rule_fields = [
 	"apply_on",
 	"mixed_conditions",
@@ -180,6 +182,7 @@ class PromotionalScheme(Document):
 				frappe.delete_doc("Pricing Rule", docname.name)
 
 	def on_update(self):
+		clear_pricing_rule_index()
 		self.validate()
 		pricing_rules = (
 			frappe.get_all(
@@ -224,6 +227,7 @@ class PromotionalScheme(Document):
 			frappe.msgprint(_("New {0} pricing rules are created").format(count))
 
 	def on_trash(self):
+		clear_pricing_rule_index()
 		for rule in frappe.get_all("Pricing Rule", {"promotional_scheme": self.name}):
 			frappe.delete_doc("Pricing Rule", rule.name)
 
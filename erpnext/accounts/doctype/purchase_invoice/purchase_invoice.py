@@ -31,6 +31,7 @@ from erpnext.accounts.general_ledger import (
 	make_gl_entries,
 	make_reverse_gl_entries,
 	merge_similar_entries,
+	remove_voucher_from_ledger_balances,
 )
 from erpnext.accounts.party import get_due_date, get_party_account
 from erpnext.accounts.utils import get_account_currency, get_fiscal_year
@@ -838,6 +839,11 @@ class PurchaseInvoice(BuyingController):
 		if rows:
 			# cancel gl entries
 			gle = qb.DocType("GL Entry")
+			for purchase_receipt in purchase_receipts:
+				remove_voucher_from_ledger_balances(
+					"Purchase Receipt", purchase_receipt, gle.voucher_detail_no.isin(rows)
+				)
+
 			gle_update_query = (
 				qb.update(gle)
 				.set(gle.is_cancelled, 1)
@@ -8,6 +8,10 @@ from frappe.utils import add_days, cint, flt, getdate, nowdate, today
 
 import erpnext
 from erpnext.accounts.doctype.account.test_account import create_account, get_inventory_account
+from erpnext.accounts.doctype.daily_account_balance.daily_account_balance import (
+	get_daily_account_balance_differences,
+	rebuild_daily_account_balances,
+)
 from erpnext.accounts.doctype.payment_entry.payment_entry import get_payment_entry
 from erpnext.buying.doctype.purchase_order.purchase_order import get_mapped_purchase_invoice
 from erpnext.buying.doctype.purchase_order.purchase_order import make_purchase_invoice as make_pi_from_po
@@ -1544,8 +1548,10 @@ class TestPurchaseInvoice(FrappeTestCase, StockTestMixin):
 		payment_entry.load_from_db()
 		self.assertEqual(payment_entry.taxes[0].allocated_amount, 0)
 
+	@change_settings("Accounts Settings", {"maintain_daily_account_balances": 1})
 	def test_provisional_accounting_entry(self):
 		setup_provisional_accounting()
+		rebuild_daily_account_balances()
 
 		pr = make_purchase_receipt(item_code="_Test Non Stock Item", posting_date=add_days(nowdate(), -2))
 
@@ -1584,6 +1590,8 @@ class TestPurchaseInvoice(FrappeTestCase, StockTestMixin):
 		]
 
 		check_gl_entries(self, pr.name, expected_gle_for_purchase_receipt_post_pi_cancel, pr.posting_date)
+		# the cancelled provisional entries are removed from the account balances
+		self.assertFalse(get_daily_account_balance_differences("_Test Company"))
 
 		toggle_provisional_accounting_setting()
 
@@ -13,7 +13,7 @@ from frappe.utils.data import comma_and
 from erpnext.accounts.utils import (
 	cancel_exchange_gain_loss_journal,
 	unlink_ref_doc_from_payment_entries,
-	update_voucher_outstanding,
+	update_voucher_outstandings,
 )
 
 
@@ -81,14 +81,18 @@ class UnreconcilePayment(Document):
 			doc = frappe.get_doc(alloc.reference_doctype, alloc.reference_name)
 			unlink_ref_doc_from_payment_entries(doc, self.voucher_no)
 			cancel_exchange_gain_loss_journal(doc, self.voucher_type, self.voucher_no)
-			update_voucher_outstanding(
-				alloc.reference_doctype, alloc.reference_name, alloc.account, alloc.party_type, alloc.party
-			)
 			if doc.doctype in frappe.get_hooks("advance_payment_doctypes"):
 				doc.set_total_advance_paid()
 
 			frappe.db.set_value("Unreconcile Payment Entries", alloc.name, "unlinked", True)
 
+		update_voucher_outstandings(
+			[
+				(alloc.reference_doctype, alloc.reference_name, alloc.account, alloc.party_type, alloc.party)
+				for alloc in self.allocations
+			]
+		)
+
 
 @frappe.whitelist()
 def doc_has_references(doctype: str | None = None, docname: str | None = None):
@@ -0,0 +1,42 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+
+from erpnext.accounts.doctype.payment_entry.payment_entry import get_payment_entry
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+	get_voucher_outstanding_differences,
+	rebuild_voucher_outstandings,
+)
+
+
+class TestVoucherOutstanding(FrappeTestCase):
+	@change_settings("Accounts Settings", {"maintain_voucher_outstandings": 1})
+	def test_outstanding_on_submit_and_cancel(self):
+		rebuild_voucher_outstandings()
+		self.assertTrue(frappe.db.get_single_value("Accounts Settings", "voucher_outstandings_built"))
+		self.assertFalse(get_voucher_outstanding_differences("_Test Company"))
+
+		si = create_sales_invoice(rate=100)
+		self.assertEqual(get_outstanding(si.name), 100)
+
+		pe = get_payment_entry("Sales Invoice", si.name, bank_account="_Test Bank - _TC", party_amount=40)
+		pe.insert().submit()
+		self.assertEqual(get_outstanding(si.name), 60)
+		self.assertFalse(get_voucher_outstanding_differences("_Test Company"))
+
+		pe.cancel()
+		self.assertEqual(get_outstanding(si.name), 100)
+
+		si.reload()
+		si.cancel()
+		self.assertFalse(frappe.db.exists("Voucher Outstanding", {"against_voucher_no": si.name}))
+		self.assertFalse(get_voucher_outstanding_differences("_Test Company"))
+
+
+def get_outstanding(against_voucher_no):
+	return frappe.db.get_value(
+		"Voucher Outstanding", {"against_voucher_no": against_voucher_no}, "outstanding"
+	)
@@ -0,0 +1,200 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.query_builder.functions import Count, Sum
+from frappe.utils import cint, create_batch, flt, getdate
+
+from erpnext.accounts.utils import get_currency_precision, upsert_ledger_balances
+
+BALANCE_KEY = (
+	"company",
+	"account",
+	"party_type",
+	"party",
+	"against_voucher_type",
+	"against_voucher_no",
+	"account_currency",
+)
+AMOUNT_FIELDS = ("outstanding", "outstanding_in_account_currency")
+
+
+class VoucherOutstanding(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		account: DF.Link | None
+		account_currency: DF.Link | None
+		against_voucher_no: DF.DynamicLink | None
+		against_voucher_type: DF.Link | None
+		company: DF.Link | None
+		outstanding: DF.Currency
+		outstanding_in_account_currency: DF.Currency
+		party: DF.DynamicLink | None
+		party_type: DF.Link | None
+		payment_ledger_entries: DF.Int
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Voucher Outstanding", ["against_voucher_no", "against_voucher_type"])
+	frappe.db.add_index("Voucher Outstanding", ["company", "party_type", "party"])
+
+
+def is_voucher_outstanding_enabled():
+	return cint(frappe.db.get_single_value("Accounts Settings", "maintain_voucher_outstandings", cache=True))
+
+
+def use_voucher_outstandings():
+	"""Reports compute the outstanding from the Payment Ledger till the snapshot is built"""
+	return is_voucher_outstanding_enabled() and cint(
+		frappe.db.get_single_value("Accounts Settings", "voucher_outstandings_built", cache=True)
+	)
+
+
+def get_outstandings_from_ple(against_voucher_nos=None, company=None):
+	"""Returns the outstanding of the active Payment Ledger Entries, by party account and against voucher"""
+	ple = frappe.qb.DocType("Payment Ledger Entry")
+	group_by_fields = [ple[fieldname] for fieldname in BALANCE_KEY]
+
+	query = (
+		frappe.qb.from_(ple)
+		.select(
+			*group_by_fields,
+			Sum(ple.amount).as_("outstanding"),
+			Sum(ple.amount_in_account_currency).as_("outstanding_in_account_currency"),
+			Count("*").as_("payment_ledger_entries"),
+		)
+		.where(ple.delinked == 0)
+		.groupby(*group_by_fields)
+	)
+
+	if against_voucher_nos:
+		query = query.where(ple.against_voucher_no.isin(against_voucher_nos))
+
+	if company:
+		query = query.where(ple.company == company)
+
+	# null and empty values are grouped separately by the database
+	outstandings = {}
+	for row in query.run(as_dict=True):
+		outstanding = outstandings.setdefault(
+			get_outstanding_key(row), dict.fromkeys((*AMOUNT_FIELDS, "payment_ledger_entries"), 0)
+		)
+		for fieldname in (*AMOUNT_FIELDS, "payment_ledger_entries"):
+			outstanding[fieldname] += flt(row[fieldname])
+
+	return outstandings
+
+
+def get_outstanding_key(row):
+	return tuple(row.get(fieldname) or None for fieldname in BALANCE_KEY)
+
+
+def refresh_voucher_outstandings(against_vouchers):
+	"""
+	Recompute the snapshot of the against vouchers, a list of (against_voucher_type, against_voucher_no),
+	from the Payment Ledger. To be called after their entries are posted, delinked or deleted.
+	"""
+	if not is_voucher_outstanding_enabled():
+		return
+
+	against_voucher_nos = sorted({d[1] for d in against_vouchers if d[1]})
+	for batch in create_batch(against_voucher_nos, 1000):
+		frappe.db.delete("Voucher Outstanding", {"against_voucher_no": ("in", batch)})
+		upsert_ledger_balances("Voucher Outstanding", BALANCE_KEY, get_outstandings_from_ple(batch))
+
+
+def get_open_against_vouchers(company, party_types, report_date):
+	"""
+	Returns the against vouchers which can have an outstanding as on `report_date`, from today onwards:
+	the ones with an outstanding in the snapshot and the ones with entries posted after `report_date`
+	"""
+	vo = frappe.qb.DocType("Voucher Outstanding")
+	open_vouchers = (
+		frappe.qb.from_(vo)
+		.select(vo.against_voucher_no)
+		.distinct()
+		.where(
+			(vo.company == company)
+			& vo.party_type.isin(party_types)
+			& ((vo.outstanding != 0) | (vo.outstanding_in_account_currency != 0))
+		)
+	).run(pluck=True)
+
+	ple = frappe.qb.DocType("Payment Ledger Entry")
+	future_vouchers = (
+		frappe.qb.from_(ple)
+		.select(ple.against_voucher_no)
+		.distinct()
+		.where(
+			(ple.company == company)
+			& ple.party_type.isin(party_types)
+			& (ple.delinked == 0)
+			& (ple.posting_date > getdate(report_date))
+		)
+	).run(pluck=True)
+
+	return set(open_vouchers) | set(future_vouchers)
+
+
+def rebuild_voucher_outstandings():
+	"""Rebuild the snapshot from scratch, reports read the Payment Ledger till this is done"""
+	frappe.db.set_single_value("Accounts Settings", "voucher_outstandings_built", 0)
+	frappe.db.delete("Voucher Outstanding")
+
+	if not is_voucher_outstanding_enabled():
+		return
+
+	upsert_ledger_balances("Voucher Outstanding", BALANCE_KEY, get_outstandings_from_ple())
+	frappe.db.set_single_value("Accounts Settings", "voucher_outstandings_built", 1)
+
+
+def get_voucher_outstanding_differences(company=None):
+	"""Returns the snapshot rows which do not match the Payment Ledger"""
+	precision = get_currency_precision()
+	expected_outstandings = get_outstandings_from_ple(company=company)
+	outstandings = {
+		get_outstanding_key(d): d
+		for d in frappe.get_all(
+			"Voucher Outstanding",
+			filters={"company": company} if company else {},
+			fields=[*BALANCE_KEY, *AMOUNT_FIELDS, "payment_ledger_entries"],
+		)
+	}
+
+	differences = []
+	for key in set(expected_outstandings) | set(outstandings):
+		expected, actual = expected_outstandings.get(key, {}), outstandings.get(key, {})
+		if any(
+			flt(expected.get(fieldname), precision) != flt(actual.get(fieldname), precision)
+			for fieldname in (*AMOUNT_FIELDS, "payment_ledger_entries")
+		):
+			differences.append(
+				frappe._dict(dict(zip(BALANCE_KEY, key, strict=True)), expected=expected, actual=actual)
+			)
+
+	return differences
+
+
+def check_voucher_outstandings():
+	"""Rebuild the snapshot if it has drifted from the Payment Ledger"""
+	if not use_voucher_outstandings():
+		return
+
+	differences = get_voucher_outstanding_differences()
+	if differences:
+		frappe.log_error(
+			title=_("Voucher Outstandings do not match the Payment Ledger"),
+			message=frappe.as_json(differences[:100]),
+		)
+		rebuild_voucher_outstandings()
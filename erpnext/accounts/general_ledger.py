@@ -18,6 +18,16 @@ from erpnext.accounts.doctype.accounting_dimension_filter.accounting_dimension_f
 )
 from erpnext.accounts.doctype.accounting_period.accounting_period import ClosedAccountingPeriod
 from erpnext.accounts.doctype.budget.budget import validate_expense_against_budget
+from erpnext.accounts.doctype.daily_account_balance.daily_account_balance import (
+	is_daily_account_balance_enabled,
+	update_daily_account_balances,
+)
+from erpnext.accounts.doctype.gl_entry.gl_entry import make_gl_entries_in_bulk
+from erpnext.accounts.doctype.monthly_account_balance.monthly_account_balance import (
+	is_monthly_account_balance_enabled,
+	update_monthly_account_balances,
+)
+from erpnext.accounts.posting_periods import get_closed_accounting_period, get_last_pcv_date
 from erpnext.accounts.utils import create_payment_ledger_entry
 from erpnext.exceptions import InvalidAccountDimensionError, MandatoryAccountDimensionError
 
@@ -37,14 +47,16 @@ def make_gl_entries(
 			validate_disabled_accounts(gl_map)
 			gl_map = process_gl_map(gl_map, merge_entries)
 			if gl_map and len(gl_map) > 1:
+				bulk = use_bulk_posting(gl_map)
 				create_payment_ledger_entry(
 					gl_map,
 					cancel=0,
 					adv_adj=adv_adj,
 					update_outstanding=update_outstanding,
 					from_repost=from_repost,
+					bulk=bulk,
 				)
-				save_entries(gl_map, adv_adj, update_outstanding, from_repost)
+				save_entries(gl_map, adv_adj, update_outstanding, from_repost, bulk=bulk)
 			# Post GL Map proccess there may no be any GL Entries
 			elif gl_map:
 				frappe.throw(
@@ -134,31 +146,15 @@ def validate_disabled_accounts(gl_map):
 
 
 def validate_accounting_period(gl_map):
-	accounting_periods = frappe.db.sql(
-		""" SELECT
-			ap.name as name
-		FROM
-			`tabAccounting Period` ap, `tabClosed Document` cd
-		WHERE
-			ap.name = cd.parent
-			AND ap.company = %(company)s
-			AND cd.closed = 1
-			AND cd.document_type = %(voucher_type)s
-			AND %(date)s between ap.start_date and ap.end_date
-			""",
-		{
-			"date": gl_map[0].posting_date,
-			"company": gl_map[0].company,
-			"voucher_type": gl_map[0].voucher_type,
-		},
-		as_dict=1,
+	accounting_period = get_closed_accounting_period(
+		gl_map[0].company, gl_map[0].posting_date, gl_map[0].voucher_type
 	)
 
-	if accounting_periods:
+	if accounting_period:
 		frappe.throw(
 			_(
 				"You cannot create or cancel any accounting entries with in the closed Accounting Period {0}"
-			).format(frappe.bold(accounting_periods[0].name)),
+			).format(frappe.bold(accounting_period)),
 			ClosedAccountingPeriod,
 		)
 
@@ -226,7 +222,8 @@ def get_cost_center_allocation_data(company, posting_date):
 
 
 def merge_similar_entries(gl_map, precision=None):
-	merged_gl_map = []
+	# entries by merge key, dicts preserve the order in which the heads are first seen
+	merged_entries = {}
 	accounting_dimensions = get_accounting_dimensions()
 	merge_properties = get_merge_properties(accounting_dimensions)
 
@@ -234,7 +231,7 @@ def merge_similar_entries(gl_map, precision=None):
 		entry.merge_key = get_merge_key(entry, merge_properties)
 		# if there is already an entry in this account then just add it
 		# to that entry
-		same_head = check_if_in_list(entry, merged_gl_map)
+		same_head = merged_entries.get(entry.merge_key)
 		if same_head:
 			same_head.debit = flt(same_head.debit) + flt(entry.debit)
 			same_head.debit_in_account_currency = flt(same_head.debit_in_account_currency) + flt(
@@ -251,7 +248,7 @@ def merge_similar_entries(gl_map, precision=None):
 				entry.credit_in_transaction_currency
 			)
 		else:
-			merged_gl_map.append(entry)
+			merged_entries[entry.merge_key] = entry
 
 	company = gl_map[0].company if gl_map else erpnext.get_default_company()
 	company_currency = erpnext.get_company_currency(company)
@@ -268,7 +265,7 @@ def merge_similar_entries(gl_map, precision=None):
 			and frappe.get_cached_value("Journal Entry", x.voucher_no, "voucher_type")
 			== "Exchange Gain Or Loss"
 		),
-		merged_gl_map,
+		merged_entries.values(),
 	)
 	merged_gl_map = list(merged_gl_map)
 
@@ -301,12 +298,6 @@ def get_merge_key(entry, merge_properties):
 	return tuple(merge_key)
 
 
-def check_if_in_list(gle, gl_map):
-	for e in gl_map:
-		if e.merge_key == gle.merge_key:
-			return e
-
-
 def toggle_debit_credit_if_negative(gl_map):
 	for entry in gl_map:
 		# toggle debit, credit if negative entry
@@ -368,7 +359,23 @@ def update_net_values(entry):
 			entry.debit_in_account_currency = 0
 
 
-def save_entries(gl_map, adv_adj, update_outstanding, from_repost=False):
+def use_bulk_posting(gl_map):
+	"""
+	Large GL maps are posted with multi-row inserts if enabled in Accounts Settings.
+	Apps hooking into GL Entry or Payment Ledger Entry events need the per entry path.
+	"""
+	if not cint(frappe.db.get_single_value("Accounts Settings", "bulk_gl_posting", cache=True)):
+		return False
+
+	threshold = cint(frappe.db.get_single_value("Accounts Settings", "bulk_gl_posting_threshold", cache=True))
+	if len(gl_map) < threshold:
+		return False
+
+	doc_events = frappe.get_hooks("doc_events")
+	return not any(doctype in doc_events for doctype in ("GL Entry", "Payment Ledger Entry"))
+
+
+def save_entries(gl_map, adv_adj, update_outstanding, from_repost=False, bulk=False):
 	if not from_repost:
 		validate_cwip_accounts(gl_map)
 
@@ -381,9 +388,61 @@ def save_entries(gl_map, adv_adj, update_outstanding, from_repost=False):
 		if gl_map[0]["voucher_type"] != "Period Closing Voucher":
 			validate_against_pcv(is_opening, gl_map[0]["posting_date"], gl_map[0]["company"])
 
+	if bulk:
+		for entry in gl_map:
+			validate_allowed_dimensions(entry, dimension_filter_map)
+
+		gl_entries = make_gl_entries_in_bulk(gl_map, adv_adj, update_outstanding, from_repost)
+		update_ledger_balances(gl_entries)
+		if not from_repost and gl_map[0]["voucher_type"] != "Period Closing Voucher":
+			validate_expense_against_budgets(gl_map)
+
+		return
+
+	gl_entries = []
 	for entry in gl_map:
 		validate_allowed_dimensions(entry, dimension_filter_map)
-		make_entry(entry, adv_adj, update_outstanding, from_repost)
+		gl_entries.append(make_entry(entry, adv_adj, update_outstanding, from_repost))
+
+	update_ledger_balances(gl_entries)
+
+
+def validate_expense_against_budgets(gl_map):
+	"""Validate the budgets once per budget head, after all the entries are posted"""
+	budget_fields = ["posting_date", "account", "project", "cost_center", *get_accounting_dimensions()]
+
+	validated = set()
+	for entry in gl_map:
+		key = tuple(entry.get(fieldname) for fieldname in budget_fields)
+		if key not in validated:
+			validated.add(key)
+			validate_expense_against_budget(entry)
+
+
+def update_ledger_balances(gl_entries, sign=1):
+	"""Add (or with `sign` -1, remove) the GL entries to the daily and monthly account balances"""
+	update_daily_account_balances(gl_entries, sign)
+	update_monthly_account_balances(gl_entries, sign)
+
+
+def remove_voucher_from_ledger_balances(voucher_type, voucher_no, criterion=None):
+	"""
+	Remove the active GL entries of the voucher (optionally, only the ones matching `criterion`)
+	from the account balances, to be called before they are cancelled or deleted.
+	"""
+	if not (is_daily_account_balance_enabled() or is_monthly_account_balance_enabled()):
+		return
+
+	gle = frappe.qb.DocType("GL Entry")
+	query = (
+		frappe.qb.from_(gle)
+		.select(gle.star)
+		.where((gle.voucher_type == voucher_type) & (gle.voucher_no == voucher_no) & (gle.is_cancelled == 0))
+	)
+	if criterion is not None:
+		query = query.where(criterion)
+
+	update_ledger_balances(query.run(as_dict=True), sign=-1)
 
 
 def make_entry(args, adv_adj, update_outstanding, from_repost=False):
@@ -399,6 +458,8 @@ def make_entry(args, adv_adj, update_outstanding, from_repost=False):
 	if not from_repost and gle.voucher_type != "Period Closing Voucher":
 		validate_expense_against_budget(args)
 
+	return gle
+
 
 def validate_cwip_accounts(gl_map):
 	"""Validate that CWIP account are not used in Journal Entry"""
@@ -623,24 +684,26 @@ def make_reverse_gl_entries(
 			# Only cancel GL entries for unlinked reference using `voucher_detail_no`
 			gle = frappe.qb.DocType("GL Entry")
 			for x in gl_entries:
+				criterion = (
+					(gle.company == x.company)
+					& (gle.account == x.account)
+					& (gle.party_type == x.party_type)
+					& (gle.party == x.party)
+					& (gle.voucher_type == x.voucher_type)
+					& (gle.voucher_no == x.voucher_no)
+					& (gle.against_voucher_type == x.against_voucher_type)
+					& (gle.against_voucher == x.against_voucher)
+					& (gle.voucher_detail_no == x.voucher_detail_no)
+				)
 				query = (
 					frappe.qb.update(gle)
 					.set(gle.modified, now())
 					.set(gle.modified_by, frappe.session.user)
-					.where(
-						(gle.company == x.company)
-						& (gle.account == x.account)
-						& (gle.party_type == x.party_type)
-						& (gle.party == x.party)
-						& (gle.voucher_type == x.voucher_type)
-						& (gle.voucher_no == x.voucher_no)
-						& (gle.against_voucher_type == x.against_voucher_type)
-						& (gle.against_voucher == x.against_voucher)
-						& (gle.voucher_detail_no == x.voucher_detail_no)
-					)
+					.where(criterion)
 				)
 
 				if not immutable_ledger_enabled:
+					remove_voucher_from_ledger_balances(x.voucher_type, x.voucher_no, criterion)
 					query = query.set(gle.is_cancelled, True)
 
 				query.run()
@@ -648,6 +711,7 @@ def make_reverse_gl_entries(
 			if not immutable_ledger_enabled:
 				set_as_cancel(gl_entries[0]["voucher_type"], gl_entries[0]["voucher_no"])
 
+		reverse_gl_entries = []
 		for entry in gl_entries:
 			new_gle = copy.deepcopy(entry)
 			new_gle["name"] = None
@@ -670,7 +734,9 @@ def make_reverse_gl_entries(
 				new_gle["posting_date"] = frappe.form_dict.get("posting_date") or getdate()
 
 			if new_gle["debit"] or new_gle["credit"]:
-				make_entry(new_gle, adv_adj, "Yes")
+				reverse_gl_entries.append(make_entry(new_gle, adv_adj, "Yes"))
+
+		update_ledger_balances(reverse_gl_entries)
 
 
 def check_freezing_date(posting_date, adv_adj=False):
@@ -682,10 +748,10 @@ def check_freezing_date(posting_date, adv_adj=False):
 	Hence stop admin to bypass if accounts are freezed
 	"""
 	if not adv_adj:
-		acc_frozen_upto = frappe.db.get_value("Accounts Settings", None, "acc_frozen_upto")
+		acc_frozen_upto = frappe.db.get_single_value("Accounts Settings", "acc_frozen_upto", cache=True)
 		if acc_frozen_upto:
-			frozen_accounts_modifier = frappe.db.get_value(
-				"Accounts Settings", None, "frozen_accounts_modifier"
+			frozen_accounts_modifier = frappe.db.get_single_value(
+				"Accounts Settings", "frozen_accounts_modifier", cache=True
 			)
 			if getdate(posting_date) <= getdate(acc_frozen_upto) and (
 				frozen_accounts_modifier not in frappe.get_roles() or frappe.session.user == "Administrator"
@@ -698,16 +764,14 @@ def check_freezing_date(posting_date, adv_adj=False):
 
 
 def validate_against_pcv(is_opening, posting_date, company):
-	if is_opening and frappe.db.exists("Period Closing Voucher", {"docstatus": 1, "company": company}):
+	last_pcv_date = get_last_pcv_date(company)
+
+	if is_opening and last_pcv_date:
 		frappe.throw(
 			_("Opening Entry can not be created after Period Closing Voucher is created."),
 			title=_("Invalid Opening Entry"),
 		)
 
-	last_pcv_date = frappe.db.get_value(
-		"Period Closing Voucher", {"docstatus": 1, "company": company}, "max(posting_date)"
-	)
-
 	if last_pcv_date and getdate(posting_date) <= getdate(last_pcv_date):
 		message = _("Books have been closed till the period ending on {0}").format(formatdate(last_pcv_date))
 		message += "</br >"
@@ -719,6 +783,7 @@ def set_as_cancel(voucher_type, voucher_no):
 	"""
 	Set is_cancelled=1 in all original gl entries for the voucher
 	"""
+	remove_voucher_from_ledger_balances(voucher_type, voucher_no)
 	frappe.db.sql(
 		"""UPDATE `tabGL Entry` SET is_cancelled = 1,
 		modified=%s, modified_by=%s
@@ -0,0 +1,275 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+from collections import defaultdict
+
+import frappe
+from frappe.model import no_value_fields
+from frappe.utils import cint, create_batch, cstr, flt, getdate, now
+
+import erpnext
+from erpnext.accounts.doctype.accounting_dimension_filter.accounting_dimension_filter import (
+	get_dimension_filter_map,
+)
+from erpnext.accounts.general_ledger import (
+	check_freezing_date,
+	make_acc_dimensions_offsetting_entry,
+	process_debit_credit_difference,
+	process_gl_map,
+	toggle_debit_credit_if_negative,
+	update_ledger_balances,
+	validate_accounting_period,
+	validate_against_pcv,
+	validate_allowed_dimensions,
+	validate_disabled_accounts,
+)
+from erpnext.accounts.utils import _delete_accounting_ledger_entries, compare_existing_and_expected_gle
+from erpnext.controllers.stock_controller import StockController
+from erpnext.stock.reposting_metrics import get_repost_metrics
+
+# fields which are not compared while matching the expected entries with the existing ones
+IGNORED_FIELDS = ("to_rename", "is_cancelled")
+
+
+def use_gl_diff_reposting():
+	"""
+	Post only the changed GL entries of stock vouchers while reposting, if enabled in Stock Reposting
+	Settings. Apps hooking into GL Entry events need the entries to be posted one by one.
+	"""
+	if not cint(
+		frappe.db.get_single_value("Stock Reposting Settings", "repost_changed_gl_entries_only", cache=True)
+	):
+		return False
+
+	return "GL Entry" not in frappe.get_hooks("doc_events")
+
+
+def repost_gl_entries_in_bulk(stock_vouchers, warehouse_account, precision):
+	"""
+	Compare the expected GL entries of a batch of stock vouchers with the existing ones and write only
+	the entries which differ, with multi-row inserts, updates and deletes for the whole batch.
+
+	Vouchers posting to the Payment Ledger or posting GL entries their own way are reposted as before,
+	by deleting and posting all their entries again.
+
+	Returns the number of vouchers whose entries were changed.
+	"""
+	metrics = get_repost_metrics()
+	existing_entries = get_existing_gl_entries(stock_vouchers)
+	vouchers_with_ple = get_vouchers_with_payment_ledger_entries(stock_vouchers)
+	changes = frappe._dict(inserts=[], updates=[], deletes=[])
+	modified_vouchers = 0
+
+	for voucher_type, voucher_no in stock_vouchers:
+		with metrics.section("gl_entries"):
+			existing_gle = existing_entries.get((voucher_type, voucher_no), [])
+			voucher_obj = frappe.get_doc(voucher_type, voucher_no)
+			# Some transactions post credit as negative debit, this is handled while posting GLE
+			# but while comparing we need to make sure it's flipped so comparisons are accurate
+			expected_gle = toggle_debit_credit_if_negative(voucher_obj.get_gl_entries(warehouse_account))
+
+			if (
+				expected_gle
+				and existing_gle
+				and compare_existing_and_expected_gle(existing_gle, expected_gle, precision)
+			):
+				continue
+
+			if not expected_gle:
+				if existing_gle:
+					modified_vouchers += 1
+				_delete_accounting_ledger_entries(voucher_type, voucher_no)
+				continue
+
+			modified_vouchers += 1
+			expected_entries = None
+			if can_diff_gl_entries(voucher_obj, vouchers_with_ple):
+				expected_entries = get_expected_gl_entries(expected_gle)
+
+			if expected_entries and not has_payment_ledger_accounts(expected_entries):
+				add_gl_entry_changes(changes, existing_gle, expected_entries, precision)
+			else:
+				_delete_accounting_ledger_entries(voucher_type, voucher_no)
+				voucher_obj.make_gl_entries(gl_entries=expected_gle, from_repost=True)
+
+	with metrics.section("gl_entries"):
+		apply_gl_entry_changes(changes)
+
+	metrics.incr("gl_vouchers_reposted", modified_vouchers)
+	metrics.incr("gl_entries_written", len(changes.inserts) + len(changes.updates) + len(changes.deletes))
+
+	return modified_vouchers
+
+
+def get_existing_gl_entries(stock_vouchers):
+	gle = frappe.qb.DocType("GL Entry")
+	gl_entries = defaultdict(list)
+
+	for batch in create_batch([d[1] for d in stock_vouchers], 1000):
+		for entry in (
+			frappe.qb.from_(gle).select(gle.star).where(gle.voucher_no.isin(batch) & (gle.is_cancelled == 0))
+		).run(as_dict=True):
+			gl_entries[(entry.voucher_type, entry.voucher_no)].append(entry)
+
+	return gl_entries
+
+
+def get_vouchers_with_payment_ledger_entries(stock_vouchers):
+	ple = frappe.qb.DocType("Payment Ledger Entry")
+	vouchers = set()
+
+	for batch in create_batch([d[1] for d in stock_vouchers], 1000):
+		vouchers.update(
+			(
+				frappe.qb.from_(ple)
+				.select(ple.voucher_type, ple.voucher_no)
+				.distinct()
+				.where(ple.voucher_no.isin(batch))
+			).run()
+		)
+
+	return vouchers
+
+
+def can_diff_gl_entries(voucher_obj, vouchers_with_ple):
+	"""Only the vouchers posting their GL map as is, through `StockController.make_gl_entries`"""
+	return (
+		type(voucher_obj).make_gl_entries is StockController.make_gl_entries
+		and (voucher_obj.doctype, voucher_obj.name) not in vouchers_with_ple
+		and cint(erpnext.is_perpetual_inventory_enabled(voucher_obj.company))
+	)
+
+
+def has_payment_ledger_accounts(gl_entries):
+	return any(
+		frappe.get_cached_value("Account", gle.account, "account_type") in ("Receivable", "Payable")
+		for gle in gl_entries
+	)
+
+
+def get_expected_gl_entries(gl_map):
+	"""
+	Returns the GL entries `make_gl_entries` would post for the GL map while reposting, as unsaved
+	documents, after running the same validations
+	"""
+	make_acc_dimensions_offsetting_entry(gl_map)
+	validate_accounting_period(gl_map)
+	validate_disabled_accounts(gl_map)
+	gl_map = process_gl_map(gl_map)
+	if len(gl_map) < 2:
+		# posted as before, to raise the usual error
+		return
+
+	process_debit_credit_difference(gl_map)
+	check_freezing_date(gl_map[0]["posting_date"])
+	validate_against_pcv(
+		any(d.get("is_opening") == "Yes" for d in gl_map), gl_map[0]["posting_date"], gl_map[0]["company"]
+	)
+
+	dimension_filter_map = get_dimension_filter_map()
+	entries = []
+	for args in gl_map:
+		validate_allowed_dimensions(args, dimension_filter_map)
+
+		gle = frappe.new_doc("GL Entry")
+		gle.update(args)
+		gle.flags.from_repost = True
+		gle.docstatus = 1
+		gle.validate()
+		entries.append(gle)
+
+	return entries
+
+
+def add_gl_entry_changes(changes, existing_gle, expected_entries, precision):
+	"""
+	Match the expected entries with the existing ones on all the fields but the amounts, the matched
+	entries with different amounts are updated, the rest are inserted or deleted
+	"""
+	key_fields, amount_fields = get_compared_fields()
+
+	existing_by_key = defaultdict(list)
+	for entry in existing_gle:
+		existing_by_key[get_gl_entry_key(entry, key_fields)].append(entry)
+
+	for gle in expected_entries:
+		matches = existing_by_key.get(get_gl_entry_key(gle, key_fields))
+		if not matches:
+			changes.inserts.append(gle)
+			continue
+
+		entry = matches.pop(0)
+		if any(flt(gle.get(field), precision) != flt(entry.get(field), precision) for field in amount_fields):
+			changes.updates.append((entry, gle))
+
+	for entries in existing_by_key.values():
+		changes.deletes.extend(entries)
+
+
+def get_compared_fields():
+	meta = frappe.get_meta("GL Entry")
+	key_fields, amount_fields = [], []
+	for df in meta.fields:
+		if df.fieldtype in no_value_fields or df.fieldname in IGNORED_FIELDS:
+			continue
+
+		if df.fieldtype in ("Currency", "Float"):
+			amount_fields.append(df.fieldname)
+		else:
+			key_fields.append(df)
+
+	return key_fields, amount_fields
+
+
+def get_gl_entry_key(entry, key_fields):
+	key = []
+	for df in key_fields:
+		value = entry.get(df.fieldname)
+		if df.fieldtype == "Date":
+			value = getdate(value) if value else None
+		elif df.fieldtype in ("Check", "Int"):
+			value = cint(value)
+		else:
+			value = cstr(value)
+
+		key.append(value)
+
+	return tuple(key)
+
+
+def apply_gl_entry_changes(changes):
+	_, amount_fields = get_compared_fields()
+	modified = now()
+
+	if changes.deletes:
+		update_ledger_balances(changes.deletes, sign=-1)
+		for batch in create_batch([d.name for d in changes.deletes], 1000):
+			frappe.db.delete("GL Entry", {"name": ("in", batch)})
+
+	if changes.updates:
+		update_ledger_balances([entry for entry, _gle in changes.updates], sign=-1)
+		frappe.db.bulk_update(
+			"GL Entry",
+			{
+				entry.name: {field: gle.get(field) for field in amount_fields}
+				for entry, gle in changes.updates
+			},
+			chunk_size=500,
+			modified=modified,
+		)
+		update_ledger_balances(
+			[
+				frappe._dict(entry, **{field: gle.get(field) for field in amount_fields})
+				for entry, gle in changes.updates
+			]
+		)
+
+	if changes.inserts:
+		for gle in changes.inserts:
+			gle.set_new_name()
+			gle.set_user_and_timestamp()
+
+		values = [gle.get_valid_dict(convert_dates_to_str=True) for gle in changes.inserts]
+		fields = list(values[0])
+		frappe.db.bulk_insert("GL Entry", fields, [[d.get(field) for field in fields] for d in values])
+		update_ledger_balances(changes.inserts)
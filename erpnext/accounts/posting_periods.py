@@ -0,0 +1,164 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+from bisect import bisect_right
+
+import frappe
+from frappe.query_builder import DocType
+from frappe.query_builder.functions import Max
+from frappe.utils import getdate
+from pypika import Order
+from pypika.terms import ExistsCriterion
+
+PERIOD_INDEX_KEY = "posting_period_index"
+
+
+def get_period_index(company=None):
+	"""
+	Returns the periods checked while posting to the ledger for `company`, cached till a Fiscal Year,
+	Accounting Period or Period Closing Voucher changes:
+
+	- fiscal_years: active fiscal years, latest first
+	- fiscal_year_intervals and accounting_periods: intervals sorted by start date, for `find_interval`
+	- last_pcv_date: posting date of the last submitted Period Closing Voucher
+	"""
+	index = frappe.cache().hget(PERIOD_INDEX_KEY, company or "")
+	if index is None:
+		index = build_period_index(company)
+		frappe.cache().hset(PERIOD_INDEX_KEY, company or "", index)
+
+	return index
+
+
+def build_period_index(company=None):
+	fiscal_years = get_active_fiscal_years(company)
+	index = frappe._dict(
+		fiscal_years=fiscal_years,
+		fiscal_year_intervals=make_intervals(
+			[(fy.year_start_date, fy.year_end_date, fy) for fy in reversed(fiscal_years)]
+		),
+		accounting_periods=make_intervals([]),
+		last_pcv_date=None,
+	)
+
+	if company:
+		index.accounting_periods = make_intervals(
+			[(d.start_date, d.end_date, d) for d in get_accounting_periods(company)]
+		)
+
+		pcv = DocType("Period Closing Voucher")
+		last_pcv_date = (
+			frappe.qb.from_(pcv)
+			.select(Max(pcv.posting_date))
+			.where((pcv.docstatus == 1) & (pcv.company == company))
+		).run()[0][0]
+		index.last_pcv_date = getdate(last_pcv_date) if last_pcv_date else None
+
+	return index
+
+
+def get_active_fiscal_years(company=None):
+	FY = DocType("Fiscal Year")
+	query = frappe.qb.from_(FY).select(FY.name, FY.year_start_date, FY.year_end_date).where(FY.disabled == 0)
+
+	if company:
+		FYC = DocType("Fiscal Year Company")
+		query = query.where(
+			ExistsCriterion(frappe.qb.from_(FYC).select(FYC.name).where(FYC.parent == FY.name)).negate()
+			| ExistsCriterion(
+				frappe.qb.from_(FYC)
+				.select(FYC.company)
+				.where(FYC.parent == FY.name)
+				.where(FYC.company == company)
+			)
+		)
+
+	return query.orderby(FY.year_start_date, order=Order.desc).run(as_dict=True)
+
+
+def get_accounting_periods(company):
+	"""Returns the accounting periods of the company with the set of doctypes closed in each of them"""
+	ap = DocType("Accounting Period")
+	cd = DocType("Closed Document")
+	rows = (
+		frappe.qb.from_(ap)
+		.left_join(cd)
+		.on((cd.parent == ap.name) & (cd.parenttype == "Accounting Period") & (cd.closed == 1))
+		.select(ap.name, ap.start_date, ap.end_date, cd.document_type)
+		.where(ap.company == company)
+	).run(as_dict=True)
+
+	accounting_periods = {}
+	for row in rows:
+		period = accounting_periods.setdefault(
+			row.name,
+			frappe._dict(
+				name=row.name, start_date=row.start_date, end_date=row.end_date, closed_doctypes=set()
+			),
+		)
+		if row.document_type:
+			period.closed_doctypes.add(row.document_type)
+
+	return list(accounting_periods.values())
+
+
+def make_intervals(intervals):
+	"""
+	Returns (start, end, value) intervals sorted by start date, along with their start dates and the
+	latest end date of the intervals till each of them for binary search
+	"""
+	intervals = sorted(
+		((getdate(start), getdate(end), value) for start, end, value in intervals), key=lambda d: d[0]
+	)
+
+	max_ends, max_end = [], None
+	for _start, end, _value in intervals:
+		max_end = end if max_end is None else max(max_end, end)
+		max_ends.append(max_end)
+
+	return frappe._dict(intervals=intervals, starts=[d[0] for d in intervals], max_ends=max_ends)
+
+
+def find_interval(intervals, date):
+	"""Returns the value of the latest starting interval which includes `date`"""
+	date = getdate(date)
+	i = bisect_right(intervals.starts, date) - 1
+
+	# intervals starting earlier can only include the date if one of them ends after it
+	while i >= 0 and intervals.max_ends[i] >= date:
+		_start, end, value = intervals.intervals[i]
+		if end >= date:
+			return value
+		i -= 1
+
+
+def find_fiscal_year(date, company=None):
+	return find_interval(get_period_index(company).fiscal_year_intervals, date)
+
+
+def get_closed_accounting_period(company, date, doctype):
+	"""Returns the name of the accounting period in which `doctype` is closed for `date`"""
+	if not date:
+		return
+
+	accounting_period = find_interval(get_period_index(company).accounting_periods, date)
+	if accounting_period and doctype in accounting_period.closed_doctypes:
+		return accounting_period.name
+
+
+def get_last_pcv_date(company):
+	return get_period_index(company).last_pcv_date
+
+
+def clear_period_index():
+	"""
+	Clear the index now for the current transaction, and again once it is committed (or rolled back)
+	in case it was rebuilt meanwhile from the data it changes
+	"""
+	frappe.cache().delete_value(PERIOD_INDEX_KEY)
+	frappe.db.after_commit.add(clear_cached_period_index)
+	frappe.db.after_rollback.add(clear_cached_period_index)
+
+
+def clear_cached_period_index():
+	frappe.cache().delete_value(PERIOD_INDEX_KEY)
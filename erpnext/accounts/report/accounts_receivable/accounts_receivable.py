@@ -14,6 +14,10 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimension_with_children,
 )
+from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+	get_open_against_vouchers,
+	use_voucher_outstandings,
+)
 from erpnext.accounts.utils import get_currency_precision, get_party_types_from_account_type
 
 #  This report gives a summary of all Outstanding Invoices considering the following
@@ -30,6 +34,7 @@ from erpnext.accounts.utils import get_currency_precision, get_party_types_from_
 #  8. Invoice details like Sales Persons, Delivery Notes are also fetched comma separated
 #  9. Report amounts are in party currency if in_party_currency is selected, otherwise company currency
 # 10. This report is based on Payment Ledger Entries
+# 11. When run as on today, only the vouchers with an outstanding in the Voucher Outstanding snapshot are read
 
 
 def execute(filters=None):
@@ -85,6 +90,9 @@ class ReceivablePayableReport:
 				self.skip_total_row = 1
 
 	def get_data(self):
+		# Get return entries
+		self.get_return_entries()
+
 		self.get_ple_entries()
 		self.get_sales_invoices_or_customers_based_on_sales_person()
 		self.voucher_balance = OrderedDict()
@@ -99,9 +107,6 @@ class ReceivablePayableReport:
 		# fetch future payments against invoices
 		self.get_future_payments()
 
-		# Get return entries
-		self.get_return_entries()
-
 		# Get Exchange Rate Revaluations
 		self.get_exchange_rate_revaluations()
 
@@ -800,6 +805,19 @@ class ReceivablePayableReport:
 			else:
 				query = query.select(ple.remarks)
 
+		if self.use_voucher_outstandings():
+			# settled vouchers are skipped, the entries of open credit notes are moved to the original
+			# invoice, which is read even if it is settled on its own
+			open_vouchers = get_open_against_vouchers(
+				self.filters.company, self.party_type, self.filters.report_date
+			)
+			open_vouchers |= {self.return_entries[v] for v in open_vouchers if self.return_entries.get(v)}
+			if not open_vouchers:
+				self.ple_entries = []
+				return
+
+			query = query.where(ple.against_voucher_no.isin(list(open_vouchers)))
+
 		if self.filters.get("group_by_party"):
 			query = query.orderby(self.ple.party, self.ple.posting_date)
 		else:
@@ -807,6 +825,14 @@ class ReceivablePayableReport:
 
 		self.ple_entries = query.run(as_dict=True)
 
+	def use_voucher_outstandings(self):
+		# the snapshot holds the current outstanding, revaluation needs the settled vouchers as well
+		return (
+			self.filters.report_date >= getdate(nowdate())
+			and not self.filters.get("for_revaluation_journals")
+			and use_voucher_outstandings()
+		)
+
 	def get_sales_invoices_or_customers_based_on_sales_person(self):
 		if self.filters.get("sales_person"):
 			lft, rgt = frappe.db.get_value("Sales Person", self.filters.get("sales_person"), ["lft", "rgt"])
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import frappe
 from frappe import qb
 from frappe.tests.utils import FrappeTestCase, change_settings
@@ -5,6 +7,7 @@ from frappe.utils import add_days, flt, getdate, today
 
 from erpnext.accounts.doctype.payment_entry.payment_entry import get_payment_entry
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import rebuild_voucher_outstandings
 from erpnext.accounts.report.accounts_receivable.accounts_receivable import execute
 from erpnext.accounts.test.accounts_mixin import AccountsTestMixin
 from erpnext.selling.doctype.sales_order.test_sales_order import make_sales_order
@@ -1023,3 +1026,60 @@ class TestAccountsReceivable(AccountsTestMixin, FrappeTestCase):
 		self.assertEqual(len(report[1]), 1)
 		row = report[1][0]
 		self.assertEqual(expected_data_after_payment, [row.voucher_no, row.cost_center, row.outstanding])
+
+	@change_settings("Accounts Settings", {"maintain_voucher_outstandings": 1})
+	def test_report_from_voucher_outstandings(self):
+		rebuild_voucher_outstandings()
+		filters = {
+			"company": self.company,
+			"report_date": today(),
+			"range1": 30,
+			"range2": 60,
+			"range3": 90,
+			"range4": 120,
+		}
+
+		settled_si = self.create_sales_invoice(no_payment_schedule=True)
+		pe = get_payment_entry("Sales Invoice", settled_si.name, bank_account=self.cash)
+		pe.paid_from = self.debit_to
+		pe.insert().submit()
+
+		si = self.create_sales_invoice(no_payment_schedule=True)
+		self.create_payment_entry(si.name)
+
+		# settled invoice is not read from the payment ledger
+		report = execute(filters)
+		self.assertEqual([(row.voucher_no, row.outstanding) for row in report[1]], [(si.name, 60)])
+
+		# historical dates are computed from the payment ledger
+		filters["report_date"] = add_days(today(), -1)
+		self.assertFalse(execute(filters)[1])
+
+	@change_settings("Accounts Settings", {"maintain_voucher_outstandings": 1})
+	def test_refund_against_credit_note_from_voucher_outstandings(self):
+		rebuild_voucher_outstandings()
+		filters = {
+			"company": self.company,
+			"report_date": today(),
+			"range1": 30,
+			"range2": 60,
+			"range3": 90,
+			"range4": 120,
+		}
+
+		# the invoice is settled by the credit note, the refund against the note is moved onto it
+		si = self.create_sales_invoice(no_payment_schedule=True)
+		cr_note = self.create_credit_note(si.name)
+		pe = get_payment_entry(cr_note.doctype, cr_note.name, bank_account=self.cash)
+		pe.insert().submit()
+
+		def get_outstandings(use_voucher_outstandings=True):
+			with patch(
+				"erpnext.accounts.report.accounts_receivable.accounts_receivable.use_voucher_outstandings",
+				return_value=use_voucher_outstandings,
+			):
+				return sorted((row.voucher_no, row.outstanding) for row in execute(filters)[1])
+
+		outstandings = get_outstandings()
+		self.assertIn(si.name, [voucher_no for voucher_no, _outstanding in outstandings])
+		self.assertEqual(outstandings, get_outstandings(use_voucher_outstandings=False))
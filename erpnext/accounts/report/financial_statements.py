@@ -14,6 +14,10 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimension_with_children,
 )
+from erpnext.accounts.doctype.monthly_account_balance.monthly_account_balance import (
+	get_monthly_account_balances_upto,
+	use_monthly_account_balances,
+)
 from erpnext.accounts.report.utils import convert_to_presentation_currency, get_currency
 from erpnext.accounts.utils import get_fiscal_year
 
@@ -187,6 +191,7 @@ def get_data(
 			gl_entries_by_account,
 			ignore_closing_entries=ignore_closing_entries,
 			root_type=root_type,
+			period_list=period_list,
 		)
 
 	calculate_values(
@@ -426,6 +431,7 @@ def set_gl_entries_by_account(
 	ignore_closing_entries=False,
 	ignore_opening_entries=False,
 	root_type=None,
+	period_list=None,
 ):
 	"""Returns a dict like { "account": [gl entries], ... }"""
 	gl_entries = []
@@ -480,6 +486,20 @@ def set_gl_entries_by_account(
 				from_date = add_days(last_period_closing_voucher[0].posting_date, 1)
 				ignore_opening_entries = True
 
+		monthly_balances_upto = get_monthly_balances_upto_for_report(from_date, to_date, period_list)
+		if monthly_balances_upto:
+			gl_entries += get_accounting_entries(
+				"Monthly Account Balance",
+				from_date,
+				add_days(monthly_balances_upto, -1),
+				accounts_list,
+				filters,
+				ignore_closing_entries,
+				ignore_opening_entries=ignore_opening_entries,
+			)
+			# entries of the open period
+			from_date = monthly_balances_upto
+
 		gl_entries += get_accounting_entries(
 			"GL Entry",
 			from_date,
@@ -499,6 +519,28 @@ def set_gl_entries_by_account(
 		return gl_entries_by_account
 
 
+def get_monthly_balances_upto_for_report(from_date, to_date, period_list):
+	"""
+	Returns the date before which the entries can be read from the Monthly Account Balances, which are
+	dated on the first day of their month. None if the periods of the report do not start on a month.
+	"""
+	if not period_list or not use_monthly_account_balances():
+		return
+
+	period_boundaries = [from_date, period_list[0].year_start_date]
+	for period in period_list:
+		period_boundaries.append(period.from_date)
+		if period is not period_list[-1]:
+			period_boundaries.append(add_days(period.to_date, 1))
+
+	if any(date and getdate(date).day != 1 for date in period_boundaries):
+		return
+
+	upto = min(get_monthly_account_balances_upto(), get_first_day(add_days(to_date, 1)))
+	if not from_date or getdate(from_date) < upto:
+		return upto
+
+
 def get_accounting_entries(
 	doctype,
 	from_date,
@@ -528,6 +570,17 @@ def get_accounting_entries(
 		query = query.where(gl_entry.is_cancelled == 0)
 		query = query.where(gl_entry.posting_date <= to_date)
 
+		if ignore_opening_entries:
+			query = query.where(gl_entry.is_opening == "No")
+	elif doctype == "Monthly Account Balance":
+		query = query.select(
+			gl_entry.period_start_date.as_("posting_date"), gl_entry.is_opening, gl_entry.fiscal_year
+		)
+		query = query.where(gl_entry.period_start_date <= to_date)
+
+		if from_date:
+			query = query.where(gl_entry.period_start_date >= from_date)
+
 		if ignore_opening_entries:
 			query = query.where(gl_entry.is_opening == "No")
 	else:
@@ -215,6 +215,38 @@ frappe.query_reports["General Ledger"] = {
 			fieldtype: "Check",
 		},
 	],
+
+	onload: function (report) {
+		report.page.add_inner_button(__("Export in Background"), function () {
+			frappe.prompt(
+				{
+					fieldname: "file_format",
+					label: __("File Format"),
+					fieldtype: "Select",
+					options: ["CSV", "Excel"],
+					default: "CSV",
+					reqd: 1,
+				},
+				(values) => {
+					frappe.call({
+						method: "erpnext.accounts.report.general_ledger.general_ledger.export_general_ledger",
+						args: {
+							filters: report.get_filter_values(true),
+							file_format: values.file_format,
+						},
+						callback: function () {
+							frappe.show_alert({
+								message: __("You will be notified when the file is ready to download"),
+								indicator: "blue",
+							});
+						},
+					});
+				},
+				__("Export General Ledger"),
+				__("Export")
+			);
+		});
+	},
 };
 
 erpnext.utils.add_dimensions("General Ledger", 15);
@@ -3,10 +3,14 @@
 
 
 import copy
+import csv
+import hashlib
 from collections import OrderedDict
 
 import frappe
+import openpyxl
 from frappe import _, _dict
+from frappe.desk.doctype.notification_log.notification_log import make_notification_logs
 from frappe.query_builder import Criterion
 from frappe.utils import cstr, getdate
 
@@ -16,14 +20,26 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_dimension_with_children,
 )
 from erpnext.accounts.report.financial_statements import get_cost_centers_with_children
-from erpnext.accounts.report.utils import convert_to_presentation_currency, get_currency
+from erpnext.accounts.report.utils import convert_to_presentation_currency, get_currency, get_rate_as_at
 from erpnext.accounts.utils import get_account_currency
 
+XLSX_MAX_ROWS = 1048576
+
 
 def execute(filters=None):
 	if not filters:
 		return [], []
 
+	filters, account_details = prepare_filters(filters)
+
+	columns = get_columns(filters)
+
+	res = get_result(filters, account_details)
+
+	return columns, res
+
+
+def prepare_filters(filters):
 	account_details = {}
 
 	if filters and filters.get("print_in_account_currency") and not filters.get("account"):
@@ -41,11 +57,7 @@ def execute(filters=None):
 
 	filters = set_account_currency(filters)
 
-	columns = get_columns(filters)
-
-	res = get_result(filters, account_details)
-
-	return columns, res
+	return filters, account_details
 
 
 def validate_filters(filters, account_details):
@@ -147,8 +159,223 @@ def get_result(filters, account_details):
 	return result
 
 
+def get_streamed_result(filters):
+	"""
+	Yields the rows of `get_result` while the GL entries are read with an unbuffered cursor, so that the
+	entries are never held in memory. Entries are read ordered by their group, hence the groups are
+	ordered by their name instead of by their first posting.
+
+	No queries can be run till all the rows are consumed.
+	"""
+	accounting_dimensions = []
+	if filters.get("include_dimensions"):
+		accounting_dimensions = get_accounting_dimensions()
+
+	conditions = get_conditions(filters)
+	group_by_voucher_consolidated = filters.get("group_by") == "Group by Voucher (Consolidated)"
+
+	# opening entries are read first in every group, so that the opening of the group is known
+	# before its first entry is written
+	opening_condition = "posting_date < %(from_date)s"
+	if not filters.get("show_opening_entries"):
+		opening_condition += " or is_opening = 'Yes'"
+
+	consolidation_key_fields = get_consolidation_key_fields(filters, accounting_dimensions)
+	if group_by_voucher_consolidated:
+		order_by_fields = consolidation_key_fields
+	else:
+		group_by = group_by_field(filters.get("group_by"))
+		order_by_fields = [
+			group_by,
+			f"({opening_condition}) desc",
+			*[field for field in get_order_by_fields(filters) if field != group_by],
+		]
+
+	account_currencies = None
+	if filters.get("presentation_currency"):
+		currency_map = get_currency(filters)
+		account_currencies = frappe.db.sql_list(
+			f"""select distinct account_currency from `tabGL Entry`
+			where company=%(company)s {conditions}""",
+			filters,
+		)
+		# the exchange rate is memoised before the cursor is opened
+		get_rate_as_at(
+			currency_map["report_date"],
+			currency_map["presentation_currency"],
+			currency_map["company_currency"],
+		)
+
+	def convert(gl_entries):
+		if filters.get("presentation_currency"):
+			return convert_to_presentation_currency(gl_entries, currency_map, account_currencies)
+
+		return gl_entries
+
+	account_type_map = {}
+	if filters.get("show_net_values_in_party_account"):
+		account_type_map = get_account_type_map(filters.get("company"))
+
+	inv_details = get_supplier_invoice_details()
+	totals_dict = get_totals_dict()
+
+	totals = copy.deepcopy(totals_dict)
+	for gle in convert(
+		frappe.db.sql(
+			f"""
+			select account_currency, sum(debit) as debit, sum(credit) as credit,
+				sum(debit_in_account_currency) as debit_in_account_currency,
+				sum(credit_in_account_currency) as credit_in_account_currency
+			from `tabGL Entry`
+			where company=%(company)s {conditions} and ({opening_condition})
+			group by account_currency""",
+			filters,
+			as_dict=1,
+		)
+	):
+		add_to_totals(totals, "opening", gle, filters, account_type_map)
+		add_to_totals(totals, "closing", gle, filters, account_type_map)
+
+	def get_rows(gl_entries):
+		yield totals.opening
+
+		if group_by_voucher_consolidated:
+			yield from get_consolidated_rows(gl_entries)
+		else:
+			yield from get_grouped_rows(gl_entries)
+			yield {"debit_in_transaction_currency": None, "credit_in_transaction_currency": None}
+
+		yield totals.total
+		yield totals.closing
+
+	def get_grouped_rows(gl_entries):
+		group_by_value, group_totals, has_entries = None, None, False
+
+		for gle in gl_entries:
+			if group_totals is None or gle.get(group_by) != group_by_value:
+				if has_entries:
+					yield from get_group_closing_rows(group_totals)
+
+				group_by_value = gle.get(group_by)
+				group_totals, has_entries = copy.deepcopy(totals_dict), False
+
+			if is_opening_entry(gle):
+				add_to_totals(group_totals, "opening", gle, filters, account_type_map)
+				add_to_totals(group_totals, "closing", gle, filters, account_type_map)
+			elif is_period_entry(gle):
+				if not has_entries:
+					has_entries = True
+					yield {"debit_in_transaction_currency": None, "credit_in_transaction_currency": None}
+					if filters.get("group_by") != "Group by Voucher":
+						yield group_totals.opening
+
+				for key in ("total", "closing"):
+					add_to_totals(group_totals, key, gle, filters, account_type_map)
+					add_to_totals(totals, key, gle, filters, account_type_map)
+
+				yield gle
+
+		if has_entries:
+			yield from get_group_closing_rows(group_totals)
+
+	def get_group_closing_rows(group_totals):
+		yield group_totals.total
+		if filters.get("group_by") != "Group by Voucher":
+			yield group_totals.closing
+
+	def get_consolidated_rows(gl_entries):
+		# entries with the same key are read one after another, only the last key is held
+		consolidated_gle = {}
+
+		for gle in gl_entries:
+			if is_opening_entry(gle) or not is_period_entry(gle):
+				continue
+
+			key = tuple(gle.get(field) for field in consolidation_key_fields)
+			if key in consolidated_gle:
+				add_to_totals(consolidated_gle, key, gle, filters, account_type_map)
+				continue
+
+			yield from get_consolidated_gles(consolidated_gle)
+			consolidated_gle = {key: gle}
+
+		yield from get_consolidated_gles(consolidated_gle)
+
+	def get_consolidated_gles(consolidated_gle):
+		for value in consolidated_gle.values():
+			add_to_totals(totals, "total", value, filters, account_type_map)
+			add_to_totals(totals, "closing", value, filters, account_type_map)
+			yield value
+
+	from_date, to_date = getdate(filters.from_date), getdate(filters.to_date)
+	show_opening_entries = filters.get("show_opening_entries")
+
+	def is_opening_entry(gle):
+		return gle.posting_date < from_date or (cstr(gle.is_opening) == "Yes" and not show_opening_entries)
+
+	def is_period_entry(gle):
+		return gle.posting_date <= to_date or (cstr(gle.is_opening) == "Yes" and show_opening_entries)
+
+	query = get_gl_entries_query(filters, accounting_dimensions, conditions, order_by_fields)
+	with frappe.db.unbuffered_cursor():
+		gl_entries = (convert([gle])[0] for gle in frappe.db.sql(query, filters, as_dict=1, as_iterator=True))
+
+		balance = 0
+		for d in get_rows(gl_entries):
+			if not d.get("posting_date"):
+				balance = 0
+
+			balance = get_balance(d, balance, "debit", "credit")
+			d["balance"] = balance
+
+			d["account_currency"] = filters.account_currency
+			d["bill_no"] = inv_details.get(d.get("against_voucher"), "")
+
+			yield d
+
+
+def get_consolidation_key_fields(filters, accounting_dimensions):
+	"""Entries with the same values for these fields are shown as one when grouped by Voucher (Consolidated)"""
+	fields = ["posting_date", "voucher_type", "voucher_no", "account", "party_type", "party"]
+
+	if frappe.db.get_single_value("Accounts Settings", "enable_immutable_ledger"):
+		fields.append("creation")
+
+	if filters.get("include_dimensions"):
+		fields += [*accounting_dimensions, "cost_center"]
+
+	return fields
+
+
 def get_gl_entries(filters, accounting_dimensions):
 	currency_map = get_currency(filters)
+
+	gl_entries = frappe.db.sql(
+		get_gl_entries_query(
+			filters, accounting_dimensions, get_conditions(filters), get_order_by_fields(filters)
+		),
+		filters,
+		as_dict=1,
+	)
+
+	if filters.get("presentation_currency"):
+		return convert_to_presentation_currency(gl_entries, currency_map)
+	else:
+		return gl_entries
+
+
+def get_order_by_fields(filters):
+	if filters.get("group_by") == "Group by Voucher":
+		return ["posting_date", "voucher_type", "voucher_no"]
+	if filters.get("group_by") == "Group by Account":
+		return ["account", "posting_date", "creation"]
+	if filters.get("include_dimensions"):
+		return ["posting_date", "creation"]
+
+	return ["posting_date", "account", "creation"]
+
+
+def get_gl_entries_query(filters, accounting_dimensions, conditions, order_by_fields):
 	select_fields = """, debit, credit, debit_in_account_currency,
 		credit_in_account_currency """
 
@@ -158,21 +385,6 @@ def get_gl_entries(filters, accounting_dimensions):
 		else:
 			select_fields += """,remarks"""
 
-	order_by_statement = "order by posting_date, account, creation"
-
-	if filters.get("include_dimensions"):
-		order_by_statement = "order by posting_date, creation"
-
-	if filters.get("group_by") == "Group by Voucher":
-		order_by_statement = "order by posting_date, voucher_type, voucher_no"
-	if filters.get("group_by") == "Group by Account":
-		order_by_statement = "order by account, posting_date, creation"
-
-	if filters.get("include_default_book_entries"):
-		filters["company_fb"] = frappe.get_cached_value(
-			"Company", filters.get("company"), "default_finance_book"
-		)
-
 	dimension_fields = ""
 	if accounting_dimensions:
 		dimension_fields = ", ".join(accounting_dimensions) + ","
@@ -183,8 +395,7 @@ def get_gl_entries(filters, accounting_dimensions):
 			"debit_in_transaction_currency, credit_in_transaction_currency, transaction_currency,"
 		)
 
-	gl_entries = frappe.db.sql(
-		f"""
+	return f"""
 		select
 			name as gl_entry, posting_date, account, party_type, party,
 			voucher_type, voucher_subtype, voucher_no, {dimension_fields}
@@ -192,17 +403,9 @@ def get_gl_entries(filters, accounting_dimensions):
 			against_voucher_type, against_voucher, account_currency,
 			against, is_opening, creation {select_fields}
 		from `tabGL Entry`
-		where company=%(company)s {get_conditions(filters)}
-		{order_by_statement}
-	""",
-		filters,
-		as_dict=1,
-	)
-
-	if filters.get("presentation_currency"):
-		return convert_to_presentation_currency(gl_entries, currency_map)
-	else:
-		return gl_entries
+		where company=%(company)s {conditions}
+		order by {", ".join(order_by_fields)}
+	"""
 
 
 def get_conditions(filters):
@@ -278,6 +481,9 @@ def get_conditions(filters):
 		conditions.append("project in %(project)s")
 
 	if filters.get("include_default_book_entries"):
+		filters["company_fb"] = frappe.get_cached_value(
+			"Company", filters.get("company"), "default_finance_book"
+		)
 		if filters.get("finance_book"):
 			if filters.get("company_fb") and cstr(filters.get("finance_book")) != cstr(
 				filters.get("company_fb")
@@ -430,45 +636,14 @@ def get_accountwise_gle(filters, accounting_dimensions, gl_entries, gle_map, tot
 	group_by = group_by_field(filters.get("group_by"))
 	group_by_voucher_consolidated = filters.get("group_by") == "Group by Voucher (Consolidated)"
 
+	account_type_map = {}
 	if filters.get("show_net_values_in_party_account"):
 		account_type_map = get_account_type_map(filters.get("company"))
 
-	immutable_ledger = frappe.db.get_single_value("Accounts Settings", "enable_immutable_ledger")
+	consolidation_key_fields = get_consolidation_key_fields(filters, accounting_dimensions)
 
 	def update_value_in_dict(data, key, gle):
-		data[key].debit += gle.debit
-		data[key].credit += gle.credit
-
-		data[key].debit_in_account_currency += gle.debit_in_account_currency
-		data[key].credit_in_account_currency += gle.credit_in_account_currency
-
-		if filters.get("add_values_in_transaction_currency") and key not in ["opening", "closing", "total"]:
-			data[key].debit_in_transaction_currency += gle.debit_in_transaction_currency
-			data[key].credit_in_transaction_currency += gle.credit_in_transaction_currency
-
-		if filters.get("show_net_values_in_party_account") and account_type_map.get(data[key].account) in (
-			"Receivable",
-			"Payable",
-		):
-			net_value = data[key].debit - data[key].credit
-			net_value_in_account_currency = (
-				data[key].debit_in_account_currency - data[key].credit_in_account_currency
-			)
-
-			if net_value < 0:
-				dr_or_cr = "credit"
-				rev_dr_or_cr = "debit"
-			else:
-				dr_or_cr = "debit"
-				rev_dr_or_cr = "credit"
-
-			data[key][dr_or_cr] = abs(net_value)
-			data[key][dr_or_cr + "_in_account_currency"] = abs(net_value_in_account_currency)
-			data[key][rev_dr_or_cr] = 0
-			data[key][rev_dr_or_cr + "_in_account_currency"] = 0
-
-		if data[key].against_voucher and gle.against_voucher:
-			data[key].against_voucher += ", " + gle.against_voucher
+		add_to_totals(data, key, gle, filters, account_type_map)
 
 	from_date, to_date = getdate(filters.from_date), getdate(filters.to_date)
 	show_opening_entries = filters.get("show_opening_entries")
@@ -495,24 +670,7 @@ def get_accountwise_gle(filters, accounting_dimensions, gl_entries, gle_map, tot
 				gle_map[group_by_value].entries.append(gle)
 
 			elif group_by_voucher_consolidated:
-				keylist = [
-					gle.get("posting_date"),
-					gle.get("voucher_type"),
-					gle.get("voucher_no"),
-					gle.get("account"),
-					gle.get("party_type"),
-					gle.get("party"),
-				]
-
-				if immutable_ledger:
-					keylist.append(gle.get("creation"))
-
-				if filters.get("include_dimensions"):
-					for dim in accounting_dimensions:
-						keylist.append(gle.get(dim))
-					keylist.append(gle.get("cost_center"))
-
-				key = tuple(keylist)
+				key = tuple(gle.get(field) for field in consolidation_key_fields)
 				if key not in consolidated_gle:
 					consolidated_gle.setdefault(key, gle)
 				else:
@@ -526,6 +684,42 @@ def get_accountwise_gle(filters, accounting_dimensions, gl_entries, gle_map, tot
 	return totals, entries
 
 
+def add_to_totals(data, key, gle, filters, account_type_map):
+	data[key].debit += gle.debit
+	data[key].credit += gle.credit
+
+	data[key].debit_in_account_currency += gle.debit_in_account_currency
+	data[key].credit_in_account_currency += gle.credit_in_account_currency
+
+	if filters.get("add_values_in_transaction_currency") and key not in ["opening", "closing", "total"]:
+		data[key].debit_in_transaction_currency += gle.debit_in_transaction_currency
+		data[key].credit_in_transaction_currency += gle.credit_in_transaction_currency
+
+	if filters.get("show_net_values_in_party_account") and account_type_map.get(data[key].account) in (
+		"Receivable",
+		"Payable",
+	):
+		net_value = data[key].debit - data[key].credit
+		net_value_in_account_currency = (
+			data[key].debit_in_account_currency - data[key].credit_in_account_currency
+		)
+
+		if net_value < 0:
+			dr_or_cr = "credit"
+			rev_dr_or_cr = "debit"
+		else:
+			dr_or_cr = "debit"
+			rev_dr_or_cr = "credit"
+
+		data[key][dr_or_cr] = abs(net_value)
+		data[key][dr_or_cr + "_in_account_currency"] = abs(net_value_in_account_currency)
+		data[key][rev_dr_or_cr] = 0
+		data[key][rev_dr_or_cr + "_in_account_currency"] = 0
+
+	if data[key].against_voucher and gle.against_voucher:
+		data[key].against_voucher += ", " + gle.against_voucher
+
+
 def get_account_type_map(company):
 	account_type_map = frappe._dict(
 		frappe.get_all("Account", fields=["name", "account_type"], filters={"company": company}, as_list=1)
@@ -688,3 +882,100 @@ def get_columns(filters):
 		columns.extend([{"label": _("Remarks"), "fieldname": "remarks", "width": 400}])
 
 	return columns
+
+
+@frappe.whitelist()
+def export_general_ledger(filters, file_format="CSV"):
+	"""Write the report to a private file in the background, for ledgers too large to be loaded at once"""
+	if not frappe.get_cached_doc("Report", "General Ledger").is_permitted():
+		frappe.throw(_("You are not permitted to export the General Ledger"), frappe.PermissionError)
+
+	if file_format not in ("CSV", "Excel"):
+		frappe.throw(_("File Format must be CSV or Excel"))
+
+	filters = frappe._dict(frappe.parse_json(filters))
+	prepare_filters(copy.deepcopy(filters))
+
+	frappe.enqueue(
+		"erpnext.accounts.report.general_ledger.general_ledger.write_general_ledger_file",
+		queue="long",
+		timeout=7200,
+		filters=filters,
+		file_format=file_format,
+		enqueue_after_commit=True,
+	)
+
+
+def write_general_ledger_file(filters, file_format="CSV"):
+	filters, _account_details = prepare_filters(frappe._dict(filters))
+	columns = [d for d in get_columns(filters) if not d.get("hidden")]
+
+	extension = "csv" if file_format == "CSV" else "xlsx"
+	file_name = f"general-ledger-{frappe.scrub(filters.company)}-{frappe.generate_hash(length=8)}.{extension}"
+	file_path = frappe.get_site_path("private", "files", file_name)
+
+	rows = ([d.get(column["fieldname"]) for column in columns] for d in get_streamed_result(filters))
+	header = [column["label"] for column in columns]
+
+	if file_format == "CSV":
+		write_csv(file_path, header, rows)
+	else:
+		write_xlsx(file_path, header, rows, sheet_name=_("General Ledger"))
+
+	_file = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": f"/private/files/{file_name}",
+			"is_private": 1,
+			"content_hash": get_file_hash(file_path),
+		}
+	)
+	_file.insert(ignore_permissions=True)
+
+	make_notification_logs(
+		{
+			"type": "Alert",
+			"document_type": "File",
+			"document_name": _file.name,
+			"subject": _("General Ledger of {0} from {1} to {2} is ready to download").format(
+				filters.company, filters.from_date, filters.to_date
+			),
+		},
+		[frappe.session.user],
+	)
+
+
+def write_csv(file_path, header, rows):
+	with open(file_path, "w", newline="") as f:
+		writer = csv.writer(f)
+		writer.writerow(header)
+		writer.writerows(rows)
+
+
+def write_xlsx(file_path, header, rows, sheet_name):
+	"""Rows are flushed to disk as they are written, a sheet is added when one is full"""
+	wb = openpyxl.Workbook(write_only=True)
+	ws = wb.create_sheet(sheet_name)
+	ws.append(header)
+	sheet_rows = 1
+
+	for row in rows:
+		if sheet_rows >= XLSX_MAX_ROWS:
+			ws = wb.create_sheet(f"{sheet_name} {len(wb.worksheets) + 1}")
+			ws.append(header)
+			sheet_rows = 1
+
+		ws.append(row)
+		sheet_rows += 1
+
+	wb.save(file_path)
+
+
+def get_file_hash(file_path):
+	content_hash = hashlib.md5()
+	with open(file_path, "rb") as f:
+		for chunk in iter(lambda: f.read(1024 * 1024), b""):
+			content_hash.update(chunk)
+
+	return content_hash.hexdigest()
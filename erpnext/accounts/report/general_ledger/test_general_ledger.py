@@ -1,13 +1,20 @@
 # Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
 # MIT License. See license.txt
 
+import copy
+
 import frappe
 from frappe import qb
 from frappe.tests.utils import FrappeTestCase
-from frappe.utils import flt, today
+from frappe.utils import add_days, flt, today
 
+from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
-from erpnext.accounts.report.general_ledger.general_ledger import execute
+from erpnext.accounts.report.general_ledger.general_ledger import (
+	execute,
+	get_streamed_result,
+	prepare_filters,
+)
 from erpnext.controllers.sales_and_purchase_return import make_return_doc
 
 
@@ -332,3 +339,26 @@ class TestGeneralLedger(FrappeTestCase):
 		)
 		actual = set([x.voucher_no for x in data if x.voucher_no])
 		self.assertEqual(expected, actual)
+
+	def test_streamed_result(self):
+		for posting_date in (add_days(today(), -10), today(), today()):
+			make_journal_entry("_Test Bank - _TC", "Sales - _TC", 100, posting_date=posting_date, submit=True)
+		make_journal_entry("_Test Bank - _TC", "Cash - _TC", 50, posting_date=today(), submit=True)
+
+		filters = frappe._dict(
+			{
+				"company": self.company,
+				"from_date": add_days(today(), -5),
+				"to_date": today(),
+				"account": ["Bank Accounts - _TC", "Cash In Hand - _TC"],
+				"group_by": "Group by Account",
+			}
+		)
+		_columns, data = execute(copy.deepcopy(filters))
+		streamed_data = list(get_streamed_result(prepare_filters(copy.deepcopy(filters))[0]))
+
+		# opening, entries, totals and closing of both the accounts along with the running balance
+		self.assertEqual(
+			[(d.get("account"), d.get("debit"), d.get("credit"), d.get("balance")) for d in data],
+			[(d.get("account"), d.get("debit"), d.get("credit"), d.get("balance")) for d in streamed_data],
+		)
@@ -0,0 +1,80 @@
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext.accounts.general_ledger import get_merge_key, merge_similar_entries
+
+
+class TestGeneralLedger(FrappeTestCase):
+	def test_merge_similar_entries(self):
+		gl_map = [
+			make_gl_entry("_Test Bank - _TC", debit=100),
+			make_gl_entry("Sales - _TC", credit=60, cost_center="_Test Cost Center - _TC"),
+			make_gl_entry("_Test Bank - _TC", debit=50),
+			make_gl_entry("Sales - _TC", credit=90, cost_center="_Test Cost Center 2 - _TC"),
+			make_gl_entry("_Test Bank - _TC", debit=10, credit=10),
+		]
+
+		merged_gl_map = merge_similar_entries(gl_map, precision=2)
+
+		# heads are in the order in which they are first seen
+		self.assertEqual(
+			[(d.account, d.cost_center, d.debit, d.credit) for d in merged_gl_map],
+			[
+				("_Test Bank - _TC", None, 160, 10),
+				("Sales - _TC", "_Test Cost Center - _TC", 0, 60),
+				("Sales - _TC", "_Test Cost Center 2 - _TC", 0, 90),
+			],
+		)
+
+	def test_merge_similar_entries_in_one_pass(self):
+		"""Every entry is looked up once by its merge key, not compared with all the heads before it"""
+		rows = 10000
+		# half of the rows are merged into an existing head
+		gl_map = [
+			make_gl_entry("Sales - _TC", credit=10, cost_center=f"_Test Cost Center {i % (rows // 2)}")
+			for i in range(rows)
+		]
+
+		MergeKey.comparisons = 0
+		with patch(
+			"erpnext.accounts.general_ledger.get_merge_key",
+			side_effect=lambda entry, merge_properties: MergeKey(get_merge_key(entry, merge_properties)),
+		):
+			merged_gl_map = merge_similar_entries(gl_map, precision=2)
+
+		# comparing every entry with the heads before it would take rows * rows / 4 comparisons
+		self.assertLessEqual(MergeKey.comparisons, rows)
+		self.assertEqual(len(merged_gl_map), rows // 2)
+		self.assertEqual(
+			[d.cost_center for d in merged_gl_map[:2]], ["_Test Cost Center 0", "_Test Cost Center 1"]
+		)
+		self.assertTrue(all(d.credit == 20 for d in merged_gl_map))
+
+
+class MergeKey(tuple):
+	"""Merge key counting the comparisons made with it"""
+
+	comparisons = 0
+	__hash__ = tuple.__hash__
+
+	def __eq__(self, other):
+		MergeKey.comparisons += 1
+		return tuple.__eq__(self, other)
+
+
+def make_gl_entry(account, debit=0, credit=0, cost_center=None):
+	return frappe._dict(
+		{
+			"company": "_Test Company",
+			"account": account,
+			"cost_center": cost_center,
+			"debit": debit,
+			"credit": credit,
+			"debit_in_account_currency": debit,
+			"credit_in_account_currency": credit,
+			"voucher_type": "Journal Entry",
+			"voucher_no": "_Test Journal Entry",
+		}
+	)
@@ -0,0 +1,26 @@
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from erpnext.accounts.posting_periods import find_interval, make_intervals
+
+
+class TestPostingPeriods(FrappeTestCase):
+	def test_find_interval(self):
+		intervals = make_intervals(
+			[
+				("2024-04-01", "2025-03-31", "FY 2024-25"),
+				("2023-04-01", "2024-03-31", "FY 2023-24"),
+				# overlaps the fiscal years of the other companies
+				("2024-01-01", "2026-12-31", "FY 2024-26"),
+			]
+		)
+
+		self.assertIsNone(find_interval(intervals, "2023-03-31"))
+		self.assertEqual(find_interval(intervals, "2023-04-01"), "FY 2023-24")
+		self.assertEqual(find_interval(intervals, getdate("2024-03-31")), "FY 2024-26")
+
+		# latest starting interval is preferred
+		self.assertEqual(find_interval(intervals, "2024-04-01"), "FY 2024-25")
+		self.assertEqual(find_interval(intervals, "2025-04-01"), "FY 2024-26")
+		self.assertIsNone(find_interval(intervals, "2027-01-01"))
+		self.assertIsNone(find_interval(make_intervals([]), "2024-04-01"))
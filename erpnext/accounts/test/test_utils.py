@@ -128,6 +128,41 @@ class TestUtils(unittest.TestCase):
 		self.assertEqual(len(payment_entry.references), 1)
 		self.assertEqual(payment_entry.difference_amount, 0)
 
+	def test_update_outstanding_of_multiple_invoices(self):
+		invoices = [make_purchase_invoice(qty=1, rate=100) for i in range(3)]
+
+		payment_entry = get_payment_entry(invoices[0].doctype, invoices[0].name)
+		payment_entry.references = []
+		for invoice, allocated_amount in zip(invoices, (100, 100, 40), strict=True):
+			payment_entry.append(
+				"references",
+				{
+					"reference_doctype": invoice.doctype,
+					"reference_name": invoice.name,
+					"allocated_amount": allocated_amount,
+				},
+			)
+		payment_entry.paid_amount = payment_entry.received_amount = 240
+		payment_entry.submit()
+
+		outstanding = {
+			d.name: (d.outstanding_amount, d.status)
+			for d in frappe.get_all(
+				"Purchase Invoice",
+				filters={"name": ("in", [d.name for d in invoices])},
+				fields=["name", "outstanding_amount", "status"],
+			)
+		}
+		self.assertEqual(outstanding[invoices[0].name], (0, "Paid"))
+		self.assertEqual(outstanding[invoices[1].name], (0, "Paid"))
+		self.assertEqual(outstanding[invoices[2].name], (60, "Partly Paid"))
+
+		payment_entry.cancel()
+		for invoice in invoices:
+			invoice.reload()
+			self.assertEqual(invoice.outstanding_amount, 100)
+			self.assertEqual(invoice.status, "Unpaid")
+
 	def test_naming_series_variable_parsing(self):
 		"""
 		Tests parsing utility used by Naming Series Variable hook for FY
@@ -2,6 +2,7 @@
 # License: GNU General Public License v3. See license.txt
 
 
+import hashlib
 from json import loads
 from typing import TYPE_CHECKING, Optional
 
@@ -11,7 +12,6 @@ from frappe import _, qb, throw
 from frappe.model.meta import get_field_precision
 from frappe.query_builder import AliasedQuery, Criterion, Table
 from frappe.query_builder.functions import Count, Sum
-from frappe.query_builder.utils import DocType
 from frappe.utils import (
 	add_days,
 	cint,
@@ -25,8 +25,6 @@ from frappe.utils import (
 	now,
 	nowdate,
 )
-from pypika import Order
-from pypika.terms import ExistsCriterion
 
 import erpnext
 
@@ -34,6 +32,7 @@ import erpnext
 from erpnext.accounts.doctype.account.account import get_account_currency
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import get_dimensions
 from erpnext.stock import get_warehouse_account_map
+from erpnext.stock.reposting_metrics import get_repost_metrics
 from erpnext.stock.utils import get_stock_value_on
 
 if TYPE_CHECKING:
@@ -76,59 +75,21 @@ def get_fiscal_years(
 	as_dict=False,
 	boolean=False,
 ):
-	fiscal_years = frappe.cache().hget("fiscal_years", company) or []
-
-	if not fiscal_years:
-		# if year start date is 2012-04-01, year end date should be 2013-03-31 (hence subdate)
-		FY = DocType("Fiscal Year")
-
-		query = (
-			frappe.qb.from_(FY).select(FY.name, FY.year_start_date, FY.year_end_date).where(FY.disabled == 0)
-		)
-
-		if fiscal_year:
-			query = query.where(FY.name == fiscal_year)
-
-		if company:
-			FYC = DocType("Fiscal Year Company")
-			query = query.where(
-				ExistsCriterion(frappe.qb.from_(FYC).select(FYC.name).where(FYC.parent == FY.name)).negate()
-				| ExistsCriterion(
-					frappe.qb.from_(FYC)
-					.select(FYC.company)
-					.where(FYC.parent == FY.name)
-					.where(FYC.company == company)
-				)
-			)
-
-		query = query.orderby(FY.year_start_date, order=Order.desc)
-		fiscal_years = query.run(as_dict=True)
-
-		frappe.cache().hset("fiscal_years", company, fiscal_years)
+	from erpnext.accounts.posting_periods import find_fiscal_year, get_period_index
 
 	if not transaction_date and not fiscal_year:
-		return fiscal_years
+		return get_period_index(company).fiscal_years
 
-	if transaction_date:
-		transaction_date = getdate(transaction_date)
-
-	for fy in fiscal_years:
-		matched = False
-		if fiscal_year and fy.name == fiscal_year:
-			matched = True
-
-		if (
-			transaction_date
-			and getdate(fy.year_start_date) <= transaction_date
-			and getdate(fy.year_end_date) >= transaction_date
-		):
-			matched = True
+	if fiscal_year:
+		fy = next((d for d in get_period_index(company).fiscal_years if d.name == fiscal_year), None)
+	else:
+		fy = find_fiscal_year(transaction_date, company)
 
-		if matched:
-			if as_dict:
-				return (fy,)
-			else:
-				return ((fy.name, fy.year_start_date, fy.year_end_date),)
+	if fy:
+		if as_dict:
+			return (fy,)
+		else:
+			return ((fy.name, fy.year_start_date, fy.year_end_date),)
 
 	error_msg = _("""{0} {1} is not in any active Fiscal Year""").format(label, formatdate(transaction_date))
 	if company:
@@ -194,7 +155,7 @@ def get_balance_on(
 	if not cost_center and frappe.form_dict.get("cost_center"):
 		cost_center = frappe.form_dict.get("cost_center")
 
-	cond = ["is_cancelled=0"]
+	cond = []
 	if start_date:
 		cond.append("posting_date >= %s" % frappe.db.escape(cstr(start_date)))
 	if date:
@@ -280,6 +241,17 @@ def get_balance_on(
 		cond.append("""gle.company = %s """ % (frappe.db.escape(company)))
 
 	if account or (party_type and party) or account_type:
+		from erpnext.accounts.doctype.daily_account_balance.daily_account_balance import (
+			use_daily_account_balances,
+		)
+
+		# daily balances are grouped on all the filtered columns, amounts are rounded before adding
+		if use_daily_account_balances():
+			ledger = "`tabDaily Account Balance`"
+		else:
+			ledger = "`tabGL Entry`"
+			cond.append("is_cancelled=0")
+
 		precision = get_currency_precision()
 		if in_account_currency:
 			select_field = (
@@ -291,8 +263,8 @@ def get_balance_on(
 		bal = frappe.db.sql(
 			"""
 			SELECT {}
-			FROM `tabGL Entry` gle
-			WHERE {}""".format(select_field, " and ".join(cond)),
+			FROM {} gle
+			WHERE {}""".format(select_field, ledger, " and ".join(cond)),
 			(precision, precision),
 		)[0][0]
 		# if bal is None, return 0
@@ -300,7 +272,11 @@ def get_balance_on(
 
 
 def get_count_on(account, fieldname, date):
-	cond = ["is_cancelled=0"]
+	from erpnext.accounts.doctype.daily_account_balance.daily_account_balance import (
+		use_daily_account_balances,
+	)
+
+	cond = []
 	if date:
 		cond.append("posting_date <= %s" % frappe.db.escape(cstr(date)))
 	else:
@@ -325,9 +301,17 @@ def get_count_on(account, fieldname, date):
 		if not frappe.flags.ignore_account_permission:
 			acc.check_permission("read")
 
+		# plain entry counts can be read from the daily balances
+		from_daily_balances = (
+			fieldname not in ("invoiced_amount", "payables") and use_daily_account_balances()
+		)
+
 		# for pl accounts, get balance within a fiscal year
 		if acc.report_type == "Profit and Loss":
-			cond.append("posting_date >= '%s' and voucher_type != 'Period Closing Voucher'" % year_start_date)
+			cond.append("posting_date >= '%s'" % year_start_date)
+			cond.append(
+				"is_period_closing = 0" if from_daily_balances else "voucher_type != 'Period Closing Voucher'"
+			)
 
 		# different filter for group and ledger - improved performance
 		if acc.is_group:
@@ -340,6 +324,17 @@ def get_count_on(account, fieldname, date):
 		else:
 			cond.append(f"""gle.account = {frappe.db.escape(account)} """)
 
+		if from_daily_balances:
+			return cint(
+				frappe.db.sql(
+					"""
+				SELECT sum(gl_entries)
+				FROM `tabDaily Account Balance` gle
+				WHERE {}""".format(" and ".join(cond))
+				)[0][0]
+			)
+
+		cond.append("is_cancelled=0")
 		entries = frappe.db.sql(
 			"""
 			SELECT name, posting_date, account, party_type, party,debit,credit,
@@ -525,14 +520,18 @@ def reconcile_against_document(
 			create_payment_ledger_entry(gl_map, update_outstanding="No", cancel=0, adv_adj=1)
 
 		# Only update outstanding for newly linked vouchers
-		for entry in entries:
-			update_voucher_outstanding(
-				entry.against_voucher_type,
-				entry.against_voucher,
-				entry.account,
-				entry.party_type,
-				entry.party,
-			)
+		update_voucher_outstandings(
+			[
+				(
+					entry.against_voucher_type,
+					entry.against_voucher,
+					entry.account,
+					entry.party_type,
+					entry.party,
+				)
+				for entry in entries
+			]
+		)
 		# update advance paid in Advance Receivable/Payable doctypes
 		if update_advance_paid:
 			for t, n in update_advance_paid:
@@ -786,6 +785,10 @@ def cancel_exchange_gain_loss_journal(
 def update_accounting_ledgers_after_reference_removal(
 	ref_type: str | None = None, ref_no: str | None = None, payment_name: str | None = None
 ):
+	from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+		refresh_voucher_outstandings,
+	)
+
 	# General Ledger
 	gle = qb.DocType("GL Entry")
 	gle_update_query = (
@@ -803,6 +806,17 @@ def update_accounting_ledgers_after_reference_removal(
 
 	# Payment Ledger
 	ple = qb.DocType("Payment Ledger Entry")
+	payment_vouchers_query = (
+		qb.from_(ple)
+		.select(ple.voucher_type, ple.voucher_no)
+		.where(
+			(ple.against_voucher_type == ref_type) & (ple.against_voucher_no == ref_no) & (ple.delinked == 0)
+		)
+	)
+	if payment_name:
+		payment_vouchers_query = payment_vouchers_query.where(ple.voucher_no == payment_name)
+	payment_vouchers = payment_vouchers_query.run()
+
 	ple_update_query = (
 		qb.update(ple)
 		.set(ple.against_voucher_type, ple.voucher_type)
@@ -818,6 +832,8 @@ def update_accounting_ledgers_after_reference_removal(
 		ple_update_query = ple_update_query.where(ple.voucher_no == payment_name)
 	ple_update_query.run()
 
+	refresh_voucher_outstandings([(ref_type, ref_no), *payment_vouchers])
+
 
 def remove_ref_from_advance_section(ref_doc: object = None):
 	# TODO: this might need some testing
@@ -958,18 +974,31 @@ def fix_total_debit_credit():
 		as_dict=1,
 	)
 
+	from erpnext.accounts.general_ledger import update_ledger_balances
+
 	for d in vouchers:
 		if abs(d.diff) > 0:
 			dr_or_cr = d.voucher_type == "Sales Invoice" and "credit" or "debit"
 
+			gl_entry = frappe.db.get_value(
+				"GL Entry",
+				{"voucher_type": d.voucher_type, "voucher_no": d.voucher_no, dr_or_cr: (">", 0)},
+				"*",
+				as_dict=True,
+			)
+			if not gl_entry:
+				continue
+
 			frappe.db.sql(
-				"""update `tabGL Entry` set {} = {} + {}
-				where voucher_type = {} and voucher_no = {} and {} > 0 limit 1""".format(
-					dr_or_cr, dr_or_cr, "%s", "%s", "%s", dr_or_cr
-				),
-				(d.diff, d.voucher_type, d.voucher_no),
+				f"""update `tabGL Entry` set {dr_or_cr} = {dr_or_cr} + %s where name = %s""",
+				(d.diff, gl_entry.name),
 			)
 
+			if not gl_entry.is_cancelled:
+				# move the entry in the account balances from its old amount to the adjusted one
+				update_ledger_balances([gl_entry], sign=-1)
+				update_ledger_balances([frappe._dict(gl_entry, **{dr_or_cr: flt(gl_entry[dr_or_cr]) + d.diff})])
+
 
 def get_currency_precision():
 	precision = cint(frappe.db.get_default("currency_precision"))
@@ -980,6 +1009,50 @@ def get_currency_precision():
 	return precision
 
 
+def get_ledger_balance_name(key):
+	return hashlib.md5("\x1f".join(cstr(value) for value in key).encode()).hexdigest()
+
+
+def upsert_ledger_balances(doctype, key_fields, balances, batch_size=1000):
+	"""
+	Add `balances` ({key: {fieldname: value}}) to the rows of `doctype` named after their key,
+	inserting the missing ones. Rows are sorted by name so that concurrent postings lock them in the same order.
+	"""
+	if not balances:
+		return
+
+	timestamp, user = now(), frappe.session.user
+	increments = list(next(iter(balances.values())))
+	rows = sorted(
+		[get_ledger_balance_name(key), timestamp, timestamp, user, user, *key, *balance.values()]
+		for key, balance in balances.items()
+	)
+
+	columns = ", ".join(
+		f"`{column}`"
+		for column in ("name", "creation", "modified", "owner", "modified_by", *key_fields, *increments)
+	)
+	row_placeholder = "({})".format(", ".join(["%s"] * (5 + len(key_fields) + len(increments))))
+
+	for batch in create_batch(rows, batch_size):
+		insert_query = (
+			f"insert into `tab{doctype}` ({columns}) values {', '.join([row_placeholder] * len(batch))}"
+		)
+		frappe.db.multisql(
+			{
+				"mariadb": "{} on duplicate key update {}, `modified` = values(`modified`)".format(
+					insert_query,
+					", ".join(f"`{field}` = `{field}` + values(`{field}`)" for field in increments),
+				),
+				"postgres": "{} on conflict (name) do update set {}, modified = excluded.modified".format(
+					insert_query,
+					", ".join(f'{field} = "tab{doctype}".{field} + excluded.{field}' for field in increments),
+				),
+			},
+			[value for row in batch for value in row],
+		)
+
+
 def get_held_invoices(party_type, party):
 	"""
 	Returns a list of names Purchase Invoices for the given party that are on hold
@@ -1295,39 +1368,64 @@ def repost_gle_for_stock_vouchers(
 	company: str | None = None,
 	warehouse_account=None,
 	repost_doc: Optional["RepostItemValuation"] = None,
-):
+	bulk: bool | None = None,
+) -> int:
+	"""
+	Post the GL entries of the stock vouchers again where they differ from the expected ones.
+	With `bulk` (by default, as set in Stock Reposting Settings) only the changed entries are written.
+
+	Returns the number of vouchers whose GL entries were changed.
+	"""
 	from erpnext.accounts.general_ledger import toggle_debit_credit_if_negative
+	from erpnext.accounts.gl_repost import repost_gl_entries_in_bulk, use_gl_diff_reposting
 
 	if not stock_vouchers:
-		return
+		return 0
 
 	if not warehouse_account:
 		warehouse_account = get_warehouse_account_map(company)
 
+	if bulk is None:
+		bulk = use_gl_diff_reposting()
+
 	stock_vouchers = sort_stock_vouchers_by_posting_date(stock_vouchers)
 	if repost_doc and repost_doc.gl_reposting_index:
 		# Restore progress
 		stock_vouchers = stock_vouchers[cint(repost_doc.gl_reposting_index) :]
 
 	precision = get_field_precision(frappe.get_meta("GL Entry").get_field("debit")) or 2
+	metrics = get_repost_metrics()
+	modified_vouchers = 0
 
 	for stock_vouchers_chunk in create_batch(stock_vouchers, GL_REPOSTING_CHUNK):
-		gle = get_voucherwise_gl_entries(stock_vouchers_chunk, posting_date)
-
-		for voucher_type, voucher_no in stock_vouchers_chunk:
-			existing_gle = gle.get((voucher_type, voucher_no), [])
-			voucher_obj = frappe.get_doc(voucher_type, voucher_no)
-			# Some transactions post credit as negative debit, this is handled while posting GLE
-			# but while comparing we need to make sure it's flipped so comparisons are accurate
-			expected_gle = toggle_debit_credit_if_negative(voucher_obj.get_gl_entries(warehouse_account))
-			if expected_gle:
-				if not existing_gle or not compare_existing_and_expected_gle(
-					existing_gle, expected_gle, precision
-				):
-					_delete_accounting_ledger_entries(voucher_type, voucher_no)
-					voucher_obj.make_gl_entries(gl_entries=expected_gle, from_repost=True)
-			else:
-				_delete_accounting_ledger_entries(voucher_type, voucher_no)
+		metrics.incr("gl_vouchers_compared", len(stock_vouchers_chunk))
+
+		if bulk:
+			modified_vouchers += repost_gl_entries_in_bulk(stock_vouchers_chunk, warehouse_account, precision)
+		else:
+			gle = get_voucherwise_gl_entries(stock_vouchers_chunk, posting_date)
+
+			for voucher_type, voucher_no in stock_vouchers_chunk:
+				with metrics.section("gl_entries"):
+					existing_gle = gle.get((voucher_type, voucher_no), [])
+					voucher_obj = frappe.get_doc(voucher_type, voucher_no)
+					# Some transactions post credit as negative debit, this is handled while posting GLE
+					# but while comparing we need to make sure it's flipped so comparisons are accurate
+					expected_gle = toggle_debit_credit_if_negative(
+						voucher_obj.get_gl_entries(warehouse_account)
+					)
+					if expected_gle:
+						if not existing_gle or not compare_existing_and_expected_gle(
+							existing_gle, expected_gle, precision
+						):
+							metrics.incr("gl_vouchers_reposted")
+							modified_vouchers += 1
+							_delete_accounting_ledger_entries(voucher_type, voucher_no)
+							voucher_obj.make_gl_entries(gl_entries=expected_gle, from_repost=True)
+					else:
+						if existing_gle:
+							modified_vouchers += 1
+						_delete_accounting_ledger_entries(voucher_type, voucher_no)
 
 		if not frappe.flags.in_test:
 			frappe.db.commit()
@@ -1338,13 +1436,29 @@ def repost_gle_for_stock_vouchers(
 				cint(repost_doc.gl_reposting_index) + len(stock_vouchers_chunk),
 			)
 
+	return modified_vouchers
+
 
 def _delete_pl_entries(voucher_type, voucher_no):
+	from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+		refresh_voucher_outstandings,
+	)
+
 	ple = qb.DocType("Payment Ledger Entry")
+	against_vouchers = (
+		qb.from_(ple)
+		.select(ple.against_voucher_type, ple.against_voucher_no)
+		.distinct()
+		.where((ple.voucher_type == voucher_type) & (ple.voucher_no == voucher_no))
+	).run()
 	qb.from_(ple).delete().where((ple.voucher_type == voucher_type) & (ple.voucher_no == voucher_no)).run()
+	refresh_voucher_outstandings(against_vouchers)
 
 
 def _delete_gl_entries(voucher_type, voucher_no):
+	from erpnext.accounts.general_ledger import remove_voucher_from_ledger_balances
+
+	remove_voucher_from_ledger_balances(voucher_type, voucher_no)
 	gle = qb.DocType("GL Entry")
 	qb.from_(gle).delete().where((gle.voucher_type == voucher_type) & (gle.voucher_no == voucher_no)).run()
 
@@ -1687,11 +1801,30 @@ def get_payment_ledger_entries(gl_entries, cancel=0):
 
 
 def create_payment_ledger_entry(
-	gl_entries, cancel=0, adv_adj=0, update_outstanding="Yes", from_repost=0, partial_cancel=False
+	gl_entries,
+	cancel=0,
+	adv_adj=0,
+	update_outstanding="Yes",
+	from_repost=0,
+	partial_cancel=False,
+	bulk=False,
 ):
+	from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+		refresh_voucher_outstandings,
+	)
+
 	if gl_entries:
 		ple_map = get_payment_ledger_entries(gl_entries, cancel=cancel)
 
+		if bulk and ple_map and not cancel:
+			from erpnext.accounts.doctype.payment_ledger_entry.payment_ledger_entry import (
+				make_payment_ledger_entries_in_bulk,
+			)
+
+			make_payment_ledger_entries_in_bulk(ple_map, adv_adj, update_outstanding, from_repost)
+			return
+
+		against_vouchers = set()
 		for entry in ple_map:
 			ple = frappe.get_doc(entry)
 
@@ -1701,49 +1834,102 @@ def create_payment_ledger_entry(
 			ple.flags.ignore_permissions = 1
 			ple.flags.adv_adj = adv_adj
 			ple.flags.from_repost = from_repost
-			ple.flags.update_outstanding = update_outstanding
+			# outstanding of the against vouchers is updated once all the entries are posted
+			ple.flags.update_outstanding = "No"
 			ple.submit()
 
+			against_vouchers.add(
+				(ple.against_voucher_type, ple.against_voucher_no, ple.account, ple.party_type, ple.party)
+			)
+
+		refresh_voucher_outstandings([d[:2] for d in against_vouchers])
+
+		if update_outstanding == "Yes" and not frappe.flags.is_reverse_depr_entry:
+			update_voucher_outstandings(against_vouchers)
+
 
 def update_voucher_outstanding(voucher_type, voucher_no, account, party_type, party):
-	ple = frappe.qb.DocType("Payment Ledger Entry")
-	vouchers = [frappe._dict({"voucher_type": voucher_type, "voucher_no": voucher_no})]
-	common_filter = []
-	if account:
-		common_filter.append(ple.account == account)
+	update_voucher_outstandings([(voucher_type, voucher_no, account, party_type, party)])
 
-	if party_type:
-		common_filter.append(ple.party_type == party_type)
 
-	if party:
-		common_filter.append(ple.party == party)
+def update_voucher_outstandings(vouchers):
+	"""
+	Update the outstanding amount and status of the invoices in `vouchers`, a list of
+	(voucher_type, voucher_no, account, party_type, party). Outstanding is read with one Payment Ledger
+	query per account and party, and written along with the status with multi-row updates.
+	"""
+	ple = qb.DocType("Payment Ledger Entry")
+	vouchers_by_party = {}
+	for voucher_type, voucher_no, account, party_type, party in vouchers:
+		if voucher_type in ["Sales Invoice", "Purchase Invoice", "Fees"] and party_type and party:
+			vouchers_by_party.setdefault((account, party_type, party), set()).add((voucher_type, voucher_no))
 
 	ple_query = QueryPaymentLedger()
+	outstandings = {}
+	for (account, party_type, party), party_vouchers in vouchers_by_party.items():
+		common_filter = [ple.party_type == party_type, ple.party == party]
+		if account:
+			common_filter.append(ple.account == account)
+
+		# on cancellation outstanding can be an empty list
+		for outstanding in ple_query.get_voucher_outstandings(
+			[frappe._dict({"voucher_type": d[0], "voucher_no": d[1]}) for d in party_vouchers],
+			common_filter=common_filter,
+		):
+			if (outstanding.voucher_type, outstanding.voucher_no) in party_vouchers:
+				outstandings.setdefault(outstanding.voucher_type, {}).setdefault(
+					outstanding.voucher_no, outstanding.outstanding_in_account_currency or 0.0
+				)
+
+	for voucher_type, voucher_outstandings in outstandings.items():
+		update_invoice_outstandings(voucher_type, voucher_outstandings)
 
-	# on cancellation outstanding can be an empty list
-	voucher_outstanding = ple_query.get_voucher_outstandings(vouchers, common_filter=common_filter)
-	if (
-		voucher_type in ["Sales Invoice", "Purchase Invoice", "Fees"]
-		and party_type
-		and party
-		and voucher_outstanding
-	):
-		outstanding = voucher_outstanding[0]
-		ref_doc = frappe.get_doc(voucher_type, voucher_no)
-
-		# Didn't use db_set for optimisation purpose
-		ref_doc.outstanding_amount = outstanding["outstanding_in_account_currency"] or 0.0
-		frappe.db.set_value(
-			voucher_type,
-			voucher_no,
-			"outstanding_amount",
-			outstanding["outstanding_in_account_currency"] or 0.0,
-		)
 
-		ref_doc.set_status(update=True)
+def update_invoice_outstandings(voucher_type, outstandings):
+	"""Set the outstanding amounts ({voucher_no: outstanding}) of the invoices and update their status"""
+	modified = now()
+	invoices = get_invoices_for_status_update(voucher_type, list(outstandings))
+	for ref_doc in invoices:
+		ref_doc.outstanding_amount = outstandings[ref_doc.name]
+		ref_doc.set_status()
+		ref_doc.modified = modified
+
+	frappe.db.bulk_update(
+		voucher_type,
+		{d.name: {"outstanding_amount": d.outstanding_amount, "status": d.status} for d in invoices},
+		chunk_size=500,
+		modified=modified,
+	)
+
+	for ref_doc in invoices:
 		ref_doc.notify_update()
 
 
+def get_invoices_for_status_update(voucher_type, voucher_nos):
+	"""
+	Returns the invoices built from their fields and payment schedules, without loading their other
+	child tables as they are not needed for setting the status
+	"""
+	if voucher_type not in ["Sales Invoice", "Purchase Invoice"]:
+		return [frappe.get_doc(voucher_type, voucher_no) for voucher_no in voucher_nos]
+
+	payment_schedules = {}
+	for d in frappe.get_all(
+		"Payment Schedule",
+		filters={"parenttype": voucher_type, "parent": ("in", voucher_nos)},
+		fields=["parent", "due_date", "payment_amount", "base_payment_amount"],
+		order_by="idx",
+	):
+		payment_schedules.setdefault(d.parent, []).append(d)
+
+	return [
+		frappe.get_doc(
+			dict(invoice, doctype=voucher_type, payment_schedule=payment_schedules.get(invoice.name, []))
+		)
+		for invoice in frappe.get_all(voucher_type, filters={"name": ("in", voucher_nos)}, fields=["*"])
+	]
+
+
 def delink_original_entry(pl_entry, partial_cancel=False):
 	if pl_entry:
 		ple = qb.DocType("Payment Ledger Entry")
@@ -14,6 +14,10 @@ from frappe.utils import nowdate, today, unique
 from pypika import Order
 
 import erpnext
+from erpnext.stock.doctype.item_search_index.item_search_index import (
+	get_item_search_subquery,
+	get_search_fields,
+)
 from erpnext.stock.get_item_details import _get_item_tax_template
 
 
@@ -192,41 +196,60 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 			filters.pop("customer", None)
 			filters.pop("supplier", None)
 
-	description_cond = ""
-	if frappe.db.count(doctype, cache=True) < 50000:
-		# scan description only if items are less than 50000
-		description_cond = "or tabItem.description LIKE %(txt)s"
+	values = {
+		"today": nowdate(),
+		"txt": "%%%s%%" % txt,
+		"_txt": txt.replace("%", ""),
+		"start": start,
+		"page_len": page_len,
+	}
+
+	search_subquery = None
+	if not searchfield or searchfield == "name" or searchfield in get_search_fields():
+		search_subquery, search_values = get_item_search_subquery(txt)
+
+	if search_subquery:
+		# items having words starting with the words of txt, from the full-text index
+		values.update(search_values)
+		search_join = f"inner join {search_subquery} search on search.search_item = tabItem.name"
+		search_cond = "1=1"
+		order_by = """if(tabItem.name = %(_txt)s, 0, 1),
+			search.search_relevance desc,"""
+	else:
+		description_cond = ""
+		if frappe.db.count(doctype, cache=True) < 50000:
+			# scan description only if items are less than 50000
+			description_cond = "or tabItem.description LIKE %(txt)s"
+
+		search_join = ""
+		search_cond = f"""{searchfields} or tabItem.item_code IN
+			(select parent from `tabItem Barcode` where barcode LIKE %(txt)s) {description_cond}"""
+		order_by = """if(locate(%(_txt)s, name), locate(%(_txt)s, name), 99999),
+			if(locate(%(_txt)s, item_name), locate(%(_txt)s, item_name), 99999),"""
 
 	return frappe.db.sql(
 		"""select
 			tabItem.name {columns}
-		from tabItem
+		from tabItem {search_join}
 		where tabItem.docstatus < 2
 			and tabItem.disabled=0
 			and tabItem.has_variants=0
 			and (tabItem.end_of_life > %(today)s or ifnull(tabItem.end_of_life, '0000-00-00')='0000-00-00')
-			and ({scond} or tabItem.item_code IN (select parent from `tabItem Barcode` where barcode LIKE %(txt)s)
-				{description_cond})
+			and ({scond})
 			{fcond} {mcond}
 		order by
-			if(locate(%(_txt)s, name), locate(%(_txt)s, name), 99999),
-			if(locate(%(_txt)s, item_name), locate(%(_txt)s, item_name), 99999),
+			{order_by}
 			idx desc,
 			name, item_name
 		limit %(start)s, %(page_len)s """.format(
 			columns=columns,
-			scond=searchfields,
+			search_join=search_join,
+			scond=search_cond,
 			fcond=get_filters_cond(doctype, filters, conditions).replace("%", "%%"),
 			mcond=get_match_cond(doctype).replace("%", "%%"),
-			description_cond=description_cond,
+			order_by=order_by,
 		),
-		{
-			"today": nowdate(),
-			"txt": "%%%s%%" % txt,
-			"_txt": txt.replace("%", ""),
-			"start": start,
-			"page_len": page_len,
-		},
+		values,
 		as_dict=as_dict,
 	)
 
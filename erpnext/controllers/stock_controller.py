@@ -1669,6 +1669,7 @@ def create_item_wise_repost_entries(
 		repost_entry.posting_date = sle.posting_date
 		repost_entry.posting_time = sle.posting_time
 		repost_entry.allow_zero_rate = allow_zero_rate
+		repost_entry.triggered_by = json.dumps([[voucher_type, voucher_no]])
 		repost_entry.flags.ignore_links = True
 		repost_entry.flags.ignore_permissions = True
 		repost_entry.via_landed_cost_voucher = via_landed_cost_voucher
@@ -432,6 +432,7 @@ scheduler_events = {
 	"hourly_long": [
 		# "erpnext.stock.doctype.repost_item_valuation.repost_item_valuation.repost_entries",
 		"erpnext.utilities.bulk_transaction.retry",
+		"erpnext.accounts.doctype.period_closing_voucher.period_closing_voucher.requeue_stalled_closing_balance_partitions",
 	],
 	"daily": [
 		"erpnext.support.doctype.issue.issue.auto_close_tickets",
@@ -461,12 +462,19 @@ scheduler_events = {
 	"weekly": [
 		"erpnext.accounts.utils.auto_create_exchange_rate_revaluation_weekly",
 	],
+	"weekly_long": [
+		"erpnext.accounts.doctype.daily_account_balance.daily_account_balance.check_daily_account_balances",
+		"erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding.check_voucher_outstandings",
+	],
 	"daily_long": [
 		"erpnext.accounts.doctype.process_subscription.process_subscription.create_subscription_process",
 		"erpnext.setup.doctype.email_digest.email_digest.send",
 		"erpnext.manufacturing.doctype.bom_update_tool.bom_update_tool.auto_update_latest_price_in_all_boms",
 		"erpnext.crm.utils.open_leads_opportunities_based_on_todays_event",
 		"erpnext.assets.doctype.asset.depreciation.post_depreciation_entries",
+		"erpnext.stock.doctype.stock_ledger_checkpoint.stock_ledger_checkpoint.create_stock_ledger_checkpoints",
+		"erpnext.accounts.doctype.monthly_account_balance.monthly_account_balance.close_monthly_account_balances",
+		"erpnext.stock.doctype.item_search_index.item_search_index.sync_item_search_index",
 	],
 	"monthly_long": [
 		"erpnext.accounts.deferred_revenue.process_deferred_accounting",
@@ -552,6 +560,7 @@ accounting_dimension_doctypes = [
 	"Subcontracting Receipt",
 	"Subcontracting Receipt Item",
 	"Account Closing Balance",
+	"Monthly Account Balance",
 	"Supplier Quotation",
 	"Supplier Quotation Item",
 	"Payment Reconciliation",
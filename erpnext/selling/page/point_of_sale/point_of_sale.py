@@ -10,6 +10,7 @@ from frappe.utils.nestedset import get_root_of
 
 from erpnext.accounts.doctype.pos_invoice.pos_invoice import get_stock_availability
 from erpnext.accounts.doctype.pos_profile.pos_profile import get_child_nodes, get_item_groups
+from erpnext.stock.doctype.item_search_index.item_search_index import get_item_search_subquery
 from erpnext.stock.utils import scan_barcode
 
 
@@ -108,7 +109,18 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 	if not frappe.db.exists("Item Group", item_group):
 		item_group = get_root_of("Item Group")
 
-	condition = get_conditions(search_term)
+	values = {"warehouse": warehouse}
+	search_join, order_by = "", "item.name asc"
+	search_subquery, search_values = get_item_search_subquery(search_term) if search_term else (None, None)
+	if search_subquery:
+		# items having words starting with the words of the search term, from the full-text index
+		values.update(search_values)
+		search_join = f"INNER JOIN {search_subquery} search ON search.search_item = item.name"
+		condition = "(1=1)"
+		order_by = "search.search_relevance desc, item.name asc"
+	else:
+		condition = get_conditions(search_term)
+
 	condition += get_item_group_condition(pos_profile)
 
 	lft, rgt = frappe.db.get_value("Item Group", item_group, ["lft", "rgt"])
@@ -130,7 +142,7 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 			item.image AS item_image,
 			item.is_stock_item
 		FROM
-			`tabItem` item {bin_join_selection}
+			`tabItem` item {search_join} {bin_join_selection}
 		WHERE
 			item.disabled = 0
 			AND item.has_variants = 0
@@ -140,7 +152,7 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 			AND {condition}
 			{bin_join_condition}
 		ORDER BY
-			item.name asc
+			{order_by}
 		LIMIT
 			{page_length} offset {start}""".format(
 			start=cint(start),
@@ -148,10 +160,12 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 			lft=cint(lft),
 			rgt=cint(rgt),
 			condition=condition,
+			search_join=search_join,
 			bin_join_selection=bin_join_selection,
 			bin_join_condition=bin_join_condition,
+			order_by=order_by,
 		),
-		{"warehouse": warehouse},
+		values,
 		as_dict=1,
 	)
 
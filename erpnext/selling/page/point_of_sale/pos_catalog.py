@@ -0,0 +1,387 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""
+Catalog of the items of a POS profile, with their prices, UOMs and available stock, built in a few
+queries for all the items and cached. The POS loads the whole catalog once and then fetches only the
+rows of the items changed since its version, instead of paging through `point_of_sale.get_items`.
+"""
+
+import json
+from collections import defaultdict
+from datetime import timedelta
+
+import frappe
+from frappe.query_builder.functions import IfNull, Sum
+from frappe.utils import create_batch, flt, get_datetime, now_datetime
+
+from erpnext.accounts.doctype.pos_profile.pos_profile import get_child_nodes
+
+CATALOG_KEY = "pos_item_catalog"
+CATALOG_EXPIRY = 24 * 60 * 60
+# changes are read from a little before the version, for the ones not committed yet when it was taken
+CHANGES_OVERLAP = timedelta(minutes=1)
+BUNDLE_BIN_QTY = 1000000
+
+
+@frappe.whitelist()
+def get_catalog(pos_profile, price_list):
+	"""
+	Returns the catalog of the POS profile: its `version`, the rows of its `items` (the same rows as
+	`point_of_sale.get_items` with the item group) and the ancestors of their `item_groups`. The cached
+	catalog is brought up to date with the changes since it was cached, it is rebuilt if the POS profile
+	has been changed since.
+	"""
+	key = f"{CATALOG_KEY}|{pos_profile}|{price_list}"
+	catalog = frappe.cache().get_value(key)
+
+	if not catalog or get_datetime(
+		frappe.db.get_value("POS Profile", pos_profile, "modified")
+	) >= get_datetime(catalog["version"]):
+		catalog = build_catalog(pos_profile, price_list)
+	else:
+		apply_catalog_changes(catalog, get_catalog_changes(pos_profile, price_list, catalog["version"]))
+
+	frappe.cache().set_value(key, catalog, expires_in_sec=CATALOG_EXPIRY)
+	return catalog
+
+
+@frappe.whitelist()
+def get_catalog_changes(pos_profile, price_list, version):
+	"""
+	Returns the changes since `version` of a catalog: the new `version`, the `item_codes` whose rows
+	have changed and their new `items` rows, which replace all their rows in the catalog, along with
+	the ancestors of their `item_groups`
+	"""
+	new_version = str(now_datetime())
+	item_codes = get_changed_items(pos_profile, price_list, get_datetime(version) - CHANGES_OVERLAP)
+	items = get_catalog_items(pos_profile, price_list, item_codes) if item_codes else []
+
+	return {
+		"version": new_version,
+		"item_codes": item_codes,
+		"items": items,
+		"item_groups": get_item_group_ancestors({d["item_group"] for d in items}),
+	}
+
+
+def build_catalog(pos_profile, price_list):
+	# taken before reading the items, the changes made meanwhile are picked up with the next changes
+	version = str(now_datetime())
+	items = get_catalog_items(pos_profile, price_list)
+
+	return {
+		"version": version,
+		"items": items,
+		"item_groups": get_item_group_ancestors({d["item_group"] for d in items}),
+	}
+
+
+def apply_catalog_changes(catalog, changes):
+	item_codes = set(changes["item_codes"])
+	items = [d for d in catalog["items"] if d["item_code"] not in item_codes]
+	items.extend(changes["items"])
+
+	catalog["items"] = sorted(items, key=lambda d: d["item_code"])
+	catalog["item_groups"].update(changes["item_groups"])
+	catalog["version"] = changes["version"]
+
+
+def get_item_group_ancestors(item_groups):
+	"""Item groups with their ancestors, for the POS to show the rows of the selected group"""
+	if not item_groups:
+		return {}
+
+	tree = frappe.get_all("Item Group", fields=["name", "lft", "rgt"])
+	nodes = {d.name: d for d in tree}
+
+	return {
+		name: [d.name for d in tree if d.lft <= nodes[name].lft and d.rgt >= nodes[name].rgt]
+		for name in item_groups
+		if name in nodes
+	}
+
+
+def get_catalog_items(pos_profile, price_list, item_codes=None):
+	"""
+	Returns the rows of the items of the POS profile, or only the ones in `item_codes`: a row for every
+	selling price of the item in the price list, or a single row without price
+	"""
+	warehouse, hide_unavailable_items = frappe.db.get_value(
+		"POS Profile", pos_profile, ["warehouse", "hide_unavailable_items"]
+	)
+
+	items = get_items(pos_profile, item_codes)
+	if not items:
+		return []
+
+	item_codes = [d.item_code for d in items]
+	bundle_items = get_bundle_items([d.item_code for d in items if not d.is_stock_item])
+	stock_item_codes = list({*item_codes, *[d.item_code for rows in bundle_items.values() for d in rows]})
+	bin_qty = get_bin_qty(stock_item_codes, warehouse)
+	reserved_qty = get_pos_reserved_qty(stock_item_codes, warehouse)
+	conversion_factors = get_conversion_factors(item_codes)
+	prices = get_item_prices(item_codes, price_list)
+
+	result = []
+	for item in items:
+		if hide_unavailable_items and flt(bin_qty.get(item.item_code)) <= 0:
+			continue
+
+		actual_qty = get_actual_qty(item, bundle_items, bin_qty, reserved_qty)
+		row = {
+			"item_code": item.item_code,
+			"item_name": item.item_name,
+			"description": item.description,
+			"stock_uom": item.stock_uom,
+			"item_image": item.item_image,
+			"is_stock_item": item.is_stock_item,
+			"item_group": item.item_group,
+			"actual_qty": actual_qty,
+			"uom": item.stock_uom,
+		}
+
+		if not prices.get(item.item_code):
+			result.append(row)
+
+		for price in prices.get(item.item_code, []):
+			conversion_factor = conversion_factors.get((item.item_code, price.uom))
+			qty = actual_qty
+			if price.uom != item.stock_uom and conversion_factor:
+				qty = actual_qty // conversion_factor
+
+			result.append(
+				{
+					**row,
+					"actual_qty": qty,
+					"price_list_rate": price.price_list_rate,
+					"currency": price.currency,
+					"uom": price.uom or item.stock_uom,
+					"batch_no": price.batch_no,
+				}
+			)
+
+	return result
+
+
+def get_items(pos_profile, item_codes=None):
+	"""Items sold in the POS profile, the ones of its item groups (and their children) if set"""
+	item = frappe.qb.DocType("Item")
+	query = (
+		frappe.qb.from_(item)
+		.select(
+			item.name.as_("item_code"),
+			item.item_name,
+			item.description,
+			item.stock_uom,
+			item.image.as_("item_image"),
+			item.is_stock_item,
+			item.item_group,
+		)
+		.where(
+			(item.disabled == 0)
+			& (item.has_variants == 0)
+			& (item.is_sales_item == 1)
+			& (item.is_fixed_asset == 0)
+		)
+		.orderby(item.name)
+	)
+
+	item_groups = {
+		d.name
+		for row in frappe.get_cached_doc("POS Profile", pos_profile).get("item_groups")
+		for d in get_child_nodes("Item Group", row.item_group)
+	}
+	if item_groups:
+		query = query.where(item.item_group.isin(list(item_groups)))
+
+	if item_codes is None:
+		return query.run(as_dict=True)
+
+	items = []
+	for batch in create_batch(item_codes, 1000):
+		items.extend(query.where(item.name.isin(batch)).run(as_dict=True))
+
+	return items
+
+
+def get_bundle_items(item_codes):
+	"""Items of the enabled product bundles among `item_codes`, by bundle"""
+	bundle_items = defaultdict(list)
+	if not item_codes:
+		return bundle_items
+
+	bundle = frappe.qb.DocType("Product Bundle")
+	bundle_item = frappe.qb.DocType("Product Bundle Item")
+	item = frappe.qb.DocType("Item")
+
+	for batch in create_batch(item_codes, 1000):
+		for row in (
+			frappe.qb.from_(bundle)
+			.join(bundle_item)
+			.on(bundle_item.parent == bundle.name)
+			.join(item)
+			.on(item.name == bundle_item.item_code)
+			.select(bundle.name.as_("bundle"), bundle_item.item_code, bundle_item.qty, item.is_stock_item)
+			.where((bundle.disabled == 0) & bundle.name.isin(batch))
+			.orderby(bundle_item.idx)
+		).run(as_dict=True):
+			bundle_items[row.bundle].append(row)
+
+	return bundle_items
+
+
+def get_bin_qty(item_codes, warehouse):
+	bin = frappe.qb.DocType("Bin")
+	bin_qty = {}
+
+	for batch in create_batch(item_codes, 1000):
+		bin_qty.update(
+			(
+				frappe.qb.from_(bin)
+				.select(bin.item_code, bin.actual_qty)
+				.where((bin.warehouse == warehouse) & bin.item_code.isin(batch))
+			).run()
+		)
+
+	return bin_qty
+
+
+def get_pos_reserved_qty(item_codes, warehouse):
+	"""Stock qty of the submitted POS invoices not consolidated yet, by item"""
+	p_inv = frappe.qb.DocType("POS Invoice")
+	p_item = frappe.qb.DocType("POS Invoice Item")
+	reserved_qty = {}
+
+	for batch in create_batch(item_codes, 1000):
+		reserved_qty.update(
+			(
+				frappe.qb.from_(p_inv)
+				.join(p_item)
+				.on(p_inv.name == p_item.parent)
+				.select(p_item.item_code, Sum(p_item.stock_qty))
+				.where(
+					(IfNull(p_inv.consolidated_invoice, "") == "")
+					& (p_item.docstatus == 1)
+					& (p_item.warehouse == warehouse)
+					& p_item.item_code.isin(batch)
+				)
+				.groupby(p_item.item_code)
+			).run()
+		)
+
+	return reserved_qty
+
+
+def get_actual_qty(item, bundle_items, bin_qty, reserved_qty):
+	"""Stock qty in the warehouse less the qty reserved by POS invoices, as `get_stock_availability`"""
+
+	def get_available_qty(item_code):
+		return flt(bin_qty.get(item_code)) - flt(reserved_qty.get(item_code))
+
+	if item.is_stock_item:
+		return get_available_qty(item.item_code)
+
+	if item.item_code not in bundle_items:
+		return 0
+
+	# as many bundles as the least available of their stock items allows
+	bundle_qty = BUNDLE_BIN_QTY
+	for row in bundle_items[item.item_code]:
+		max_available_bundles = get_available_qty(row.item_code) / row.qty
+		if bundle_qty > max_available_bundles and row.is_stock_item:
+			bundle_qty = max_available_bundles
+
+	return bundle_qty - flt(reserved_qty.get(item.item_code))
+
+
+def get_conversion_factors(item_codes):
+	"""Conversion factors of the UOMs of the items, by (item_code, uom)"""
+	uom = frappe.qb.DocType("UOM Conversion Detail")
+	conversion_factors = {}
+
+	for batch in create_batch(item_codes, 1000):
+		for row in (
+			frappe.qb.from_(uom)
+			.select(uom.parent, uom.uom, uom.conversion_factor)
+			.where((uom.parenttype == "Item") & uom.parent.isin(batch))
+		).run(as_dict=True):
+			conversion_factors[(row.parent, row.uom)] = row.conversion_factor
+
+	return conversion_factors
+
+
+def get_item_prices(item_codes, price_list):
+	"""Selling prices of the items in the price list, by item"""
+	price = frappe.qb.DocType("Item Price")
+	prices = defaultdict(list)
+
+	for batch in create_batch(item_codes, 1000):
+		for row in (
+			frappe.qb.from_(price)
+			.select(price.item_code, price.price_list_rate, price.currency, price.uom, price.batch_no)
+			.where((price.price_list == price_list) & (price.selling == 1) & price.item_code.isin(batch))
+			.orderby(price.name)
+		).run(as_dict=True):
+			prices[row.item_code].append(row)
+
+	return prices
+
+
+def get_changed_items(pos_profile, price_list, since):
+	"""
+	Items whose rows may have changed since `since`: the ones changed or deleted, with prices changed
+	or deleted in the price list, with stock moved or reserved by POS invoices in the warehouse, and the
+	bundles of the ones whose stock has changed
+	"""
+	warehouse = frappe.db.get_value("POS Profile", pos_profile, "warehouse")
+
+	item_codes = set(frappe.get_all("Item", filters={"modified": (">", since)}, pluck="name"))
+	item_codes.update(
+		frappe.get_all(
+			"Item Price",
+			filters={"price_list": price_list, "modified": (">", since)},
+			pluck="item_code",
+		)
+	)
+
+	for row in frappe.get_all(
+		"Deleted Document",
+		filters={"deleted_doctype": ("in", ["Item", "Item Price"]), "creation": (">", since)},
+		fields=["deleted_doctype", "deleted_name", "data"],
+	):
+		if row.deleted_doctype == "Item":
+			item_codes.add(row.deleted_name)
+		elif json.loads(row.data).get("price_list") == price_list:
+			item_codes.add(json.loads(row.data).get("item_code"))
+
+	stock_item_codes = set(
+		frappe.get_all("Bin", filters={"warehouse": warehouse, "modified": (">", since)}, pluck="item_code")
+	)
+
+	p_inv = frappe.qb.DocType("POS Invoice")
+	p_item = frappe.qb.DocType("POS Invoice Item")
+	stock_item_codes.update(
+		(
+			frappe.qb.from_(p_inv)
+			.join(p_item)
+			.on(p_inv.name == p_item.parent)
+			.select(p_item.item_code)
+			.distinct()
+			.where((p_item.warehouse == warehouse) & (p_inv.modified > since))
+		).run(pluck=True)
+	)
+
+	item_codes.update(stock_item_codes)
+	item_codes.update(frappe.get_all("Product Bundle", filters={"modified": (">", since)}, pluck="name"))
+	if stock_item_codes:
+		item_codes.update(
+			frappe.get_all(
+				"Product Bundle Item",
+				filters={"item_code": ("in", list(stock_item_codes)), "parenttype": "Product Bundle"},
+				pluck="parent",
+			)
+		)
+
+	item_codes.discard(None)
+	return sorted(item_codes)
@@ -8,6 +8,7 @@ erpnext.PointOfSale.ItemSelector = class {
 		this.pos_profile = pos_profile;
 		this.hide_images = settings.hide_images;
 		this.auto_add_item = settings.auto_add_item_to_cart;
+		this.load_item_catalog = settings.load_item_catalog;
 
 		this.inti_component();
 	}
@@ -46,14 +47,69 @@ erpnext.PointOfSale.ItemSelector = class {
 			this.price_list = res.message.selling_price_list;
 		}
 
+		if (this.load_item_catalog) {
+			await this.load_catalog();
+			this.render_item_list(this.get_catalog_items());
+			return;
+		}
+
 		this.get_items({}).then(({ message }) => {
 			this.render_item_list(message.items);
 		});
 	}
 
-	get_items({ start = 0, page_length = 40, search_term = "" }) {
+	get_price_list() {
 		const doc = this.events.get_frm().doc;
-		const price_list = (doc && doc.selling_price_list) || this.price_list;
+		return (doc && doc.selling_price_list) || this.price_list;
+	}
+
+	load_catalog() {
+		const price_list = this.get_price_list();
+
+		return frappe
+			.call({
+				method: "erpnext.selling.page.point_of_sale.pos_catalog.get_catalog",
+				freeze: true,
+				args: { pos_profile: this.pos_profile, price_list },
+			})
+			.then(({ message }) => {
+				this.catalog = { ...message, price_list };
+			});
+	}
+
+	update_catalog() {
+		// only the rows of the items changed since the catalog was loaded are fetched
+		const { pos_profile, catalog } = this;
+		const price_list = this.get_price_list();
+		if (!catalog || catalog.price_list != price_list) return this.load_catalog();
+
+		return frappe
+			.call({
+				method: "erpnext.selling.page.point_of_sale.pos_catalog.get_catalog_changes",
+				args: { pos_profile, price_list, version: catalog.version },
+			})
+			.then(({ message }) => {
+				const item_codes = new Set(message.item_codes);
+				catalog.items = catalog.items
+					.filter((item) => !item_codes.has(item.item_code))
+					.concat(message.items)
+					.sort((a, b) => (a.item_code > b.item_code ? 1 : a.item_code < b.item_code ? -1 : 0));
+				Object.assign(catalog.item_groups, message.item_groups);
+				catalog.version = message.version;
+			});
+	}
+
+	get_catalog_items({ page_length = 40 } = {}) {
+		const item_group = this.item_group || this.parent_item_group;
+		const { items, item_groups } = this.catalog;
+
+		return items
+			.filter((item) => (item_groups[item.item_group] || []).includes(item_group))
+			.slice(0, page_length);
+	}
+
+	get_items({ start = 0, page_length = 40, search_term = "" }) {
+		const price_list = this.get_price_list();
 		let { item_group, pos_profile } = this;
 
 		!item_group && (item_group = this.parent_item_group);
@@ -339,6 +395,14 @@ erpnext.PointOfSale.ItemSelector = class {
 			}
 		}
 
+		if (!search_term && this.load_item_catalog) {
+			this.update_catalog().then(() => {
+				this.items = this.get_catalog_items();
+				this.render_item_list(this.items);
+			});
+			return;
+		}
+
 		this.get_items({ search_term }).then(({ message }) => {
 			// eslint-disable-next-line no-unused-vars
 			const { items, serial_no, batch_no, barcode } = message;
@@ -32,6 +32,7 @@ from erpnext.controllers.item_variant import (
 	validate_item_variant_attributes,
 )
 from erpnext.stock.doctype.item_default.item_default import ItemDefault
+from erpnext.stock.doctype.item_search_index.item_search_index import update_item_search_index_if_enabled
 
 
 class DuplicateReorderRows(frappe.ValidationError):
@@ -220,6 +221,7 @@ class Item(Document):
 	def on_update(self):
 		self.update_variants()
 		self.update_item_price()
+		update_item_search_index_if_enabled([self.name])
 
 	def validate_description(self):
 		"""Clean HTML description if set"""
@@ -539,6 +541,7 @@ class Item(Document):
 		frappe.db.sql("delete from `tabItem Price` where item_code=%s", self.name)
 		for variant_of in frappe.get_all("Item", filters={"variant_of": self.name}):
 			frappe.delete_doc("Item", variant_of.name)
+		frappe.db.delete("Item Search Index", {"item_code": self.name})
 
 	def before_rename(self, old_name, new_name, merge=False):
 		if self.item_name == old_name:
@@ -559,6 +562,7 @@ class Item(Document):
 			)
 
 		frappe.db.set_value("Item", new_name, "item_code", new_name)
+		update_item_search_index_if_enabled([old_name, new_name])
 
 		if merge:
 			self.set_last_purchase_rate(new_name)
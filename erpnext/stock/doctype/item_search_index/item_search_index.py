@@ -0,0 +1,205 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""
+Words of the searchable fields of every item (code, name, group, description, barcodes, the search
+fields of Item and the POS search fields) in a FULLTEXT index, to search items by the words they start
+with, ranked by relevance, instead of scanning all the items with `like '%txt%'`.
+
+Item link fields (`queries.item_query`) and the POS item selector search through the index once it is
+built, items are indexed as they are saved and the ones changed without being saved are indexed daily.
+"""
+
+import re
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint, create_batch, cstr, now, strip_html
+
+# words shorter than the minimum word length of InnoDB FULLTEXT indexes are not indexed
+MIN_WORD_LENGTH = 3
+DESCRIPTION_LENGTH = 1000
+
+
+class ItemSearchIndex(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		item_code: DF.Link
+		item_modified: DF.Datetime | None
+		search_text: DF.LongText | None
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	if frappe.db.db_type == "mariadb" and not frappe.db.has_index("tabItem Search Index", "search_text"):
+		frappe.db.sql_ddl(
+			"alter table `tabItem Search Index` add fulltext index `search_text` (`search_text`)"
+		)
+
+
+def is_item_search_index_enabled():
+	return frappe.db.db_type == "mariadb" and cint(
+		frappe.db.get_single_value("Stock Settings", "maintain_item_search_index", cache=True)
+	)
+
+
+def use_item_search_index():
+	"""Searches scan the items till the index is built"""
+	return is_item_search_index_enabled() and cint(
+		frappe.db.get_single_value("Stock Settings", "item_search_index_built", cache=True)
+	)
+
+
+def get_search_term(txt):
+	"""
+	Returns the boolean mode search of the items having words starting with all the words of `txt`,
+	None if some of them are too short to be indexed
+	"""
+	words = re.findall(r"\w+", cstr(txt))
+	if not words or any(len(word) < MIN_WORD_LENGTH for word in words):
+		return
+
+	return " ".join(f"+{word}*" for word in words)
+
+
+def get_item_search_subquery(txt):
+	"""
+	Returns the subquery of the items matching `txt` (`search_item`) with their `search_relevance`, to be
+	joined with the items, and its values. None if the index is not used for `txt`.
+	"""
+	search_term = get_search_term(txt) if use_item_search_index() else None
+	if not search_term:
+		return None, None
+
+	subquery = """(select name as search_item,
+			match(search_text) against (%(search_term)s in boolean mode) as search_relevance
+		from `tabItem Search Index`
+		where match(search_text) against (%(search_term)s in boolean mode))"""
+
+	return subquery, {"search_term": search_term}
+
+
+def get_search_fields():
+	meta = frappe.get_meta("Item")
+	fields = {"item_code", "item_name", "item_group", "description", *meta.get_search_fields()}
+	fields.update(frappe.get_all("POS Search Fields", pluck="fieldname"))
+
+	return sorted(field for field in fields if field != "name" and meta.has_field(field))
+
+
+def get_search_text(item, search_fields, barcodes):
+	values = [item.name]
+	for field in search_fields:
+		value = cstr(item.get(field))
+		if field == "description":
+			value = strip_html(value)[:DESCRIPTION_LENGTH]
+
+		values.append(value)
+
+	values.extend(barcodes)
+	return " ".join(value for value in values if value)
+
+
+def update_item_search_index(item_codes):
+	"""Index the items again, the ones deleted are removed from the index"""
+	search_fields = get_search_fields()
+	timestamp, user = now(), frappe.session.user
+
+	for batch in create_batch(sorted(set(item_codes)), 1000):
+		items = frappe.get_all(
+			"Item", filters={"name": ("in", batch)}, fields=["name", "modified", *search_fields]
+		)
+
+		barcodes = {}
+		for row in frappe.get_all(
+			"Item Barcode",
+			filters={"parent": ("in", batch), "parenttype": "Item"},
+			fields=["parent", "barcode"],
+		):
+			barcodes.setdefault(row.parent, []).append(row.barcode)
+
+		frappe.db.delete("Item Search Index", {"name": ("in", batch)})
+		if not items:
+			continue
+
+		frappe.db.bulk_insert(
+			"Item Search Index",
+			[
+				"name",
+				"item_code",
+				"item_modified",
+				"search_text",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+			],
+			[
+				(
+					item.name,
+					item.name,
+					item.modified,
+					get_search_text(item, search_fields, barcodes.get(item.name, [])),
+					timestamp,
+					timestamp,
+					user,
+					user,
+				)
+				for item in items
+			],
+		)
+
+
+def update_item_search_index_if_enabled(item_codes):
+	if is_item_search_index_enabled():
+		update_item_search_index(item_codes)
+
+
+def rebuild_item_search_index():
+	"""Index all the items from scratch, searches scan the items till this is done"""
+	frappe.db.set_single_value("Stock Settings", "item_search_index_built", 0)
+	frappe.db.delete("Item Search Index")
+
+	if not is_item_search_index_enabled():
+		return
+
+	for batch in create_batch(frappe.get_all("Item", pluck="name", order_by="name"), 10000):
+		update_item_search_index(batch)
+		frappe.db.commit()
+
+	frappe.db.set_single_value("Stock Settings", "item_search_index_built", 1)
+
+
+def sync_item_search_index():
+	"""Index the items changed without being saved (e.g. with `db_set`), and remove the deleted ones"""
+	if not use_item_search_index():
+		return
+
+	item = frappe.qb.DocType("Item")
+	index = frappe.qb.DocType("Item Search Index")
+
+	changed_items = (
+		frappe.qb.from_(item)
+		.left_join(index)
+		.on(index.name == item.name)
+		.select(item.name)
+		.where(index.name.isnull() | (index.item_modified != item.modified))
+	).run(pluck=True)
+
+	deleted_items = (
+		frappe.qb.from_(index)
+		.left_join(item)
+		.on(item.name == index.name)
+		.select(index.name)
+		.where(item.name.isnull())
+	).run(pluck=True)
+
+	update_item_search_index(changed_items + deleted_items)
@@ -0,0 +1,50 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+
+from erpnext.controllers.queries import item_query
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.item_search_index.item_search_index import (
+	get_search_term,
+	sync_item_search_index,
+)
+
+
+class TestItemSearchIndex(FrappeTestCase):
+	def setUp(self):
+		if frappe.db.db_type != "mariadb":
+			self.skipTest("The item search index is built on MariaDB only")
+
+	def test_search_term(self):
+		self.assertEqual(get_search_term("Blue Widget-12x"), "+Blue* +Widget* +12x*")
+		# words shorter than the indexed words are searched without the index
+		self.assertIsNone(get_search_term("Blue Widget 12"))
+		self.assertIsNone(get_search_term("%"))
+
+	@change_settings("Stock Settings", {"maintain_item_search_index": 1})
+	def test_item_indexed_on_save(self):
+		item = make_item(
+			"_Test Item Search Index",
+			{"description": "<p>Handmade <b>Ceramic</b> Mug</p>", "barcodes": [{"barcode": "8901234567897"}]},
+		)
+
+		search_text = frappe.db.get_value("Item Search Index", item.name, "search_text")
+		for word in ("_Test Item Search Index", "Handmade Ceramic Mug", "8901234567897"):
+			self.assertIn(word, search_text)
+
+		# items changed without being saved are indexed by the daily sync, once the index is built
+		frappe.db.set_single_value("Stock Settings", "item_search_index_built", 1)
+		item.db_set("description", "Stoneware Cup", update_modified=True)
+		sync_item_search_index()
+		self.assertIn("Stoneware Cup", frappe.db.get_value("Item Search Index", item.name, "search_text"))
+
+		item.delete()
+		self.assertFalse(frappe.db.exists("Item Search Index", item.name))
+
+	@change_settings("Stock Settings", {"maintain_item_search_index": 1})
+	def test_short_terms_search_items(self):
+		item = make_item("_Test Item Search IX")
+		items = item_query("Item", "IX", "name", 0, 20, {}, as_dict=True)
+		self.assertIn(item.name, [d.name for d in items])
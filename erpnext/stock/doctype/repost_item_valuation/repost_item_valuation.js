@@ -68,7 +68,6 @@ frappe.ui.form.on("Repost Item Valuation", {
 
 			if (frm.doc.status == "In Progress") {
 				frm.doc.current_index = data.current_index;
-				frm.doc.items_to_be_repost = data.items_to_be_repost;
 				frm.doc.total_reposting_count = data.total_reposting_count;
 
 				frm.dashboard.reset();
@@ -89,6 +88,45 @@ frappe.ui.form.on("Repost Item Valuation", {
 		if (frm.doc.status === "Queued" && frm.doc.docstatus === 1) {
 			frm.trigger("execute_reposting");
 		}
+
+		if (frm.doc.docstatus === 0 || frm.doc.status === "Queued") {
+			frm.add_custom_button(__("Estimate Impact"), () => {
+				frm.trigger("estimate_repost_impact");
+			});
+		}
+	},
+
+	estimate_repost_impact(frm) {
+		frappe.call({
+			method: "estimate_repost_impact",
+			doc: frm.doc,
+			freeze: true,
+			callback: function (r) {
+				if (!r.message) return;
+
+				let estimate = r.message;
+				let rows = [
+					[__("Item-Warehouses"), estimate.item_warehouses],
+					[__("Future Stock Ledger Entries"), estimate.future_sles],
+					[__("Dependent Vouchers"), estimate.dependent_vouchers],
+					[__("GL Vouchers"), estimate.gl_vouchers],
+					[__("Expected Runtime"), frappe.utils.get_formatted_duration(Math.ceil(estimate.expected_runtime))],
+				];
+
+				let message = `<table class="table table-bordered">
+					${rows.map((row) => `<tr><td>${row[0]}</td><td>${row[1]}</td></tr>`).join("")}
+				</table>`;
+
+				if (estimate.limit_reposting_timeslot) {
+					message += __("Reposting runs between {0} and {1}.", [
+						estimate.start_time,
+						estimate.end_time,
+					]);
+				}
+
+				frappe.msgprint(message, __("Repost Impact Estimate"));
+			},
+		});
 	},
 
 	execute_reposting(frm) {
@@ -1,28 +1,43 @@
 # Copyright (c) 2020, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+import json
+from collections import defaultdict
+
 import frappe
 from frappe import _
 from frappe.desk.form.load import get_attachments
 from frappe.exceptions import QueryDeadlockError, QueryTimeoutError
 from frappe.model.document import Document
 from frappe.query_builder import DocType, Interval
-from frappe.query_builder.functions import Max, Now
-from frappe.utils import cint, get_link_to_form, get_weekday, getdate, now, nowtime
+from frappe.query_builder.functions import Count, IfNull, Max, Now
+from frappe.utils import cint, create_batch, get_link_to_form, get_weekday, getdate, now, nowtime
+from frappe.utils.background_jobs import is_job_enqueued
 from frappe.utils.user import get_users_with_role
 from rq.timeouts import JobTimeoutException
 
 import erpnext
 from erpnext.accounts.general_ledger import validate_accounting_period
 from erpnext.accounts.utils import get_future_stock_vouchers, repost_gle_for_stock_vouchers
+from erpnext.stock.reposting_metrics import RepostMetrics
 from erpnext.stock.stock_ledger import (
 	get_affected_transactions,
 	get_items_to_be_repost,
 	repost_future_sle,
+	update_difference_amount_in_stock_reconciliation,
 )
+from erpnext.stock.utils import get_combine_datetime
 
 RecoverableErrors = (JobTimeoutException, QueryDeadlockError, QueryTimeoutError)
 
+# Vouchers which are recalculated as a whole while reposting any of their rows,
+# item-warehouses sharing such a voucher can not be reposted in parallel.
+LINKED_VOUCHER_TYPES = ("Stock Entry", "Subcontracting Receipt")
+
+# Rough single worker throughput, used to estimate the runtime of a repost
+SLES_REPOSTED_PER_SECOND = 200
+GL_VOUCHERS_REPOSTED_PER_SECOND = 25
+
 
 class RepostItemValuation(Document):
 	# begin: auto-generated types
@@ -33,23 +48,33 @@ class RepostItemValuation(Document):
 	if TYPE_CHECKING:
 		from frappe.types import DF
 
+		from erpnext.stock.doctype.repost_item_valuation_chain.repost_item_valuation_chain import (
+			RepostItemValuationChain,
+		)
+
 		affected_transactions: DF.Code | None
 		allow_negative_stock: DF.Check
 		allow_zero_rate: DF.Check
 		amended_from: DF.Link | None
 		based_on: DF.Literal["Transaction", "Item and Warehouse"]
+		coalesced_into: DF.Link | None
+		coalesced_reposts: DF.Int
 		company: DF.Link | None
 		current_index: DF.Int
 		distinct_item_and_warehouse: DF.Code | None
+		entries_saved: DF.Int
 		error_log: DF.LongText | None
 		gl_reposting_index: DF.Int
 		item_code: DF.Link | None
 		items_to_be_repost: DF.Code | None
 		posting_date: DF.Date
 		posting_time: DF.Time | None
+		reposting_chains: DF.Table[RepostItemValuationChain]
 		reposting_data_file: DF.Attach | None
+		reposting_metrics: DF.Code | None
 		status: DF.Literal["Queued", "In Progress", "Completed", "Skipped", "Failed"]
 		total_reposting_count: DF.Int
+		triggered_by: DF.Code | None
 		via_landed_cost_voucher: DF.Check
 		voucher_no: DF.DynamicLink | None
 		voucher_type: DF.Link | None
@@ -220,8 +245,49 @@ class RepostItemValuation(Document):
 		self.items_to_be_repost = None
 		self.gl_reposting_index = 0
 		self.clear_attachment()
+		if any(chain.status == "Completed" for chain in self.reposting_chains):
+			# the chains already reposted are not reposted again
+			self.requeue_reposting_chains()
+		else:
+			self.clear_reposting_chains()
 		self.db_update()
 
+	@frappe.whitelist()
+	def estimate_repost_impact(self):
+		return estimate_repost_impact(
+			based_on=self.based_on,
+			voucher_type=self.voucher_type,
+			voucher_no=self.voucher_no,
+			item_code=self.item_code,
+			warehouse=self.warehouse,
+			posting_date=self.posting_date,
+			posting_time=self.posting_time,
+			company=self.company,
+		)
+
+	def clear_reposting_chains(self):
+		if not self.reposting_chains:
+			return
+
+		frappe.db.delete("Repost Item Valuation Chain", {"parent": self.name, "parenttype": self.doctype})
+		self.reposting_chains = []
+
+	def requeue_reposting_chains(self):
+		for chain in self.reposting_chains:
+			if chain.status == "Completed":
+				continue
+
+			rows = [frappe._dict(d) for d in json.loads(chain.items_to_be_repost)]
+			chain.update(
+				{
+					"status": "Queued",
+					"current_index": 0,
+					"distinct_item_and_warehouse": get_chain_item_warehouses(rows),
+					"error_log": None,
+				}
+			)
+			chain.db_update()
+
 	def deduplicate_similar_repost(self):
 		"""Deduplicate similar reposts based on item-warehouse-posting combination."""
 		if self.based_on != "Item and Warehouse":
@@ -235,10 +301,11 @@ class RepostItemValuation(Document):
 			"posting_time": self.posting_time,
 		}
 
-		frappe.db.sql(
+		duplicates = frappe.db.sql(
 			"""
-			update `tabRepost Item Valuation`
-			set status = 'Skipped'
+			select name, item_code, warehouse, posting_date, posting_time,
+				coalesced_reposts, entries_saved, triggered_by
+			from `tabRepost Item Valuation`
 			WHERE item_code = %(item_code)s
 				and warehouse = %(warehouse)s
 				and name != %(name)s
@@ -248,14 +315,19 @@ class RepostItemValuation(Document):
 				and based_on = 'Item and Warehouse'
 				""",
 			filters,
+			as_dict=True,
 		)
 
+		if duplicates:
+			merge_reposts(self.name, duplicates)
+
 
 def on_doctype_update():
 	frappe.db.add_index("Repost Item Valuation", ["warehouse", "item_code"], "item_warehouse")
 
 
 def repost(doc):
+	metrics = make_repost_metrics()
 	try:
 		frappe.flags.through_repost_item_valuation = True
 		if not frappe.db.exists("Repost Item Valuation", doc.name):
@@ -268,8 +340,16 @@ def repost(doc):
 		if not frappe.flags.in_test:
 			frappe.db.commit()
 
-		repost_sl_entries(doc)
-		repost_gl_entries(doc)
+		if doc.reposting_chains or set_reposting_chains(doc):
+			# the last chain to finish reposts the GL entries, see `repost_chain`
+			enqueue_reposting_chains(doc)
+			# unless they are all completed already, when the GL repost failed or timed out earlier
+			complete_parallel_reposting(doc.name)
+			return
+
+		with metrics.capture():
+			repost_sl_entries(doc)
+			repost_gl_entries(doc)
 
 		doc.set_status("Completed")
 		doc.db_set("reposting_data_file", None)
@@ -281,46 +361,72 @@ def repost(doc):
 			# there is no reason for reposts to fail in CI
 			raise
 
-		frappe.db.rollback()
-		traceback = frappe.get_traceback(with_context=True)
-		doc.log_error("Unable to repost item valuation")
+		handle_repost_failure(doc, e)
+	finally:
+		metrics.save(doc)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
 
-		message = frappe.message_log.pop() if frappe.message_log else ""
-		if isinstance(message, dict):
-			message = message.get("message")
 
-		status = "Failed"
-		# If failed because of timeout, set status to In Progress
-		if traceback and "timeout" in traceback.lower():
-			status = "In Progress"
+def make_repost_metrics():
+	return RepostMetrics(
+		profile=cint(frappe.db.get_single_value("Stock Reposting Settings", "profile_reposting"))
+	)
 
-		if traceback:
-			message += "<br><br>" + "<b>Traceback:</b> <br>" + traceback
 
-		frappe.db.set_value(
-			doc.doctype,
-			doc.name,
-			{
-				"error_log": message,
-				"status": status,
-			},
-		)
+def handle_repost_failure(doc, e):
+	frappe.db.rollback()
+	message, status = get_repost_failure(doc)
 
-		outgoing_email_account = frappe.get_cached_value(
-			"Email Account", {"default_outgoing": 1, "enable_outgoing": 1}, "name"
-		)
+	frappe.db.set_value(
+		doc.doctype,
+		doc.name,
+		{
+			"error_log": message,
+			"status": status,
+		},
+	)
+
+	outgoing_email_account = frappe.get_cached_value(
+		"Email Account", {"default_outgoing": 1, "enable_outgoing": 1}, "name"
+	)
+
+	if outgoing_email_account and not isinstance(e, RecoverableErrors):
+		notify_error_to_stock_managers(doc, message)
+		doc.set_status("Failed")
+
+	return status
 
-		if outgoing_email_account and not isinstance(e, RecoverableErrors):
-			notify_error_to_stock_managers(doc, message)
-			doc.set_status("Failed")
-	finally:
-		if not frappe.flags.in_test:
-			frappe.db.commit()
+
+def get_repost_failure(doc):
+	"""Returns the error log and status of the failed repost"""
+	traceback = frappe.get_traceback(with_context=True)
+	doc.log_error("Unable to repost item valuation")
+
+	message = frappe.message_log.pop() if frappe.message_log else ""
+	if isinstance(message, dict):
+		message = message.get("message")
+
+	status = "Failed"
+	# If failed because of timeout, set status to In Progress
+	if traceback and "timeout" in traceback.lower():
+		status = "In Progress"
+
+	if traceback:
+		message += "<br><br>" + "<b>Traceback:</b> <br>" + traceback
+
+	return message, status
 
 
 def remove_attached_file(docname):
 	if file_name := frappe.db.get_value(
-		"File", {"attached_to_name": docname, "attached_to_doctype": "Repost Item Valuation"}, "name"
+		"File",
+		{
+			"attached_to_name": docname,
+			"attached_to_doctype": "Repost Item Valuation",
+			"attached_to_field": "reposting_data_file",
+		},
+		"name",
 	):
 		frappe.delete_doc("File", file_name, ignore_permissions=True, delete_permanently=True)
 
@@ -352,6 +458,396 @@ def repost_sl_entries(doc):
 		)
 
 
+def set_reposting_chains(doc) -> bool:
+	"""Split a transaction based repost into independent item-warehouse chains.
+
+	Returns True if the chains can be reposted by parallel workers."""
+	workers = cint(frappe.db.get_single_value("Stock Reposting Settings", "parallel_reposting_workers"))
+	if workers < 2 or doc.based_on != "Transaction":
+		return False
+
+	# only fresh reposts are split, partially reposted entries resume sequentially
+	if doc.current_index or doc.items_to_be_repost or doc.reposting_data_file:
+		return False
+
+	args = get_items_to_be_repost(voucher_type=doc.voucher_type, voucher_no=doc.voucher_no)
+	chains = get_independent_chains(args)
+	if len(chains) < 2:
+		return False
+
+	# distribute the chains over the workers, largest first
+	buckets = [[] for _i in range(min(workers, len(chains)))]
+	for chain in sorted(chains, key=len, reverse=True):
+		min(buckets, key=len).extend(chain)
+
+	for rows in buckets:
+		row = doc.append(
+			"reposting_chains",
+			{
+				"status": "Queued",
+				"docstatus": doc.docstatus,
+				"total_reposting_count": len(rows),
+				"items_to_be_repost": json.dumps(rows, default=str),
+				"distinct_item_and_warehouse": get_chain_item_warehouses(rows),
+			},
+		)
+		row.db_insert()
+
+	return True
+
+
+def get_chain_item_warehouses(rows) -> str:
+	"""Reposting status of the item-warehouses of a chain, none of them reposted yet"""
+	return json.dumps(
+		{
+			str((d.item_code, d.warehouse)): {"reposting_status": False, "sle": d, "args_idx": i}
+			for i, d in enumerate(rows)
+		},
+		default=str,
+	)
+
+
+def get_independent_chains(args) -> list[list]:
+	"""Group the item-warehouses to be reposted into chains which can be reposted independently.
+
+	Item-warehouses are linked if a future voucher moves stock between them (transfer, manufacture,
+	repack, subcontracting) or if the voucher is recalculated as a whole while reposting."""
+	if not args:
+		return []
+
+	posting_datetime = min(get_combine_datetime(d.posting_date, d.posting_time) for d in args)
+
+	parent = {}
+
+	def find(key):
+		while parent[key] != key:
+			parent[key] = parent[parent[key]]
+			key = parent[key]
+		return key
+
+	for d in args:
+		parent.setdefault((d.item_code, d.warehouse), (d.item_code, d.warehouse))
+
+	frontier = set(parent)
+	processed_vouchers = set()
+	while frontier:
+		linked_item_warehouses = get_linked_item_warehouses(frontier, posting_datetime, processed_vouchers)
+		frontier = set()
+
+		for item_warehouses in linked_item_warehouses:
+			for key in item_warehouses:
+				if key not in parent:
+					parent[key] = key
+					frontier.add(key)
+
+				parent[find(key)] = find(item_warehouses[0])
+
+	chains = defaultdict(list)
+	for d in args:
+		chains[find((d.item_code, d.warehouse))].append(d)
+
+	return list(chains.values())
+
+
+def get_linked_item_warehouses(item_warehouses, posting_datetime, processed_vouchers) -> list[list]:
+	"""Returns the item-warehouses of every future linked voucher, per voucher"""
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+
+	vouchers = set()
+	for batch in create_batch(list(item_warehouses), 1000):
+		query = (
+			frappe.qb.from_(sle)
+			.select(sle.voucher_type, sle.voucher_no, sle.item_code, sle.warehouse)
+			.distinct()
+			.where(
+				(sle.is_cancelled == 0)
+				& (sle.posting_datetime >= posting_datetime)
+				& (sle.item_code.isin({d[0] for d in batch}))
+				& (sle.warehouse.isin({d[1] for d in batch}))
+				& (
+					sle.voucher_type.isin(LINKED_VOUCHER_TYPES)
+					| (IfNull(sle.dependant_sle_voucher_detail_no, "") != "")
+				)
+			)
+		)
+
+		for row in query.run(as_dict=True):
+			voucher = (row.voucher_type, row.voucher_no)
+			if (row.item_code, row.warehouse) in item_warehouses and voucher not in processed_vouchers:
+				vouchers.add(voucher)
+
+	processed_vouchers.update(vouchers)
+
+	linked_item_warehouses = defaultdict(set)
+	for batch in create_batch(list(vouchers), 1000):
+		query = (
+			frappe.qb.from_(sle)
+			.select(sle.voucher_type, sle.voucher_no, sle.item_code, sle.warehouse)
+			.distinct()
+			.where((sle.is_cancelled == 0) & (sle.voucher_no.isin({d[1] for d in batch})))
+		)
+
+		for row in query.run(as_dict=True):
+			if (row.voucher_type, row.voucher_no) in vouchers:
+				linked_item_warehouses[(row.voucher_type, row.voucher_no)].add((row.item_code, row.warehouse))
+
+	return [list(d) for d in linked_item_warehouses.values()]
+
+
+@frappe.whitelist()
+def estimate_repost_impact(
+	based_on="Transaction",
+	voucher_type=None,
+	voucher_no=None,
+	item_code=None,
+	warehouse=None,
+	posting_date=None,
+	posting_time=None,
+	company=None,
+) -> dict:
+	"""Dry run of a repost, nothing is written.
+
+	Estimates the future stock ledger entries, dependent vouchers and GL vouchers
+	which would be reposted and the time it would take."""
+	frappe.has_permission("Repost Item Valuation", "read", throw=True)
+
+	args = get_items_to_be_estimated(
+		based_on, voucher_type, voucher_no, item_code, warehouse, posting_date, posting_time
+	)
+	if not args:
+		return frappe._dict(
+			item_warehouses=0, future_sles=0, dependent_vouchers=0, gl_vouchers=0, expected_runtime=0
+		)
+
+	posting_datetime = min(get_combine_datetime(d.posting_date, d.posting_time) for d in args)
+	if not company:
+		company = frappe.get_cached_value("Warehouse", args[0].warehouse, "company")
+
+	# follow the transfers / manufacture entries into other item-warehouses
+	item_warehouses = {(d.item_code, d.warehouse) for d in args}
+	frontier = set(item_warehouses)
+	dependent_vouchers = set()
+	while frontier:
+		linked_item_warehouses = get_linked_item_warehouses(frontier, posting_datetime, dependent_vouchers)
+		frontier = {key for keys in linked_item_warehouses for key in keys} - item_warehouses
+		item_warehouses.update(frontier)
+
+	future_sles, gl_vouchers = get_future_sle_and_voucher_count(item_warehouses, posting_datetime)
+	if not cint(erpnext.is_perpetual_inventory_enabled(company)):
+		gl_vouchers = 0
+
+	repost_settings = frappe.get_cached_doc("Stock Reposting Settings")
+
+	return frappe._dict(
+		item_warehouses=len(item_warehouses),
+		future_sles=future_sles,
+		dependent_vouchers=len(dependent_vouchers),
+		gl_vouchers=gl_vouchers,
+		expected_runtime=future_sles / SLES_REPOSTED_PER_SECOND
+		+ gl_vouchers / GL_VOUCHERS_REPOSTED_PER_SECOND,
+		in_configured_timeslot=in_configured_timeslot(repost_settings),
+		limit_reposting_timeslot=repost_settings.limit_reposting_timeslot,
+		start_time=repost_settings.start_time,
+		end_time=repost_settings.end_time,
+	)
+
+
+def get_items_to_be_estimated(
+	based_on, voucher_type, voucher_no, item_code, warehouse, posting_date, posting_time
+) -> list:
+	if based_on != "Transaction":
+		if not (item_code and warehouse and posting_date):
+			return []
+
+		return [
+			frappe._dict(
+				item_code=item_code,
+				warehouse=warehouse,
+				posting_date=posting_date,
+				posting_time=posting_time or "00:00:00",
+			)
+		]
+
+	if not (voucher_type and voucher_no):
+		return []
+
+	if args := get_items_to_be_repost(voucher_type=voucher_type, voucher_no=voucher_no):
+		return args
+
+	# draft transaction, the item-warehouses come from its rows
+	ref_doc = frappe.get_doc(voucher_type, voucher_no)
+	rows = (ref_doc.get("items") or []) + (ref_doc.get("packed_items") or [])
+
+	args = {}
+	for row in rows:
+		for fieldname in ("warehouse", "s_warehouse", "t_warehouse"):
+			if row.item_code and row.get(fieldname):
+				args.setdefault(
+					(row.item_code, row.get(fieldname)),
+					frappe._dict(
+						item_code=row.item_code,
+						warehouse=row.get(fieldname),
+						posting_date=ref_doc.posting_date,
+						posting_time=ref_doc.get("posting_time") or "00:00:00",
+					),
+				)
+
+	return list(args.values())
+
+
+def get_future_sle_and_voucher_count(item_warehouses, posting_datetime) -> tuple[int, int]:
+	"""Count the future entries and the distinct future vouchers of the item-warehouses"""
+	if not item_warehouses:
+		return 0, 0
+
+	item_warehouses = list(item_warehouses)
+	condition = """is_cancelled = 0
+		and posting_datetime >= %s
+		and (item_code, warehouse) in ({})""".format(", ".join(["(%s, %s)"] * len(item_warehouses)))
+
+	future_sles, vouchers = frappe.db.multisql(
+		{
+			"mariadb": f"""select count(*), count(distinct voucher_type, voucher_no)
+				from `tabStock Ledger Entry` where {condition}""",
+			"postgres": f"""select count(*), count(distinct (voucher_type, voucher_no))
+				from "tabStock Ledger Entry" where {condition}""",
+		},
+		[posting_datetime, *(value for key in item_warehouses for value in key)],
+	)[0]
+
+	return future_sles, vouchers
+
+
+def get_chain_job_id(doc, chain) -> str:
+	return f"repost_item_valuation::{doc.name}::{chain.name}"
+
+
+def enqueue_reposting_chains(doc):
+	for chain in doc.reposting_chains:
+		# failed chains wait for the repost to be restarted
+		if chain.status in ("Completed", "Failed"):
+			continue
+
+		job_id = get_chain_job_id(doc, chain)
+		if is_job_enqueued(job_id):
+			continue
+
+		frappe.enqueue(
+			repost_chain,
+			queue="long",
+			timeout=7200,
+			job_id=job_id,
+			enqueue_after_commit=True,
+			now=frappe.flags.in_test,
+			riv_name=doc.name,
+			chain_name=chain.name,
+		)
+
+
+def repost_chain(riv_name, chain_name):
+	"""Repost SLEs of one chain of a parallel repost, the last chain reposts the GL entries."""
+	doc = frappe.get_doc("Repost Item Valuation", riv_name)
+	chain = doc.getone("reposting_chains", {"name": chain_name})
+	if not chain or chain.status == "Completed" or doc.status != "In Progress":
+		return
+
+	metrics = make_repost_metrics()
+	try:
+		frappe.flags.through_repost_item_valuation = True
+		frappe.db.MAX_WRITES_PER_TRANSACTION *= 4
+
+		chain.db_set("status", "In Progress")
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+		with metrics.capture():
+			repost_future_sle(
+				allow_negative_stock=doc.allow_negative_stock,
+				via_landed_cost_voucher=doc.via_landed_cost_voucher,
+				doc=chain,
+			)
+			chain.db_set("status", "Completed")
+	except Exception:
+		if frappe.flags.in_test:
+			raise
+
+		handle_chain_failure(doc, chain)
+		return
+	finally:
+		metrics.save(chain)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+	# the chain is committed as completed, a failure from here on is of the repost and not of the chain
+	repost_parallel_gl_entries(doc)
+
+
+def repost_parallel_gl_entries(doc):
+	"""Repost the GL entries once all the chains are completed, failures are logged on the repost"""
+	metrics = make_repost_metrics()
+	try:
+		with metrics.capture():
+			complete_parallel_reposting(doc.name)
+	except Exception as e:
+		if frappe.flags.in_test:
+			raise
+
+		handle_repost_failure(doc, e)
+	finally:
+		metrics.save(doc)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+
+def handle_chain_failure(doc, chain):
+	"""
+	Mark the chain failed, the other chains go on. The repost fails once they are done, and only the
+	chains not completed are reposted again when it is restarted.
+	"""
+	frappe.db.rollback()
+	message, status = get_repost_failure(doc)
+
+	# chains which timed out stay in progress, they are queued again by `repost_entries`
+	chain.db_set({"status": status, "error_log": message})
+	if status == "Failed":
+		complete_parallel_reposting(doc.name)
+
+
+def complete_parallel_reposting(riv_name):
+	# lock the repost entry, so that only one chain can find all chains done
+	frappe.db.get_value("Repost Item Valuation", riv_name, "name", for_update=True)
+
+	doc = frappe.get_doc("Repost Item Valuation", riv_name)
+	if doc.status != "In Progress" or any(
+		chain.status in ("Queued", "In Progress") for chain in doc.reposting_chains
+	):
+		return
+
+	if failed_chains := [chain for chain in doc.reposting_chains if chain.status == "Failed"]:
+		message = "<br><br>".join(chain.error_log or "" for chain in failed_chains)
+		doc.db_set({"status": "Failed", "error_log": message})
+
+		if frappe.get_cached_value("Email Account", {"default_outgoing": 1, "enable_outgoing": 1}, "name"):
+			notify_error_to_stock_managers(doc, message)
+		return
+
+	affected_transactions = set()
+	for chain in doc.reposting_chains:
+		affected_transactions.update(
+			tuple(transaction) for transaction in frappe.parse_json(chain.affected_transactions or "[]")
+		)
+
+	# rows of the same reconciliation are reposted by different chains
+	for voucher_type, voucher_no in affected_transactions:
+		if voucher_type == "Stock Reconciliation":
+			update_difference_amount_in_stock_reconciliation(voucher_no)
+
+	doc.db_set("affected_transactions", frappe.as_json(affected_transactions))
+	repost_gl_entries(doc)
+
+	doc.set_status("Completed")
+
+
 def repost_gl_entries(doc):
 	if not cint(erpnext.is_perpetual_inventory_enabled(doc.company)):
 		return
@@ -436,6 +932,7 @@ def repost_entries():
 	if not in_configured_timeslot():
 		return
 
+	coalesce_queued_reposts()
 	riv_entries = get_repost_item_valuation_entries()
 
 	for row in riv_entries:
@@ -444,11 +941,125 @@ def repost_entries():
 			repost(doc)
 			doc.deduplicate_similar_repost()
 
+		# the later reposts can touch the item-warehouses of the chains being reposted in the background
+		if has_pending_reposting_chains(doc.name):
+			break
+
 	riv_entries = get_repost_item_valuation_entries()
 	if riv_entries:
 		return
 
 
+def has_pending_reposting_chains(riv_name) -> bool:
+	return bool(
+		frappe.db.exists(
+			"Repost Item Valuation Chain",
+			{
+				"parent": riv_name,
+				"parenttype": "Repost Item Valuation",
+				"status": ("in", ["Queued", "In Progress"]),
+			},
+		)
+	)
+
+
+def coalesce_queued_reposts():
+	"""
+	Merge the queued item-warehouse reposts into the earliest one of every item-warehouse,
+	so that the future entries are replayed once instead of once per backdated transaction.
+	"""
+	riv = frappe.qb.DocType("Repost Item Valuation")
+	queued_entries = (
+		frappe.qb.from_(riv)
+		.select(
+			riv.name,
+			riv.item_code,
+			riv.warehouse,
+			riv.posting_date,
+			riv.posting_time,
+			riv.allow_negative_stock,
+			riv.allow_zero_rate,
+			riv.via_landed_cost_voucher,
+			riv.coalesced_reposts,
+			riv.entries_saved,
+			riv.triggered_by,
+		)
+		.where(
+			(riv.docstatus == 1)
+			& (riv.status == "Queued")
+			& (riv.based_on == "Item and Warehouse")
+			# partially reposted entries can not take over the others
+			& (IfNull(riv.current_index, 0) == 0)
+			& (IfNull(riv.reposting_data_file, "") == "")
+			& (IfNull(riv.items_to_be_repost, "") == "")
+		)
+		.orderby(riv.posting_date)
+		.orderby(riv.posting_time)
+		.orderby(riv.creation)
+	).run(as_dict=True)
+
+	similar_reposts = defaultdict(list)
+	for d in queued_entries:
+		key = (d.item_code, d.warehouse, d.allow_negative_stock, d.allow_zero_rate, d.via_landed_cost_voucher)
+		similar_reposts[key].append(d)
+
+	for reposts in similar_reposts.values():
+		if len(reposts) > 1:
+			merge_reposts(reposts[0].name, reposts[1:])
+
+
+def merge_reposts(target, reposts):
+	"""Skip `reposts` in favour of the earlier `target` repost, keeping track of what was merged."""
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+
+	target = frappe.db.get_value(
+		"Repost Item Valuation",
+		target,
+		["name", "coalesced_reposts", "entries_saved", "triggered_by"],
+		as_dict=True,
+	)
+	triggered_by = json.loads(target.triggered_by or "[]")
+	coalesced_reposts = target.coalesced_reposts
+	entries_saved = target.entries_saved
+
+	for d in reposts:
+		triggered_by.extend(
+			voucher for voucher in json.loads(d.triggered_by or "[]") if voucher not in triggered_by
+		)
+		coalesced_reposts += 1 + d.coalesced_reposts
+
+		# entries which would have been replayed again by the merged repost
+		future_entries = (
+			frappe.qb.from_(sle)
+			.select(Count("*"))
+			.where(
+				(sle.item_code == d.item_code)
+				& (sle.warehouse == d.warehouse)
+				& (sle.is_cancelled == 0)
+				& (sle.posting_datetime >= get_combine_datetime(d.posting_date, d.posting_time))
+			)
+		).run()[0][0]
+		entries_saved += d.entries_saved + future_entries
+
+	frappe.db.set_value(
+		"Repost Item Valuation",
+		target.name,
+		{
+			"triggered_by": json.dumps(triggered_by),
+			"coalesced_reposts": coalesced_reposts,
+			"entries_saved": entries_saved,
+		},
+	)
+
+	riv = frappe.qb.DocType("Repost Item Valuation")
+	(
+		frappe.qb.update(riv)
+		.set(riv.status, "Skipped")
+		.set(riv.coalesced_into, target.name)
+		.where(riv.name.isin([d.name for d in reposts]) & (riv.status == "Queued"))
+	).run()
+
+
 def get_repost_item_valuation_entries():
 	return frappe.db.sql(
 		""" SELECT name from `tabRepost Item Valuation`
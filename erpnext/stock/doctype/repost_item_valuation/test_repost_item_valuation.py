@@ -1,8 +1,8 @@
 # Copyright (c) 2021, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
 
-
-from unittest.mock import MagicMock, call
+import json
+from unittest.mock import MagicMock, call, patch
 
 import frappe
 from frappe.tests.utils import FrappeTestCase, change_settings
@@ -14,9 +14,18 @@ from erpnext.controllers.stock_controller import create_item_wise_repost_entries
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.purchase_receipt.test_purchase_receipt import make_purchase_receipt
 from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import (
+	coalesce_queued_reposts,
+	estimate_repost_impact,
+	get_independent_chains,
+	handle_chain_failure,
 	in_configured_timeslot,
+	repost,
+	repost_chain,
+	set_reposting_chains,
 )
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+from erpnext.stock.report.reposting_performance.reposting_performance import execute as get_performance
+from erpnext.stock.stock_ledger import RepostingJournal, repost_future_sle
 from erpnext.stock.tests.test_utils import StockTestMixin
 from erpnext.stock.utils import PendingRepostingError
 
@@ -178,6 +187,48 @@ class TestRepostItemValuation(FrappeTestCase, StockTestMixin):
 		riv4.set_status("Skipped")
 		riv3.set_status("Skipped")
 
+	def test_coalesce_queued_reposts(self):
+		item_code = make_item(properties={"is_stock_item": 1}).name
+		warehouse = "_Test Warehouse - _TC"
+
+		make_stock_entry(
+			item_code=item_code, target=warehouse, qty=10, rate=10, posting_date=add_days(today(), -5)
+		)
+		make_stock_entry(item_code=item_code, source=warehouse, qty=2)
+
+		reposts = []
+		for days, voucher_no in ((-2, "SI-2"), (-4, "SI-1"), (-2, "SI-3")):
+			riv = frappe.get_doc(
+				doctype="Repost Item Valuation",
+				item_code=item_code,
+				warehouse=warehouse,
+				based_on="Item and Warehouse",
+				posting_date=add_days(today(), days),
+				posting_time="00:01:00",
+				triggered_by=json.dumps([["Sales Invoice", voucher_no]]),
+			)
+			riv.flags.dont_run_in_test = True
+			riv.submit()
+			reposts.append(riv)
+
+		coalesce_queued_reposts()
+		for riv in reposts:
+			riv.load_from_db()
+
+		later, earliest, same_time = reposts
+		self.assertEqual(earliest.status, "Queued")
+		self.assertEqual(earliest.coalesced_reposts, 2)
+		self.assertEqual(earliest.entries_saved, 2)
+		self.assertEqual(
+			json.loads(earliest.triggered_by),
+			[["Sales Invoice", "SI-1"], ["Sales Invoice", "SI-2"], ["Sales Invoice", "SI-3"]],
+		)
+		for riv in (later, same_time):
+			self.assertEqual(riv.status, "Skipped")
+			self.assertEqual(riv.coalesced_into, earliest.name)
+
+		earliest.set_status("Skipped")
+
 	def test_stock_freeze_validation(self):
 		today = nowdate()
 
@@ -300,6 +351,45 @@ class TestRepostItemValuation(FrappeTestCase, StockTestMixin):
 			gle_filters={"account": "Stock In Hand - TCP1"},
 		)
 
+	@change_settings("Stock Reposting Settings", {"repost_changed_gl_entries_only": 1})
+	def test_gl_diff_reposting(self):
+		item = self.make_item().name
+		company = "_Test Company with perpetual inventory"
+
+		make_stock_entry(item=item, company=company, qty=1, rate=10, target="Stores - TCP1")
+		consumption = make_stock_entry(item=item, company=company, qty=1, source="Stores - TCP1")
+		gl_entries = frappe.get_all(
+			"GL Entry", filters={"voucher_no": consumption.name, "is_cancelled": 0}, pluck="name"
+		)
+
+		# backdated receipt changes the valuation of the consumption
+		make_stock_entry(
+			item=item,
+			company=company,
+			qty=1,
+			rate=50,
+			target="Stores - TCP1",
+			posting_date=add_to_date(today(), days=-1),
+		)
+		self.assertGLEs(
+			consumption,
+			[{"credit": 50, "debit": 0}],
+			gle_filters={"account": "Stock In Hand - TCP1"},
+		)
+
+		# the amounts are updated in place
+		self.assertEqual(
+			sorted(gl_entries),
+			sorted(
+				frappe.get_all(
+					"GL Entry", filters={"voucher_no": consumption.name, "is_cancelled": 0}, pluck="name"
+				)
+			),
+		)
+		self.assertEqual(
+			repost_gle_for_stock_vouchers([(consumption.doctype, consumption.name)], today(), company), 0
+		)
+
 	def test_duplicate_ple_on_repost(self):
 		from erpnext.accounts import utils
 
@@ -458,3 +548,264 @@ class TestRepostItemValuation(FrappeTestCase, StockTestMixin):
 						"name",
 					)
 				)
+
+	def test_independent_reposting_chains(self):
+		items = [make_item(properties={"is_stock_item": 1}).name for _ in range(3)]
+		warehouse = "_Test Warehouse - _TC"
+		posting_date = add_days(today(), -2)
+
+		for item_code in items:
+			make_stock_entry(
+				item_code=item_code, target=warehouse, qty=10, rate=10, posting_date=posting_date
+			)
+
+		# repack links the raw material with the finished item
+		repack = make_stock_entry(
+			item_code=items[1], source=warehouse, qty=5, purpose="Repack", do_not_save=True
+		)
+		repack.append(
+			"items",
+			{"item_code": items[2], "t_warehouse": warehouse, "qty": 1, "transfer_qty": 1},
+		)
+		repack.save()
+		repack.submit()
+
+		args = [
+			frappe._dict(
+				item_code=item_code, warehouse=warehouse, posting_date=posting_date, posting_time="00:00:00"
+			)
+			for item_code in items
+		]
+		chains = get_independent_chains(args)
+
+		self.assertEqual(
+			sorted([d.item_code for d in chain] for chain in chains), sorted([[items[0]], items[1:]])
+		)
+
+	def test_estimate_repost_impact(self):
+		items = [make_item(properties={"is_stock_item": 1}).name for _ in range(2)]
+		warehouse = "_Test Warehouse - _TC"
+
+		make_stock_entry(
+			item_code=items[0], target=warehouse, qty=10, rate=10, posting_date=add_days(today(), -3)
+		)
+		make_stock_entry(item_code=items[0], source=warehouse, qty=2)
+
+		repack = make_stock_entry(
+			item_code=items[0], source=warehouse, qty=5, purpose="Repack", do_not_save=True
+		)
+		repack.append(
+			"items",
+			{"item_code": items[1], "t_warehouse": warehouse, "qty": 1, "transfer_qty": 1},
+		)
+		repack.save()
+		repack.submit()
+
+		# backdated draft, the repost it triggers on submit is estimated
+		draft = make_stock_entry(
+			item_code=items[0],
+			target=warehouse,
+			qty=10,
+			rate=10,
+			posting_date=add_days(today(), -2),
+			do_not_submit=True,
+		)
+		estimate = estimate_repost_impact(voucher_type=draft.doctype, voucher_no=draft.name)
+
+		self.assertEqual(estimate.item_warehouses, 2)
+		self.assertEqual(estimate.future_sles, 3)
+		self.assertEqual(estimate.dependent_vouchers, 2)
+		self.assertGreater(estimate.expected_runtime, 0)
+
+	@change_settings("Stock Reposting Settings", {"profile_reposting": 1})
+	def test_reposting_metrics(self):
+		item_code = make_item(properties={"valuation_method": "Moving Average"}).name
+		warehouse = "_Test Warehouse - _TC"
+
+		make_stock_entry(
+			item_code=item_code, target=warehouse, qty=10, rate=10, posting_date=add_days(today(), -3)
+		)
+		for _ in range(3):
+			make_stock_entry(item_code=item_code, source=warehouse, qty=2)
+
+		receipt = make_stock_entry(
+			item_code=item_code, target=warehouse, qty=10, rate=20, posting_date=add_days(today(), -2)
+		)
+		riv = frappe.get_doc("Repost Item Valuation", {"voucher_no": receipt.name})
+		self.assertEqual(riv.status, "Completed")
+
+		metrics = json.loads(riv.reposting_metrics)
+		self.assertEqual(metrics["counts"]["item_warehouses_reposted"], 1)
+		# the three future issues
+		self.assertGreaterEqual(metrics["counts"]["sles_read"], 3)
+		self.assertEqual(metrics["counts"]["sles_written"], metrics["counts"]["sles_read"])
+		self.assertGreaterEqual(metrics["counts"]["gl_vouchers_compared"], 3)
+		self.assertEqual(metrics["slowest_item_warehouses"][0][0], f"{item_code}: {warehouse}")
+		self.assertGreaterEqual(metrics["timings"]["total"], metrics["timings"]["sql"])
+
+		# profile is attached, the reposting data file is removed
+		files = frappe.get_all(
+			"File",
+			filters={"attached_to_doctype": riv.doctype, "attached_to_name": riv.name},
+			pluck="file_name",
+		)
+		self.assertEqual(len(files), 1)
+		self.assertIn("profile", files[0])
+
+		_columns, data = get_performance(
+			{"company": riv.company, "from_date": add_days(today(), -1), "to_date": today()}
+		)
+		row = next(row for row in data if row.name == riv.name)
+		self.assertEqual(row.sles_written, metrics["counts"]["sles_written"])
+
+	def test_reposting_journal_replay(self):
+		snapshot = frappe.as_json(
+			{
+				"items_to_be_repost": [{"item_code": "_Test Item", "warehouse": "Stores - _TC"}],
+				"distinct_item_and_warehouse": {
+					"('_Test Item', 'Stores - _TC')": {"reposting_status": False}
+				},
+				"affected_transactions": [["Stock Entry", "STE-0001"]],
+			}
+		)
+		changes = json.dumps(
+			{
+				"changes": {
+					"items_to_be_repost": {
+						"1": {"item_code": "_Test Item", "warehouse": "Finished Goods - _TC"}
+					},
+					"distinct_item_and_warehouse": {
+						"('_Test Item', 'Stores - _TC')": {"reposting_status": True}
+					},
+					"affected_transactions": [["Stock Entry", "STE-0002"]],
+					"vouchers_to_recalculate": [["Stock Entry", "STE-0002"]],
+				}
+			}
+		)
+
+		data = RepostingJournal.replay(snapshot + changes + "\n")
+
+		self.assertEqual(
+			[d["warehouse"] for d in data.items_to_be_repost], ["Stores - _TC", "Finished Goods - _TC"]
+		)
+		self.assertTrue(
+			data.distinct_item_and_warehouse["('_Test Item', 'Stores - _TC')"]["reposting_status"]
+		)
+		self.assertEqual(len(data.affected_transactions), 2)
+		self.assertEqual(data.vouchers_to_recalculate, [["Stock Entry", "STE-0002"]])
+
+	@change_settings("Stock Reposting Settings", {"item_based_reposting": 0, "parallel_reposting_workers": 2})
+	def test_parallel_reposting(self):
+		consumptions, pr = self.make_backdated_receipt_of_two_items()
+
+		riv = frappe.get_doc("Repost Item Valuation", {"voucher_type": pr.doctype, "voucher_no": pr.name})
+		self.assertEqual(riv.status, "Completed")
+		self.assertEqual(len(riv.reposting_chains), 2)
+		self.assertEqual({chain.status for chain in riv.reposting_chains}, {"Completed"})
+
+		for consumption in consumptions:
+			self.assertSLEs(consumption, [{"valuation_rate": 15, "stock_value_difference": -75}])
+
+	@change_settings("Stock Reposting Settings", {"item_based_reposting": 0, "parallel_reposting_workers": 2})
+	def test_parallel_reposting_chain_failure(self):
+		consumptions, pr = self.make_backdated_receipt_of_two_items(dont_execute_stock_reposts=True)
+
+		riv = frappe.get_doc("Repost Item Valuation", {"voucher_type": pr.doctype, "voucher_no": pr.name})
+		riv.set_status("In Progress")
+		self.assertTrue(set_reposting_chains(riv))
+		failed_chain, other_chain = (chain.name for chain in riv.reposting_chains)
+
+		def get_chain_statuses():
+			riv.reload()
+			return {chain.name: chain.status for chain in riv.reposting_chains}
+
+		# the repost goes on while the other chain is not done
+		with patch.object(frappe.db, "rollback"):
+			try:
+				frappe.throw("Reposting chain failed")
+			except frappe.ValidationError:
+				handle_chain_failure(riv, riv.getone("reposting_chains", {"name": failed_chain}))
+
+		self.assertEqual(get_chain_statuses(), {failed_chain: "Failed", other_chain: "Queued"})
+		self.assertEqual(riv.status, "In Progress")
+
+		repost_chain(riv.name, other_chain)
+		self.assertEqual(get_chain_statuses(), {failed_chain: "Failed", other_chain: "Completed"})
+		self.assertEqual(riv.status, "Failed")
+		self.assertIn("Reposting chain failed", riv.error_log)
+
+		# only the failed chain is reposted again on restart
+		riv.restart_reposting()
+		self.assertEqual(get_chain_statuses(), {failed_chain: "Queued", other_chain: "Completed"})
+
+		with patch(
+			"erpnext.stock.doctype.repost_item_valuation.repost_item_valuation.repost_future_sle",
+			wraps=repost_future_sle,
+		) as mock_repost:
+			repost(riv)
+
+		self.assertEqual(mock_repost.call_count, 1)
+		self.assertEqual(get_chain_statuses(), {failed_chain: "Completed", other_chain: "Completed"})
+		self.assertEqual(riv.status, "Completed")
+
+		for consumption in consumptions:
+			self.assertSLEs(consumption, [{"valuation_rate": 15, "stock_value_difference": -75}])
+
+	@change_settings("Stock Reposting Settings", {"item_based_reposting": 0, "parallel_reposting_workers": 2})
+	def test_parallel_reposting_gl_failure(self):
+		_consumptions, pr = self.make_backdated_receipt_of_two_items(dont_execute_stock_reposts=True)
+
+		riv = frappe.get_doc("Repost Item Valuation", {"voucher_type": pr.doctype, "voucher_no": pr.name})
+		riv.set_status("In Progress")
+		self.assertTrue(set_reposting_chains(riv))
+
+		# a failure of the GL repost is not a failure of the chain which happened to run it
+		with patch(
+			"erpnext.stock.doctype.repost_item_valuation.repost_item_valuation.repost_gl_entries",
+			side_effect=frappe.ValidationError,
+		):
+			repost_chain(riv.name, riv.reposting_chains[0].name)
+			self.assertRaises(frappe.ValidationError, repost_chain, riv.name, riv.reposting_chains[1].name)
+
+		riv.reload()
+		self.assertEqual({chain.status for chain in riv.reposting_chains}, {"Completed"})
+		self.assertEqual(riv.status, "In Progress")
+
+		# the GL entries are reposted again without reposting the chains
+		with patch(
+			"erpnext.stock.doctype.repost_item_valuation.repost_item_valuation.repost_future_sle",
+		) as mock_repost:
+			repost(riv)
+
+		mock_repost.assert_not_called()
+		riv.reload()
+		self.assertEqual(riv.status, "Completed")
+
+	def make_backdated_receipt_of_two_items(self, dont_execute_stock_reposts=False):
+		items = [make_item(properties={"valuation_method": "Moving Average"}).name for _ in range(2)]
+		warehouse = "_Test Warehouse - _TC"
+
+		consumptions = []
+		for item_code in items:
+			make_stock_entry(
+				item_code=item_code, target=warehouse, qty=10, rate=10, posting_date=add_days(today(), -3)
+			)
+			consumptions.append(make_stock_entry(item_code=item_code, source=warehouse, qty=5))
+
+		pr = make_purchase_receipt(
+			item_code=items[0],
+			warehouse=warehouse,
+			qty=10,
+			rate=20,
+			posting_date=add_days(today(), -2),
+			do_not_save=True,
+		)
+		row = frappe.copy_doc(pr.items[0], ignore_no_copy=False)
+		row.item_code = row.item_name = items[1]
+		pr.append("items", row)
+		pr.save()
+
+		frappe.flags.dont_execute_stock_reposts = dont_execute_stock_reposts
+		pr.submit()
+
+		return consumptions, pr
@@ -0,0 +1,270 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Max
+from frappe.utils import add_days, add_to_date, create_batch, get_first_day, getdate, now, nowdate
+
+from erpnext.stock.utils import check_pending_reposting
+from erpnext.stock.valuation import decode_stock_queue, encode_stock_queue
+
+# item-warehouses whose checkpoints were dropped by backdated entries, to be rebuilt by the daily job
+DROPPED_CHECKPOINTS_KEY = "stock_ledger_checkpoints_dropped"
+LAST_RUN_KEY = "stock_ledger_checkpoints_last_run"
+
+
+class StockLedgerCheckpoint(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		checkpoint_date: DF.Date
+		company: DF.Link | None
+		item_code: DF.Link
+		posting_datetime: DF.Datetime | None
+		qty_after_transaction: DF.Float
+		stock_ledger_entry: DF.Link | None
+		stock_queue: DF.LongText | None
+		stock_value: DF.Currency
+		valuation_rate: DF.Currency
+		warehouse: DF.Link
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index(
+		"Stock Ledger Checkpoint", ["item_code", "warehouse", "checkpoint_date"], "item_warehouse_checkpoint"
+	)
+
+
+def create_stock_ledger_checkpoints(checkpoint_date=None):
+	"""
+	Snapshot the balance of every item-warehouse as on the end of `checkpoint_date`
+	(defaults to the last day of the previous month).
+
+	Runs daily so that checkpoints dropped by backdated entries are rebuilt once the
+	reposting for them is done. Every item-warehouse is checked on the first run for a
+	checkpoint date, the later runs only check the ones with entries changed since.
+	"""
+
+	checkpoint_date = getdate(checkpoint_date or add_days(get_first_day(nowdate()), -1))
+
+	# values are not final till the pending reposts are processed
+	if check_pending_reposting(checkpoint_date, throw_error=False):
+		return
+
+	run_started_on = now()
+	dropped = frappe.cache().hgetall(DROPPED_CHECKPOINTS_KEY)
+
+	for item_code, warehouse in get_item_warehouses_without_checkpoint(checkpoint_date, dropped.values()):
+		make_stock_ledger_checkpoint(item_code, warehouse, checkpoint_date)
+
+	for key in dropped:
+		frappe.cache().hdel(DROPPED_CHECKPOINTS_KEY, key)
+
+	frappe.cache().set_value(
+		LAST_RUN_KEY, frappe._dict(checkpoint_date=checkpoint_date, started_on=run_started_on)
+	)
+
+
+def get_item_warehouses_without_checkpoint(checkpoint_date, dropped=()):
+	item_warehouses = get_changed_item_warehouses(checkpoint_date, dropped)
+	if item_warehouses is None:
+		return filter_item_warehouses_without_checkpoint(checkpoint_date)
+
+	result = []
+	# both lists are filtered in batches and the combinations which are not changed are skipped
+	for batch in create_batch(sorted(item_warehouses), 1000):
+		item_codes = list({d[0] for d in batch})
+		warehouses = list({d[1] for d in batch})
+		result.extend(
+			d
+			for d in filter_item_warehouses_without_checkpoint(checkpoint_date, item_codes, warehouses)
+			if d in item_warehouses
+		)
+
+	return result
+
+
+def get_changed_item_warehouses(checkpoint_date, dropped=()):
+	"""
+	Returns the item-warehouses with entries posted, cancelled or backdated since the last run for
+	`checkpoint_date`, None if every item-warehouse is to be checked.
+	"""
+
+	last_run = frappe.cache().get_value(LAST_RUN_KEY)
+	if not last_run or getdate(last_run.checkpoint_date) != checkpoint_date:
+		return
+
+	# entries created by the transactions still running when the last run started
+	changed_since = add_to_date(last_run.started_on, hours=-1)
+
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	item_warehouses = set(
+		(
+			frappe.qb.from_(sle)
+			.select(sle.item_code, sle.warehouse)
+			.distinct()
+			.where((sle.modified >= changed_since) & (sle.posting_date <= checkpoint_date))
+		).run()
+	)
+	item_warehouses.update(tuple(d) for d in dropped)
+
+	return item_warehouses
+
+
+def filter_item_warehouses_without_checkpoint(checkpoint_date, item_codes=None, warehouses=None):
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	checkpoint = frappe.qb.DocType("Stock Ledger Checkpoint")
+
+	checkpoint_query = (
+		frappe.qb.from_(checkpoint)
+		.select(checkpoint.item_code, checkpoint.warehouse, Max(checkpoint.checkpoint_date))
+		.where(checkpoint.checkpoint_date <= checkpoint_date)
+		.groupby(checkpoint.item_code, checkpoint.warehouse)
+	)
+	sle_query = (
+		frappe.qb.from_(sle)
+		.select(sle.item_code, sle.warehouse, Max(sle.posting_date))
+		.where((sle.is_cancelled == 0) & (sle.posting_date <= checkpoint_date))
+		.groupby(sle.item_code, sle.warehouse)
+	)
+
+	if item_codes is not None:
+		checkpoint_query = checkpoint_query.where(
+			checkpoint.item_code.isin(item_codes) & checkpoint.warehouse.isin(warehouses)
+		)
+		sle_query = sle_query.where(sle.item_code.isin(item_codes) & sle.warehouse.isin(warehouses))
+
+	last_checkpoints = frappe._dict()
+	for row in checkpoint_query.run():
+		last_checkpoints[(row[0], row[1])] = getdate(row[2])
+
+	item_warehouses = []
+	for item_code, warehouse, last_posting_date in sle_query.run():
+		# no entries since the last checkpoint, it still holds good
+		last_checkpoint = last_checkpoints.get((item_code, warehouse))
+		if last_checkpoint and getdate(last_posting_date) <= last_checkpoint:
+			continue
+
+		item_warehouses.append((item_code, warehouse))
+
+	return item_warehouses
+
+
+def make_stock_ledger_checkpoint(item_code, warehouse, checkpoint_date):
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	last_sle = (
+		frappe.qb.from_(sle)
+		.select(
+			sle.name,
+			sle.company,
+			sle.posting_datetime,
+			sle.qty_after_transaction,
+			sle.valuation_rate,
+			sle.stock_value,
+			sle.stock_queue,
+		)
+		.where(
+			(sle.item_code == item_code)
+			& (sle.warehouse == warehouse)
+			& (sle.is_cancelled == 0)
+			& (sle.posting_date <= checkpoint_date)
+		)
+		.orderby(sle.posting_date, order=frappe.qb.desc)
+		.orderby(sle.posting_time, order=frappe.qb.desc)
+		.orderby(sle.creation, order=frappe.qb.desc)
+		.limit(1)
+	).run(as_dict=True)
+
+	if not last_sle:
+		return
+
+	last_sle = last_sle[0]
+	doc = frappe.get_doc(
+		{
+			"doctype": "Stock Ledger Checkpoint",
+			"item_code": item_code,
+			"warehouse": warehouse,
+			"company": last_sle.company,
+			"checkpoint_date": checkpoint_date,
+			"stock_ledger_entry": last_sle.name,
+			"posting_datetime": last_sle.posting_datetime,
+			"qty_after_transaction": last_sle.qty_after_transaction,
+			"valuation_rate": last_sle.valuation_rate,
+			"stock_value": last_sle.stock_value,
+			"stock_queue": encode_stock_queue(decode_stock_queue(last_sle.stock_queue), compact=True),
+		}
+	)
+	doc.flags.ignore_permissions = True
+	doc.insert()
+
+	return doc
+
+
+def get_stock_ledger_checkpoint(item_code, warehouse, posting_date, inclusive=False):
+	"""
+	Returns the latest checkpoint before `posting_date` (or on it, if `inclusive`).
+	All the entries posted on or before the checkpoint date are accounted in it.
+	"""
+
+	checkpoint = frappe.qb.DocType("Stock Ledger Checkpoint")
+	date_condition = (
+		checkpoint.checkpoint_date <= posting_date if inclusive else checkpoint.checkpoint_date < posting_date
+	)
+
+	data = (
+		frappe.qb.from_(checkpoint)
+		.select(
+			checkpoint.checkpoint_date,
+			checkpoint.qty_after_transaction,
+			checkpoint.valuation_rate,
+			checkpoint.stock_value,
+			checkpoint.stock_queue,
+		)
+		.where((checkpoint.item_code == item_code) & (checkpoint.warehouse == warehouse) & date_condition)
+		.orderby(checkpoint.checkpoint_date, order=frappe.qb.desc)
+		.limit(1)
+	).run(as_dict=True)
+
+	return data[0] if data else None
+
+
+def get_stock_ledger_checkpoints(item_code, warehouses, posting_date, inclusive=False):
+	"""Returns the latest checkpoint of the item in each of the `warehouses`, like `get_stock_ledger_checkpoint`"""
+
+	checkpoint = frappe.qb.DocType("Stock Ledger Checkpoint")
+	date_condition = (
+		checkpoint.checkpoint_date <= posting_date if inclusive else checkpoint.checkpoint_date < posting_date
+	)
+
+	checkpoints = {}
+	for row in (
+		frappe.qb.from_(checkpoint)
+		.select(checkpoint.warehouse, checkpoint.checkpoint_date, checkpoint.stock_value)
+		.where((checkpoint.item_code == item_code) & checkpoint.warehouse.isin(warehouses) & date_condition)
+		.orderby(checkpoint.checkpoint_date, order=frappe.qb.desc)
+	).run(as_dict=True):
+		checkpoints.setdefault(row.warehouse, row)
+
+	return checkpoints
+
+
+def invalidate_stock_ledger_checkpoints(item_code, warehouse, posting_date):
+	"""Drop the checkpoints which include entries on or after `posting_date`."""
+
+	filters = {"item_code": item_code, "warehouse": warehouse, "checkpoint_date": (">=", posting_date)}
+
+	# most entries are posted after the last checkpoint, skip the delete for them
+	if not frappe.db.exists("Stock Ledger Checkpoint", filters):
+		return
+
+	frappe.db.delete("Stock Ledger Checkpoint", filters)
+	frappe.cache().hset(DROPPED_CHECKPOINTS_KEY, f"{item_code}::{warehouse}", (item_code, warehouse))
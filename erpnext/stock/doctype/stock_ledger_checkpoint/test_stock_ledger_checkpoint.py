@@ -0,0 +1,59 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, today
+
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+from erpnext.stock.doctype.stock_ledger_checkpoint.stock_ledger_checkpoint import (
+	create_stock_ledger_checkpoints,
+)
+from erpnext.stock.utils import get_stock_balance, get_stock_value_on
+
+
+class TestStockLedgerCheckpoint(FrappeTestCase):
+	def test_balance_from_checkpoint(self):
+		item_code = make_item("_Test Item Stock Ledger Checkpoint", {"is_stock_item": 1}).name
+		warehouse = "_Test Warehouse - _TC"
+
+		make_stock_entry(
+			item_code=item_code, to_warehouse=warehouse, qty=10, rate=100, posting_date=add_days(today(), -10)
+		)
+		create_stock_ledger_checkpoints(add_days(today(), -5))
+
+		checkpoint = frappe.db.get_value(
+			"Stock Ledger Checkpoint",
+			{"item_code": item_code, "warehouse": warehouse},
+			["qty_after_transaction", "stock_value"],
+			as_dict=True,
+		)
+		self.assertEqual(checkpoint.qty_after_transaction, 10)
+		self.assertEqual(checkpoint.stock_value, 1000)
+
+		make_stock_entry(item_code=item_code, to_warehouse=warehouse, qty=5, rate=100)
+		self.assertEqual(get_stock_balance(item_code, warehouse, add_days(today(), -1)), 10)
+		self.assertEqual(get_stock_balance(item_code, warehouse), 15)
+		self.assertEqual(get_stock_value_on(warehouse, today(), item_code), 1500)
+
+		# backdated entry before the checkpoint date drops the checkpoint
+		make_stock_entry(
+			item_code=item_code, to_warehouse=warehouse, qty=2, rate=100, posting_date=add_days(today(), -7)
+		)
+		self.assertFalse(
+			frappe.db.exists("Stock Ledger Checkpoint", {"item_code": item_code, "warehouse": warehouse})
+		)
+		self.assertEqual(get_stock_balance(item_code, warehouse), 17)
+		self.assertEqual(get_stock_value_on(warehouse, today(), item_code), 1700)
+
+		# and the next run only rebuilds the checkpoints of the item-warehouses changed since
+		create_stock_ledger_checkpoints(add_days(today(), -5))
+		self.assertEqual(
+			frappe.db.get_value(
+				"Stock Ledger Checkpoint",
+				{"item_code": item_code, "warehouse": warehouse},
+				"qty_after_transaction",
+			),
+			12,
+		)
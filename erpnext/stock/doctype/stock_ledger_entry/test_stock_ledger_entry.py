@@ -3,6 +3,7 @@
 
 import json
 import time
+from unittest.mock import patch
 from uuid import uuid4
 
 import frappe
@@ -26,7 +27,7 @@ from erpnext.stock.doctype.stock_ledger_entry.stock_ledger_entry import BackDate
 from erpnext.stock.doctype.stock_reconciliation.test_stock_reconciliation import (
 	create_stock_reconciliation,
 )
-from erpnext.stock.stock_ledger import get_previous_sle
+from erpnext.stock.stock_ledger import get_previous_sle, recalculate_voucher
 from erpnext.stock.tests.test_utils import StockTestMixin
 
 
@@ -1340,6 +1341,106 @@ class TestStockLedgerEntry(FrappeTestCase, StockTestMixin):
 			item_code=item_code, source=warehouse, qty=470.84, rate=100, posting_date=add_days(today(), -1)
 		)
 
+	@change_settings("Stock Reposting Settings", {"batched_write_back": 1, "write_back_batch_size": 2})
+	def test_batched_write_back_on_backdated_entry(self):
+		"""Backdated receipt reposts future SLEs and Bin using bulk writes"""
+		item = make_item(properties={"valuation_method": "Moving Average"}).name
+		warehouse = "_Test Warehouse - _TC"
+
+		make_stock_entry(
+			item_code=item, target=warehouse, qty=10, rate=10, posting_date=add_days(today(), -3)
+		)
+		consumptions = [
+			make_stock_entry(item_code=item, source=warehouse, qty=2, posting_date=add_days(today(), -1))
+			for _ in range(3)
+		]
+
+		# backdated receipt changes the moving average of all consumptions
+		make_stock_entry(
+			item_code=item, target=warehouse, qty=10, rate=20, posting_date=add_days(today(), -2)
+		)
+
+		for idx, consumption in enumerate(consumptions, start=1):
+			self.assertSLEs(
+				consumption,
+				[
+					{
+						"qty_after_transaction": 20 - 2 * idx,
+						"valuation_rate": 15,
+						"stock_value": (20 - 2 * idx) * 15,
+						"stock_value_difference": -30,
+					}
+				],
+			)
+
+		bin_details = frappe.db.get_value(
+			"Bin", {"item_code": item, "warehouse": warehouse}, ["actual_qty", "stock_value"], as_dict=1
+		)
+		self.assertEqual(bin_details.actual_qty, 14)
+		self.assertEqual(bin_details.stock_value, 210)
+
+	def test_moving_average_repost_of_delivery_note(self):
+		"""Backdated receipt reposts a plain moving average delivery and its incoming rate"""
+		item = make_item(properties={"valuation_method": "Moving Average"}).name
+		warehouse = "_Test Warehouse - _TC"
+
+		make_stock_entry(
+			item_code=item, target=warehouse, qty=10, rate=10, posting_date=add_days(today(), -3)
+		)
+		dn = create_delivery_note(
+			item_code=item, warehouse=warehouse, qty=4, rate=50, posting_date=add_days(today(), -1)
+		)
+
+		make_stock_entry(
+			item_code=item, target=warehouse, qty=10, rate=20, posting_date=add_days(today(), -2)
+		)
+
+		self.assertSLEs(
+			dn,
+			[
+				{
+					"qty_after_transaction": 16,
+					"valuation_rate": 15,
+					"stock_value": 240,
+					"stock_value_difference": -60,
+				}
+			],
+		)
+		self.assertEqual(frappe.db.get_value("Delivery Note Item", dn.items[0].name, "incoming_rate"), 15)
+
+	def test_stock_entry_recalculated_once_per_repost(self):
+		"""Multi item issue is recalculated once after all of its rows are reposted"""
+		items = [make_item(properties={"valuation_method": "Moving Average"}).name for _ in range(3)]
+		warehouse = "_Test Warehouse - _TC"
+
+		def make_multi_item_entry(rate, posting_date, **kwargs):
+			se = make_stock_entry(
+				item_code=items[0], qty=10, rate=rate, posting_date=posting_date, do_not_save=True, **kwargs
+			)
+			for item_code in items[1:]:
+				row = frappe.copy_doc(se.items[0], ignore_no_copy=False)
+				row.item_code = row.item_name = item_code
+				se.append("items", row)
+
+			se.save()
+			se.submit()
+			return se
+
+		make_multi_item_entry(10, add_days(today(), -3), target=warehouse)
+		issue = make_multi_item_entry(10, add_days(today(), -1), source=warehouse)
+		self.assertEqual(issue.total_outgoing_value, 300)
+
+		with patch(
+			"erpnext.stock.stock_ledger.recalculate_voucher", wraps=recalculate_voucher
+		) as recalculate:
+			make_multi_item_entry(20, add_days(today(), -2), target=warehouse)
+
+		self.assertEqual(recalculate.call_args_list.count((("Stock Entry", issue.name),)), 1)
+
+		issue.reload()
+		self.assertEqual([d.basic_rate for d in issue.items], [15, 15, 15])
+		self.assertEqual(issue.total_outgoing_value, 450)
+
 
 def create_repack_entry(**args):
 	args = frappe._dict(args)
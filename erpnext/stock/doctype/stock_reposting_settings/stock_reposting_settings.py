@@ -16,6 +16,7 @@ class StockRepostingSettings(Document):
 	if TYPE_CHECKING:
 		from frappe.types import DF
 
+		batched_write_back: DF.Check
 		do_reposting_for_each_stock_transaction: DF.Check
 		end_time: DF.Time | None
 		item_based_reposting: DF.Check
@@ -24,7 +25,11 @@ class StockRepostingSettings(Document):
 			"", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
 		]
 		notify_reposting_error_to_role: DF.Link | None
+		parallel_reposting_workers: DF.Int
+		profile_reposting: DF.Check
+		repost_changed_gl_entries_only: DF.Check
 		start_time: DF.Time | None
+		write_back_batch_size: DF.Int
 	# end: auto-generated types
 
 	def validate(self):
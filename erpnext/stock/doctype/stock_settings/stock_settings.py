@@ -8,10 +8,12 @@ import frappe
 from frappe import _
 from frappe.custom.doctype.property_setter.property_setter import make_property_setter
 from frappe.model.document import Document
+from frappe.query_builder.functions import IfNull
 from frappe.utils import cint
 from frappe.utils.html_utils import clean_html
 
 from erpnext.stock.utils import check_pending_reposting
+from erpnext.stock.valuation import COMPACT_QUEUE_PREFIX, decode_stock_queue, encode_stock_queue
 
 
 class StockSettings(Document):
@@ -38,6 +40,7 @@ class StockSettings(Document):
 		auto_reserve_serial_and_batch: DF.Check
 		auto_reserve_stock_for_sales_order_on_purchase: DF.Check
 		clean_description_html: DF.Check
+		compact_stock_queue: DF.Check
 		default_warehouse: DF.Link | None
 		disable_serial_no_and_batch_selector: DF.Check
 		do_not_update_serial_batch_on_creation_of_auto_bundle: DF.Check
@@ -45,6 +48,8 @@ class StockSettings(Document):
 		enable_stock_reservation: DF.Check
 		item_group: DF.Link | None
 		item_naming_by: DF.Literal["Item Code", "Naming Series"]
+		item_search_index_built: DF.Check
+		maintain_item_search_index: DF.Check
 		mr_qty_allowance: DF.Float
 		naming_series_prefix: DF.Data | None
 		over_delivery_receipt_allowance: DF.Float
@@ -97,6 +102,8 @@ class StockSettings(Document):
 		self.validate_warehouses()
 		self.cant_change_valuation_method()
 		self.validate_clean_description_html()
+		self.validate_compact_stock_queue()
+		self.validate_item_search_index()
 		self.validate_pending_reposts()
 		self.validate_stock_reservation()
 		self.change_precision_for_for_sales()
@@ -158,6 +165,29 @@ class StockSettings(Document):
 				enqueue_after_commit=True,
 			)
 
+	def validate_compact_stock_queue(self):
+		if self.has_value_changed("compact_stock_queue"):
+			# convert existing queues to the new format
+			frappe.enqueue(
+				"erpnext.stock.doctype.stock_settings.stock_settings.convert_stock_queues",
+				queue="long",
+				timeout=7200,
+				compact=cint(self.compact_stock_queue),
+				now=frappe.flags.in_test,
+				enqueue_after_commit=True,
+			)
+
+	def validate_item_search_index(self):
+		if self.has_value_changed("maintain_item_search_index"):
+			# searches scan the items till the index is built again
+			self.item_search_index_built = 0
+			frappe.enqueue(
+				"erpnext.stock.doctype.item_search_index.item_search_index.rebuild_item_search_index",
+				queue="long",
+				timeout=7200,
+				enqueue_after_commit=True,
+			)
+
 	def validate_pending_reposts(self):
 		if self.stock_frozen_upto:
 			check_pending_reposting(self.stock_frozen_upto)
@@ -321,6 +351,46 @@ def clean_all_descriptions():
 			frappe.db.set_value("Item", item.name, "description", clean_description)
 
 
+def convert_stock_queues(compact=True, batch_size=10000):
+	"""Convert `stock_queue` of existing Stock Ledger Entries to compact or JSON format."""
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+
+	last_name = ""
+	while True:
+		query = (
+			frappe.qb.from_(sle)
+			.select(sle.name, sle.stock_queue)
+			.where((sle.name > last_name) & (IfNull(sle.stock_queue, "") != "") & (sle.stock_queue != "[]"))
+			.orderby(sle.name)
+			.limit(batch_size)
+		)
+
+		if compact:
+			query = query.where(sle.stock_queue.not_like(f"{COMPACT_QUEUE_PREFIX}%"))
+		else:
+			query = query.where(sle.stock_queue.like(f"{COMPACT_QUEUE_PREFIX}%"))
+
+		entries = query.run(as_dict=True)
+		if not entries:
+			break
+
+		frappe.db.bulk_update(
+			"Stock Ledger Entry",
+			{
+				d.name: {
+					"stock_queue": encode_stock_queue(decode_stock_queue(d.stock_queue), compact=compact)
+				}
+				for d in entries
+			},
+			chunk_size=1000,
+			update_modified=False,
+		)
+
+		last_name = entries[-1].name
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+
 @frappe.whitelist()
 def get_enable_stock_uom_editing():
 	return frappe.get_cached_value(
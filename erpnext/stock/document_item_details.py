@@ -0,0 +1,289 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""
+Item details of all the rows of a document at once. The data `get_item_details` queries for every row
+(the item prices, UOM conversion factors, bins and barcodes of the items) is fetched in bulk before the
+rows are processed, and `get_item_details` reads it from here instead of querying it again.
+
+	with document_item_details(args, rows):
+		for row in rows:
+			get_item_details(...)
+
+Every lookup returns None when the data was not prefetched, for the caller to query it as before.
+"""
+
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import cint, cstr, getdate
+
+
+@contextmanager
+def document_item_details(args, rows):
+	"""
+	Prefetch the data of the items of the rows (a list of dicts with the item_code and optionally the
+	price list) of the transaction in `args`, for the rows processed in the block
+	"""
+	if frappe.flags.document_item_details is not None:
+		yield frappe.flags.document_item_details
+		return
+
+	frappe.flags.document_item_details = context = get_document_item_details_context(args, rows)
+	try:
+		yield context
+	finally:
+		frappe.flags.document_item_details = None
+
+
+def get_document_item_details():
+	return frappe.flags.document_item_details
+
+
+def get_document_item_details_context(args, rows):
+	context = frappe._dict(
+		items={},
+		item_prices={},
+		packing_units={},
+		uom_conversions={},
+		bins={},
+		barcodes={},
+		templates_with_taxes=set(),
+		child_warehouses={},
+		single_values={},
+	)
+
+	item_codes = list({row.get("item_code") for row in rows if row.get("item_code")})
+	if not item_codes:
+		return context
+
+	context.items = {
+		d.name: d
+		for d in frappe.get_all(
+			"Item",
+			filters={"name": ("in", item_codes)},
+			fields=[
+				"name",
+				"variant_of",
+				"stock_uom",
+				"default_item_manufacturer",
+				"default_manufacturer_part_no",
+			],
+		)
+	}
+	templates = list({d.variant_of for d in context.items.values() if d.variant_of})
+	all_item_codes = list(context.items) + templates
+
+	set_item_prices(context, args, rows, all_item_codes)
+
+	for item_code in all_item_codes:
+		context.uom_conversions[item_code] = {}
+
+	for d in frappe.get_all(
+		"UOM Conversion Detail",
+		filters={"parent": ("in", all_item_codes)},
+		fields=["parent", "uom", "conversion_factor"],
+	):
+		context.uom_conversions[d.parent].setdefault(d.uom, []).append(d.conversion_factor)
+
+	bin = frappe.qb.DocType("Bin")
+	warehouse = frappe.qb.DocType("Warehouse")
+	context.bins = {item_code: [] for item_code in context.items}
+	for d in (
+		frappe.qb.from_(bin)
+		.left_join(warehouse)
+		.on(bin.warehouse == warehouse.name)
+		.select(
+			bin.item_code,
+			bin.warehouse,
+			bin.projected_qty,
+			bin.actual_qty,
+			bin.reserved_qty,
+			warehouse.company,
+		)
+		.where(bin.item_code.isin(list(context.items)))
+	).run(as_dict=True):
+		context.bins[d.item_code].append(d)
+
+	context.barcodes = {item_code: [] for item_code in context.items}
+	for d in frappe.get_all(
+		"Item Barcode", filters={"parent": ("in", list(context.items))}, fields=["parent", "barcode"]
+	):
+		context.barcodes[d.parent].append(d.barcode)
+
+	if templates:
+		context.templates_with_taxes = set(
+			frappe.get_all("Item Tax", filters={"parent": ("in", templates)}, pluck="parent", distinct=True)
+		)
+
+	return context
+
+
+def set_item_prices(context, args, rows, item_codes):
+	"""
+	Prefetch the Item Prices of the items in the price lists of the document, on MariaDB only since they
+	are ordered the way MariaDB orders them in `get_item_price`
+	"""
+	if frappe.db.db_type != "mariadb":
+		return
+
+	price_lists = set()
+	for row in [args, *rows]:
+		price_lists.update(
+			row.get(field) for field in ("price_list", "selling_price_list", "buying_price_list")
+		)
+
+	price_lists = [d for d in price_lists if d]
+	if not price_lists:
+		return
+
+	for price_list in price_lists:
+		for item_code in item_codes:
+			context.item_prices[(price_list, item_code)] = []
+
+	for d in frappe.get_all(
+		"Item Price",
+		filters={"price_list": ("in", price_lists), "item_code": ("in", item_codes)},
+		fields=[
+			"name",
+			"item_code",
+			"price_list",
+			"price_list_rate",
+			"uom",
+			"batch_no",
+			"customer",
+			"supplier",
+			"valid_from",
+			"valid_upto",
+			"packing_unit",
+		],
+		order_by="name",
+	):
+		context.item_prices[(d.price_list, d.item_code)].append(d)
+		context.packing_units[d.name] = cint(d.packing_unit)
+
+
+def get_prefetched_item(item_code):
+	context = get_document_item_details()
+	if context:
+		return context.items.get(item_code)
+
+
+def get_prefetched_item_prices(args, item_code, ignore_party=False):
+	"""Returns the (name, price_list_rate, uom) of the Item Prices `get_item_price` would query, in order"""
+	context = get_document_item_details()
+	prices = context and context.item_prices.get((args.get("price_list"), item_code))
+	if prices is None:
+		return
+
+	transaction_date = getdate(args["transaction_date"]) if args.get("transaction_date") else None
+	matched = []
+	for price in prices:
+		if cstr(price.uom) not in ("", args.get("uom")) or cstr(price.batch_no) not in (
+			"",
+			args.get("batch_no"),
+		):
+			continue
+
+		if not ignore_party:
+			if args.get("customer"):
+				if price.customer != args.get("customer"):
+					continue
+			elif args.get("supplier"):
+				if price.supplier != args.get("supplier"):
+					continue
+			elif price.customer or price.supplier:
+				continue
+
+		if transaction_date and not (
+			getdate(price.valid_from or "2000-01-01")
+			<= transaction_date
+			<= getdate(price.valid_upto or "2500-12-31")
+		):
+			continue
+
+		matched.append(price)
+
+	# order by valid_from desc, ifnull(batch_no, '') desc, uom desc, with nulls last
+	matched.sort(key=lambda d: (d.uom is not None, cstr(d.uom)), reverse=True)
+	matched.sort(key=lambda d: cstr(d.batch_no), reverse=True)
+	matched.sort(
+		key=lambda d: (d.valid_from is not None, d.valid_from and getdate(d.valid_from)), reverse=True
+	)
+
+	return tuple((d.name, d.price_list_rate, d.uom) for d in matched)
+
+
+def get_prefetched_packing_unit(item_price):
+	context = get_document_item_details()
+	if context:
+		return context.packing_units.get(item_price)
+
+
+def clear_prefetched_item_prices(price_list, item_code):
+	"""Query the prices of the item again, after one of them is added or changed"""
+	context = get_document_item_details()
+	if context:
+		context.item_prices.pop((price_list, item_code), None)
+
+
+def get_prefetched_conversion_factors(item_code, uom):
+	"""Returns the conversion factors of `uom` defined in the item and its template"""
+	context = get_document_item_details()
+	item = context and context.items.get(item_code)
+	if not item:
+		return
+
+	factors = []
+	for parent in (item_code, item.variant_of):
+		if parent:
+			factors.extend(context.uom_conversions.get(parent, {}).get(uom, []))
+
+	return factors
+
+
+def get_prefetched_bins(item_code):
+	"""Returns the bins of the item with the company of their warehouse"""
+	context = get_document_item_details()
+	if context:
+		return context.bins.get(item_code)
+
+
+def get_prefetched_barcodes(item_code):
+	context = get_document_item_details()
+	if context:
+		return context.barcodes.get(item_code)
+
+
+def template_has_taxes(item):
+	"""Returns if the template of the variant `item` has taxes"""
+	context = get_document_item_details()
+	if context and item.name in context.items:
+		return item.variant_of in context.templates_with_taxes
+
+	return frappe.db.exists("Item Tax", {"parent": item.variant_of})
+
+
+def get_cached_child_warehouses(warehouse):
+	from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
+
+	context = get_document_item_details()
+	if not context:
+		return get_child_warehouses(warehouse)
+
+	if warehouse not in context.child_warehouses:
+		context.child_warehouses[warehouse] = get_child_warehouses(warehouse)
+
+	return context.child_warehouses[warehouse]
+
+
+def get_single_value(doctype, fieldname):
+	"""Settings read once for the document"""
+	context = get_document_item_details()
+	if not context:
+		return frappe.db.get_single_value(doctype, fieldname)
+
+	if (doctype, fieldname) not in context.single_values:
+		context.single_values[(doctype, fieldname)] = frappe.db.get_single_value(doctype, fieldname)
+
+	return context.single_values[(doctype, fieldname)]
@@ -13,6 +13,7 @@ from frappe.query_builder.functions import IfNull, Sum
 from frappe.utils import add_days, add_months, cint, cstr, flt, getdate
 
 from erpnext import get_company_currency
+from erpnext.accounts.doctype.pricing_rule.document_pricing import document_pricing
 from erpnext.accounts.doctype.pricing_rule.pricing_rule import (
 	get_pricing_rule_for_item,
 	set_transaction_type,
@@ -23,6 +24,19 @@ from erpnext.setup.utils import get_exchange_rate
 from erpnext.stock.doctype.item.item import get_item_defaults, get_uom_conv_factor
 from erpnext.stock.doctype.item_manufacturer.item_manufacturer import get_item_manufacturer_part_no
 from erpnext.stock.doctype.price_list.price_list import get_price_list_details
+from erpnext.stock.document_item_details import (
+	clear_prefetched_item_prices,
+	document_item_details,
+	get_cached_child_warehouses,
+	get_prefetched_barcodes,
+	get_prefetched_bins,
+	get_prefetched_conversion_factors,
+	get_prefetched_item,
+	get_prefetched_item_prices,
+	get_prefetched_packing_unit,
+	get_single_value,
+	template_has_taxes,
+)
 
 sales_doctypes = ["Quotation", "Sales Order", "Delivery Note", "Sales Invoice", "POS Invoice", "Daily Order"]
 purchase_doctypes = [
@@ -156,6 +170,35 @@ def get_item_details(args, doc=None, for_validate=False, overwrite_warehouse=Tru
 	return out
 
 
+@frappe.whitelist()
+def get_items_details(args, items, doc=None, for_validate=False, overwrite_warehouse=True):
+	"""
+	Returns the details of many rows of a document, the same as `get_item_details` returns for each row,
+	with the masters, prices, conversion factors, bins and barcodes of all the rows fetched at once.
+
+	args = {
+	        "company": "",
+	        "doctype": "",
+	        "customer": "",
+	        "selling_price_list": None,
+	        "transaction_date": None,
+	        ...the document context shared by all the rows, as in `get_item_details`
+	}
+	items = [{"item_code": "", "qty": 1.0, "uom": "", "warehouse": None, ...}, ...]
+	"""
+	args = process_string_args(args)
+	items = process_string_args(items)
+	if isinstance(doc, str):
+		doc = json.loads(doc)
+
+	rows = [{**args, **item} for item in items]
+	with document_pricing(args, rows), document_item_details(args, rows):
+		return [
+			get_item_details(row, doc, for_validate=for_validate, overwrite_warehouse=overwrite_warehouse)
+			for row in rows
+		]
+
+
 def remove_standard_fields(details):
 	for key in child_table_fields + default_fields:
 		details.pop(key, None)
@@ -299,7 +342,7 @@ def get_basic_details(args, item, overwrite_warehouse=True):
 	if not item:
 		item = frappe.get_doc("Item", args.get("item_code"))
 
-	if item.variant_of and not item.taxes and frappe.db.exists("Item Tax", {"parent": item.variant_of}):
+	if item.variant_of and not item.taxes and template_has_taxes(item):
 		item.update_template_tables()
 
 	item_defaults = get_item_defaults(item.name, args.company)
@@ -421,7 +464,7 @@ def get_basic_details(args, item, overwrite_warehouse=True):
 	args.stock_qty = out.stock_qty
 
 	# calculate last purchase rate
-	if args.get("doctype") in purchase_doctypes and not frappe.db.get_single_value(
+	if args.get("doctype") in purchase_doctypes and not get_single_value(
 		"Buying Settings", "disable_last_purchase_rate"
 	):
 		from erpnext.buying.doctype.purchase_order.purchase_order import item_last_purchase_rate
@@ -451,7 +494,7 @@ def get_basic_details(args, item, overwrite_warehouse=True):
 			out["manufacturer_part_no"] = None
 			out["manufacturer"] = None
 	else:
-		data = frappe.get_value(
+		data = get_prefetched_item(item.name) or frappe.get_value(
 			"Item", item.name, ["default_item_manufacturer", "default_manufacturer_part_no"], as_dict=1
 		)
 
@@ -513,11 +556,13 @@ def get_item_warehouse(item, args, overwrite_warehouse, defaults=None):
 
 
 def update_barcode_value(out):
-	barcode_data = get_barcode_data([out])
+	barcodes = get_prefetched_barcodes(out.item_code)
+	if barcodes is None:
+		barcodes = get_barcode_data([out]).get(out.item_code)
 
 	# If item has one barcode then update the value of the barcode field
-	if barcode_data and len(barcode_data.get(out.item_code)) == 1:
-		out["barcode"] = barcode_data.get(out.item_code)[0]
+	if barcodes and len(barcodes) == 1:
+		out["barcode"] = barcodes[0]
 
 
 def get_barcode_data(items_list=None, item_code=None):
@@ -834,9 +879,7 @@ def get_price_list_rate(args, item_doc, out=None):
 			price_list_rate = get_price_list_rate_for(args, item_doc.variant_of)
 
 		# insert in database
-		if price_list_rate is None or frappe.db.get_single_value(
-			"Stock Settings", "update_existing_price_list_rate"
-		):
+		if price_list_rate is None or get_single_value("Stock Settings", "update_existing_price_list_rate"):
 			insert_item_price(args)
 
 		if price_list_rate is None:
@@ -844,7 +887,7 @@ def get_price_list_rate(args, item_doc, out=None):
 
 		out.price_list_rate = flt(price_list_rate) * flt(args.plc_conversion_rate) / flt(args.conversion_rate)
 
-		if frappe.db.get_single_value("Buying Settings", "disable_last_purchase_rate"):
+		if get_single_value("Buying Settings", "disable_last_purchase_rate"):
 			return out
 
 		if (
@@ -870,7 +913,7 @@ def insert_item_price(args):
 		return
 
 	if frappe.db.get_value("Price List", args.price_list, "currency", cache=True) == args.currency and cint(
-		frappe.db.get_single_value("Stock Settings", "auto_insert_price_list_rate_if_missing")
+		get_single_value("Stock Settings", "auto_insert_price_list_rate_if_missing")
 	):
 		if frappe.has_permission("Item Price", "write"):
 			price_list_rate = (
@@ -891,10 +934,11 @@ def insert_item_price(args):
 				as_dict=1,
 			)
 			if item_price and item_price.name:
-				if item_price.price_list_rate != price_list_rate and frappe.db.get_single_value(
+				if item_price.price_list_rate != price_list_rate and get_single_value(
 					"Stock Settings", "update_existing_price_list_rate"
 				):
 					frappe.db.set_value("Item Price", item_price.name, "price_list_rate", price_list_rate)
+					clear_prefetched_item_prices(args.price_list, args.item_code)
 					frappe.msgprint(
 						_("Item Price updated for {0} in Price List {1}").format(
 							args.item_code, args.price_list
@@ -913,6 +957,7 @@ def insert_item_price(args):
 					}
 				)
 				item_price.insert()
+				clear_prefetched_item_prices(args.price_list, args.item_code)
 				frappe.msgprint(
 					_("Item Price added for {0} in Price List {1}").format(args.item_code, args.price_list),
 					alert=True,
@@ -930,6 +975,10 @@ def get_item_price(args, item_code, ignore_party=False):
 
 	# TODO: Datahenge: This ERPNext function could really use args validation, maybe a Schema?
 
+	prices = get_prefetched_item_prices(args, item_code, ignore_party)
+	if prices is not None:
+		return prices
+
 	ip = frappe.qb.DocType("Item Price")
 	query = (
 		frappe.qb.from_(ip)
@@ -1029,9 +1078,12 @@ def check_packing_list(price_list_rate_name, desired_qty, item_code):
 	"""
 
 	flag = True
-	item_price = frappe.get_doc("Item Price", price_list_rate_name)
-	if item_price.packing_unit:
-		packing_increment = desired_qty % item_price.packing_unit
+	packing_unit = get_prefetched_packing_unit(price_list_rate_name)
+	if packing_unit is None:
+		packing_unit = frappe.get_doc("Item Price", price_list_rate_name).packing_unit
+
+	if packing_unit:
+		packing_increment = desired_qty % packing_unit
 
 		if packing_increment != 0:
 			flag = False
@@ -1171,15 +1223,23 @@ def get_pos_profile(company, pos_profile=None, user=None):
 @frappe.whitelist()
 def get_conversion_factor(item_code, uom, stock_uom=None):
 	# Datahenge: Added optional argument 'stock_uom' to support validation checks -before- an Item document is written to database.
-	variant_of = frappe.db.get_value("Item", item_code, "variant_of", cache=True)
-	filters = {"parent": item_code, "uom": uom}
+	item = get_prefetched_item(item_code)
+	factors = get_prefetched_conversion_factors(item_code, uom)
+	if factors is not None and len(factors) < 2:
+		conversion_factor = factors[0] if factors else None
+	else:
+		variant_of = frappe.db.get_value("Item", item_code, "variant_of", cache=True)
+		filters = {"parent": item_code, "uom": uom}
+
+		if variant_of:
+			filters["parent"] = ("in", (item_code, variant_of))
+		conversion_factor = frappe.db.get_value("UOM Conversion Detail", filters, "conversion_factor")
 
-	if variant_of:
-		filters["parent"] = ("in", (item_code, variant_of))
-	conversion_factor = frappe.db.get_value("UOM Conversion Detail", filters, "conversion_factor")
 	if not conversion_factor:
 		# There is no Item-specific Conversion Factor for {uom}
-		stock_uom = stock_uom or frappe.db.get_value("Item", item_code, "stock_uom")
+		stock_uom = stock_uom or (
+			item.stock_uom if item else frappe.db.get_value("Item", item_code, "stock_uom")
+		)
 		conversion_factor = get_uom_conv_factor(uom, stock_uom)
 
 	# return {"conversion_factor": conversion_factor or 1.0}
@@ -1205,20 +1265,28 @@ def get_bin_details(item_code, warehouse, company=None, include_child_warehouses
 	if warehouse:
 		from frappe.query_builder.functions import Coalesce, Sum
 
-		from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
-
-		warehouses = get_child_warehouses(warehouse) if include_child_warehouses else [warehouse]
+		warehouses = get_cached_child_warehouses(warehouse) if include_child_warehouses else [warehouse]
 
-		bin = frappe.qb.DocType("Bin")
-		bin_details = (
-			frappe.qb.from_(bin)
-			.select(
-				Coalesce(Sum(bin.projected_qty), 0).as_("projected_qty"),
-				Coalesce(Sum(bin.actual_qty), 0).as_("actual_qty"),
-				Coalesce(Sum(bin.reserved_qty), 0).as_("reserved_qty"),
+		bins = get_prefetched_bins(item_code)
+		if bins is not None:
+			bins = [d for d in bins if d.warehouse in warehouses]
+			bin_details = frappe._dict(
+				{
+					field: sum(d[field] for d in bins) if bins else 0
+					for field in ("projected_qty", "actual_qty", "reserved_qty")
+				}
 			)
-			.where((bin.item_code == item_code) & (bin.warehouse.isin(warehouses)))
-		).run(as_dict=True)[0]
+		else:
+			bin = frappe.qb.DocType("Bin")
+			bin_details = (
+				frappe.qb.from_(bin)
+				.select(
+					Coalesce(Sum(bin.projected_qty), 0).as_("projected_qty"),
+					Coalesce(Sum(bin.actual_qty), 0).as_("actual_qty"),
+					Coalesce(Sum(bin.reserved_qty), 0).as_("reserved_qty"),
+				)
+				.where((bin.item_code == item_code) & (bin.warehouse.isin(warehouses)))
+			).run(as_dict=True)[0]
 
 	if company:
 		bin_details["company_total_stock"] = get_company_total_stock(item_code, company)
@@ -1227,6 +1295,11 @@ def get_bin_details(item_code, warehouse, company=None, include_child_warehouses
 
 
 def get_company_total_stock(item_code, company):
+	bins = get_prefetched_bins(item_code)
+	if bins is not None:
+		stock = [d.actual_qty for d in bins if d.company == company]
+		return sum(stock) if stock else None
+
 	bin = frappe.qb.DocType("Bin")
 	wh = frappe.qb.DocType("Warehouse")
 
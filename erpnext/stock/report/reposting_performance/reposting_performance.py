@@ -0,0 +1,215 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+from collections import defaultdict
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, flt, getdate
+
+from erpnext.stock.reposting_metrics import merge_metrics
+
+TIMINGS = ("sql", "valuation", "document_saves", "gl_entries")
+COUNTS = (
+	"item_warehouses_reposted",
+	"sles_read",
+	"sles_written",
+	"dependent_vouchers",
+	"vouchers_recalculated",
+	"gl_vouchers_compared",
+	"gl_vouchers_reposted",
+	"gl_entries_written",
+)
+
+
+def execute(filters=None):
+	filters = frappe._dict(filters or {})
+	return get_columns(), get_data(filters)
+
+
+def get_data(filters):
+	riv = frappe.qb.DocType("Repost Item Valuation")
+	query = (
+		frappe.qb.from_(riv)
+		.select(
+			riv.name,
+			riv.status,
+			riv.based_on,
+			riv.voucher_type,
+			riv.voucher_no,
+			riv.item_code,
+			riv.warehouse,
+			riv.posting_date,
+			riv.reposting_metrics,
+		)
+		.where(
+			(riv.docstatus == 1)
+			& (riv.company == filters.company)
+			& (riv.creation >= getdate(filters.from_date))
+			& (riv.creation < add_days(getdate(filters.to_date), 1))
+		)
+		.orderby(riv.creation, order=frappe.qb.desc)
+	)
+
+	if filters.status:
+		query = query.where(riv.status == filters.status)
+
+	reposts = query.run(as_dict=True)
+	chain_metrics = get_chain_metrics([d.name for d in reposts])
+
+	data = []
+	for repost in reposts:
+		chains = chain_metrics.get(repost.name, [])
+		if not repost.reposting_metrics and not chains:
+			continue
+
+		metrics = merge_metrics(repost.reposting_metrics, *chains)
+		row = frappe._dict(
+			{
+				"name": repost.name,
+				"status": repost.status,
+				"posting_date": repost.posting_date,
+				"reference_type": repost.voucher_type if repost.based_on == "Transaction" else "Item",
+				"reference_name": repost.voucher_no if repost.based_on == "Transaction" else repost.item_code,
+				"warehouse": repost.warehouse,
+				"chains": len(chains),
+				"total_time": flt(metrics["timings"].get("total")),
+			}
+		)
+
+		for key in TIMINGS:
+			row[f"{key}_time"] = flt(metrics["timings"].get(key))
+
+		# time not covered by any of the sections, e.g. loading the reposting data
+		row.other_time = max(row.total_time - sum(row[f"{key}_time"] for key in TIMINGS), 0)
+
+		for key in COUNTS:
+			row[key] = metrics["counts"].get(key, 0)
+
+		if metrics["slowest_item_warehouses"]:
+			item_warehouse, elapsed = metrics["slowest_item_warehouses"][0]
+			row.slowest_item_warehouse = f"{item_warehouse} ({elapsed}s)"
+
+		data.append(row)
+
+	return data
+
+
+def get_chain_metrics(reposts):
+	if not reposts:
+		return {}
+
+	chain = frappe.qb.DocType("Repost Item Valuation Chain")
+	chains = (
+		frappe.qb.from_(chain)
+		.select(chain.parent, chain.reposting_metrics)
+		.where(
+			(chain.parenttype == "Repost Item Valuation")
+			& chain.parent.isin(reposts)
+			& chain.reposting_metrics.isnotnull()
+		)
+	).run(as_dict=True)
+
+	chain_metrics = defaultdict(list)
+	for d in chains:
+		chain_metrics[d.parent].append(d.reposting_metrics)
+
+	return chain_metrics
+
+
+def get_columns():
+	columns = [
+		{
+			"label": _("Repost Item Valuation"),
+			"fieldname": "name",
+			"fieldtype": "Link",
+			"options": "Repost Item Valuation",
+			"width": 180,
+		},
+		{"label": _("Status"), "fieldname": "status", "fieldtype": "Data", "width": 100},
+		{"label": _("Posting Date"), "fieldname": "posting_date", "fieldtype": "Date", "width": 100},
+		{
+			"label": _("Reference Type"),
+			"fieldname": "reference_type",
+			"fieldtype": "Link",
+			"options": "DocType",
+			"width": 120,
+		},
+		{
+			"label": _("Reference"),
+			"fieldname": "reference_name",
+			"fieldtype": "Dynamic Link",
+			"options": "reference_type",
+			"width": 160,
+		},
+		{
+			"label": _("Warehouse"),
+			"fieldname": "warehouse",
+			"fieldtype": "Link",
+			"options": "Warehouse",
+			"width": 140,
+		},
+		{"label": _("Chains"), "fieldname": "chains", "fieldtype": "Int", "width": 80},
+		{"label": _("Total Time (s)"), "fieldname": "total_time", "fieldtype": "Float", "width": 120},
+		{"label": _("SQL Time (s)"), "fieldname": "sql_time", "fieldtype": "Float", "width": 120},
+		{"label": _("Valuation Time (s)"), "fieldname": "valuation_time", "fieldtype": "Float", "width": 140},
+		{
+			"label": _("Document Saves Time (s)"),
+			"fieldname": "document_saves_time",
+			"fieldtype": "Float",
+			"width": 170,
+		},
+		{
+			"label": _("GL Entries Time (s)"),
+			"fieldname": "gl_entries_time",
+			"fieldtype": "Float",
+			"width": 140,
+		},
+		{"label": _("Other Time (s)"), "fieldname": "other_time", "fieldtype": "Float", "width": 120},
+		{
+			"label": _("Item-Warehouses Reposted"),
+			"fieldname": "item_warehouses_reposted",
+			"fieldtype": "Int",
+			"width": 170,
+		},
+		{"label": _("SLEs Read"), "fieldname": "sles_read", "fieldtype": "Int", "width": 100},
+		{"label": _("SLEs Written"), "fieldname": "sles_written", "fieldtype": "Int", "width": 110},
+		{
+			"label": _("Dependent Vouchers"),
+			"fieldname": "dependent_vouchers",
+			"fieldtype": "Int",
+			"width": 140,
+		},
+		{
+			"label": _("Vouchers Recalculated"),
+			"fieldname": "vouchers_recalculated",
+			"fieldtype": "Int",
+			"width": 150,
+		},
+		{
+			"label": _("GL Vouchers Compared"),
+			"fieldname": "gl_vouchers_compared",
+			"fieldtype": "Int",
+			"width": 150,
+		},
+		{
+			"label": _("GL Vouchers Reposted"),
+			"fieldname": "gl_vouchers_reposted",
+			"fieldtype": "Int",
+			"width": 150,
+		},
+		{
+			"label": _("GL Entries Written"),
+			"fieldname": "gl_entries_written",
+			"fieldtype": "Int",
+			"width": 140,
+		},
+		{
+			"label": _("Slowest Item-Warehouse"),
+			"fieldname": "slowest_item_warehouse",
+			"fieldtype": "Data",
+			"width": 250,
+		},
+	]
+
+	return columns
@@ -0,0 +1,164 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import cProfile
+import io
+import json
+import pstats
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import now_datetime, scrub
+
+SLOWEST_ITEM_WAREHOUSES = 10
+PROFILE_STATS_LIMIT = 200
+
+
+class RepostMetrics:
+	"""
+	Counters and timings of a repost, stored on the Repost Item Valuation (or its chain).
+
+	Time is attributed exclusively to the innermost section, e.g. queries fired while
+	recalculating a voucher are counted as "sql" and not as "document_saves".
+	"""
+
+	def __init__(self, enabled=True, profile=False):
+		self.enabled = enabled
+		self.counts = defaultdict(int)
+		self.timings = defaultdict(float)
+		self.item_warehouse_timings = defaultdict(float)
+		self.profiler = cProfile.Profile() if enabled and profile else None
+		# time spent in the nested sections of every open section
+		self.nested_time = []
+
+	def incr(self, key, value=1):
+		if self.enabled:
+			self.counts[key] += value
+
+	@contextmanager
+	def section(self, name):
+		if not self.enabled:
+			yield
+			return
+
+		self.nested_time.append(0.0)
+		start = time.monotonic()
+		try:
+			yield
+		finally:
+			elapsed = time.monotonic() - start
+			self.timings[name] += elapsed - self.nested_time.pop()
+			if self.nested_time:
+				self.nested_time[-1] += elapsed
+
+	def add_item_warehouse_time(self, item_code, warehouse, elapsed):
+		if self.enabled:
+			self.item_warehouse_timings[f"{item_code}: {warehouse}"] += elapsed
+
+	@contextmanager
+	def capture(self):
+		"""Collect the metrics of the reposting done within the block"""
+		previous_metrics = frappe.flags.repost_metrics
+		sql = frappe.db.sql
+
+		def timed_sql(*args, **kwargs):
+			with self.section("sql"):
+				return sql(*args, **kwargs)
+
+		frappe.db.sql = timed_sql
+		frappe.flags.repost_metrics = self
+		if self.profiler:
+			self.profiler.enable()
+
+		start = time.monotonic()
+		try:
+			yield self
+		finally:
+			self.timings["total"] += time.monotonic() - start
+			if self.profiler:
+				self.profiler.disable()
+
+			frappe.db.sql = sql
+			frappe.flags.repost_metrics = previous_metrics
+
+	def as_dict(self):
+		return merge_metrics(
+			{
+				"counts": self.counts,
+				"timings": self.timings,
+				"slowest_item_warehouses": list(self.item_warehouse_timings.items()),
+			}
+		)
+
+	def save(self, doc):
+		"""Add the metrics to the ones already stored on `doc` and attach the profile, if any"""
+		if not self.enabled or "total" not in self.timings:
+			# nothing was captured
+			return
+
+		metrics = merge_metrics(
+			frappe.db.get_value(doc.doctype, doc.name, "reposting_metrics"), self.as_dict()
+		)
+		frappe.db.set_value(
+			doc.doctype, doc.name, "reposting_metrics", json.dumps(metrics), update_modified=False
+		)
+
+		if self.profiler:
+			self.attach_profile(doc)
+
+	def attach_profile(self, doc):
+		stream = io.StringIO()
+		stats = pstats.Stats(self.profiler, stream=stream)
+		stats.sort_stats("cumulative").print_stats(PROFILE_STATS_LIMIT)
+
+		# chains are profiled separately, the profiles are attached to the repost itself
+		_file = frappe.get_doc(
+			{
+				"doctype": "File",
+				"file_name": f"{scrub(doc.name)}-profile-{now_datetime():%Y%m%d%H%M%S}.txt",
+				"attached_to_doctype": "Repost Item Valuation",
+				"attached_to_name": doc.get("parent") or doc.name,
+				"content": stream.getvalue(),
+				"is_private": 1,
+			}
+		)
+		_file.save(ignore_permissions=True)
+
+
+_disabled_metrics = RepostMetrics(enabled=False)
+
+
+def get_repost_metrics() -> RepostMetrics:
+	"""Metrics of the repost in progress, a no-op instance outside of a measured repost"""
+	return frappe.flags.repost_metrics or _disabled_metrics
+
+
+def merge_metrics(*metrics) -> dict:
+	counts = defaultdict(int)
+	timings = defaultdict(float)
+	item_warehouse_timings = defaultdict(float)
+
+	for data in metrics:
+		if not data:
+			continue
+
+		data = frappe.parse_json(data)
+		for key, value in data.get("counts", {}).items():
+			counts[key] += value
+
+		for key, value in data.get("timings", {}).items():
+			timings[key] += value
+
+		for key, value in data.get("slowest_item_warehouses", []):
+			item_warehouse_timings[key] += value
+
+	slowest_item_warehouses = sorted(item_warehouse_timings.items(), key=lambda d: d[1], reverse=True)
+	return {
+		"counts": dict(counts),
+		"timings": {key: round(value, 3) for key, value in timings.items()},
+		"slowest_item_warehouses": [
+			[key, round(value, 3)] for key, value in slowest_item_warehouses[:SLOWEST_ITEM_WAREHOUSES]
+		],
+	}
@@ -4,6 +4,8 @@
 import copy
 import gzip
 import json
+import re
+import time
 
 import frappe
 from frappe import _, bold, scrub
@@ -19,7 +21,6 @@ from frappe.utils import (
 	now,
 	nowdate,
 	nowtime,
-	parse_json,
 )
 
 import erpnext
@@ -28,10 +29,14 @@ from erpnext.stock.doctype.inventory_dimension.inventory_dimension import get_in
 from erpnext.stock.doctype.serial_and_batch_bundle.serial_and_batch_bundle import (
 	get_available_batches,
 )
+from erpnext.stock.doctype.stock_ledger_checkpoint.stock_ledger_checkpoint import (
+	invalidate_stock_ledger_checkpoints,
+)
 from erpnext.stock.doctype.stock_reservation_entry.stock_reservation_entry import (
 	get_sre_reserved_batch_nos_details,
 	get_sre_reserved_serial_nos_details,
 )
+from erpnext.stock.reposting_metrics import get_repost_metrics
 from erpnext.stock.utils import (
 	get_combine_datetime,
 	get_incoming_outgoing_rate_for_cancel,
@@ -41,7 +46,13 @@ from erpnext.stock.utils import (
 	get_stock_balance,
 	get_valuation_method,
 )
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation, round_off_if_near_zero
+from erpnext.stock.valuation import (
+	FIFOValuation,
+	LIFOValuation,
+	decode_stock_queue,
+	encode_stock_queue,
+	round_off_if_near_zero,
+)
 
 
 class NegativeStockError(frappe.ValidationError):
@@ -239,12 +250,13 @@ def repost_future_sle(
 	allow_negative_stock=None,
 	via_landed_cost_voucher=False,
 	doc=None,
-):
+) -> set[tuple[str, str]]:
+	"""Repost future SLEs of the item-warehouses in `args` and return the affected transactions"""
 	if not args:
 		args = []  # set args to empty list if None to avoid enumerate error
 
 	reposting_data = {}
-	if doc and doc.reposting_data_file:
+	if doc and doc.get("reposting_data_file"):
 		reposting_data = get_reposting_data(doc.reposting_data_file)
 
 	items_to_be_repost = get_items_to_be_repost(
@@ -255,11 +267,15 @@ def repost_future_sle(
 
 	distinct_item_warehouses = get_distinct_item_warehouse(args, doc, reposting_data=reposting_data)
 	affected_transactions = get_affected_transactions(doc, reposting_data=reposting_data)
+	vouchers_to_recalculate = {tuple(d) for d in reposting_data.get("vouchers_to_recalculate") or []}
+	journal = RepostingJournal()
+	metrics = get_repost_metrics()
 
 	i = get_current_index(doc) or 0
 	while i < len(args):
 		validate_item_warehouse(args[i])
 
+		start = time.monotonic()
 		obj = update_entries_after(
 			{
 				"item_code": args[i].get("item_code"),
@@ -270,34 +286,52 @@ def repost_future_sle(
 				"distinct_item_warehouses": distinct_item_warehouses,
 				"items_to_be_repost": args,
 				"current_index": i,
+				"vouchers_to_recalculate": vouchers_to_recalculate,
 			},
 			allow_negative_stock=allow_negative_stock,
 			via_landed_cost_voucher=via_landed_cost_voucher,
 		)
+		metrics.add_item_warehouse_time(obj.item_code, obj.args.warehouse, time.monotonic() - start)
+		metrics.incr("item_warehouses_reposted")
+
+		journal.add_transactions(obj.affected_transactions - affected_transactions)
 		affected_transactions.update(obj.affected_transactions)
 
 		key = (args[i].get("item_code"), args[i].get("warehouse"))
 		if distinct_item_warehouses.get(key):
 			distinct_item_warehouses[key].reposting_status = True
+			journal.mark_changed(key)
 
 		if obj.new_items_found:
-			for _item_wh, data in distinct_item_warehouses.items():
+			for item_wh, data in distinct_item_warehouses.items():
 				if ("args_idx" not in data and not data.reposting_status) or (
 					data.sle_changed and data.reposting_status
 				):
 					data.args_idx = len(args)
 					args.append(data.sle)
+					journal.mark_changed(item_wh, data.args_idx)
 				elif data.sle_changed and not data.reposting_status:
 					args[data.args_idx] = data.sle
+					journal.mark_changed(item_wh, data.args_idx)
 
 				data.sle_changed = False
 		i += 1
 
 		if doc:
 			update_args_in_repost_item_valuation(
-				doc, i, args, distinct_item_warehouses, affected_transactions
+				doc,
+				i,
+				args,
+				distinct_item_warehouses,
+				affected_transactions,
+				journal,
+				vouchers_to_recalculate,
 			)
 
+	recalculate_vouchers(vouchers_to_recalculate)
+
+	return affected_transactions
+
 
 def get_reposting_data(file_path) -> dict:
 	file_name = frappe.db.get_value(
@@ -323,10 +357,7 @@ def get_reposting_data(file_path) -> dict:
 	except Exception:
 		return frappe._dict()
 
-	if data := json.loads(data.decode("utf-8")):
-		data = data
-
-	return parse_json(data)
+	return RepostingJournal.replay(data.decode("utf-8"))
 
 
 def validate_item_warehouse(args):
@@ -336,22 +367,40 @@ def validate_item_warehouse(args):
 			frappe.throw(_(validation_msg))
 
 
-def update_args_in_repost_item_valuation(doc, index, args, distinct_item_warehouses, affected_transactions):
+def update_args_in_repost_item_valuation(
+	doc,
+	index,
+	args,
+	distinct_item_warehouses,
+	affected_transactions,
+	journal=None,
+	vouchers_to_recalculate=None,
+):
+	if vouchers_to_recalculate is None:
+		vouchers_to_recalculate = set()
+
 	if not doc.items_to_be_repost:
 		file_name = ""
 		if doc.reposting_data_file:
 			file_name = get_reposting_file_name(doc.doctype, doc.name)
 			# frappe.delete_doc("File", file_name, ignore_permissions=True, delete_permanently=True)
 
-		doc.reposting_data_file = create_json_gz_file(
-			{
-				"items_to_be_repost": args,
-				"distinct_item_and_warehouse": {str(k): v for k, v in distinct_item_warehouses.items()},
-				"affected_transactions": affected_transactions,
-			},
-			doc,
-			file_name,
-		)
+		if file_name and journal:
+			journal.write(file_name, args, distinct_item_warehouses, vouchers_to_recalculate)
+		else:
+			doc.reposting_data_file = create_json_gz_file(
+				{
+					"items_to_be_repost": args,
+					"distinct_item_and_warehouse": {str(k): v for k, v in distinct_item_warehouses.items()},
+					"affected_transactions": affected_transactions,
+					"vouchers_to_recalculate": list(vouchers_to_recalculate),
+				},
+				doc,
+				file_name,
+			)
+
+			if journal:
+				journal.clear()
 
 		doc.db_set(
 			{
@@ -362,6 +411,8 @@ def update_args_in_repost_item_valuation(doc, index, args, distinct_item_warehou
 		)
 
 	else:
+		# the pending recalculations can not be resumed from here
+		recalculate_vouchers(vouchers_to_recalculate)
 		doc.db_set(
 			{
 				"items_to_be_repost": json.dumps(args, default=str),
@@ -380,7 +431,6 @@ def update_args_in_repost_item_valuation(doc, index, args, distinct_item_warehou
 		"item_reposting_progress",
 		{
 			"name": doc.name,
-			"items_to_be_repost": json.dumps(args, default=str),
 			"current_index": index,
 			"total_reposting_count": len(args),
 		},
@@ -401,6 +451,88 @@ def get_reposting_file_name(dt, dn):
 	)
 
 
+class RepostingJournal:
+	"""
+	Append-only progress log of a repost, kept in the `reposting_data_file`.
+
+	The file starts with a snapshot of the reposting state. Every checkpoint after that
+	appends a gzip member with only the entries changed since the previous checkpoint,
+	so checkpointing does not rewrite the whole state.
+	"""
+
+	def __init__(self):
+		self.file_path = None
+		self.clear()
+
+	def clear(self):
+		self.changed_args = set()
+		self.changed_item_warehouses = set()
+		self.new_transactions = set()
+
+	def mark_changed(self, item_warehouse, args_idx=None):
+		self.changed_item_warehouses.add(item_warehouse)
+		if args_idx is not None:
+			self.changed_args.add(args_idx)
+
+	def add_transactions(self, transactions):
+		self.new_transactions.update(transactions)
+
+	def write(self, file_name, args, distinct_item_warehouses, vouchers_to_recalculate=()):
+		changes = {
+			"items_to_be_repost": {idx: args[idx] for idx in sorted(self.changed_args)},
+			"distinct_item_and_warehouse": {
+				str(key): distinct_item_warehouses[key] for key in self.changed_item_warehouses
+			},
+			"affected_transactions": list(self.new_transactions),
+			# small enough to be written as a whole every time
+			"vouchers_to_recalculate": list(vouchers_to_recalculate),
+		}
+
+		if not self.file_path:
+			self.file_path = frappe.get_doc("File", file_name).get_full_path()
+
+		content = json.dumps({"changes": changes}, default=str, separators=(",", ":")) + "\n"
+		with open(self.file_path, "ab") as f:
+			f.write(gzip.compress(frappe.safe_encode(content)))
+
+		self.clear()
+
+	@staticmethod
+	def replay(content: str) -> dict:
+		"""Rebuild the reposting state from the snapshot and the changes appended to it"""
+		data = frappe._dict(
+			items_to_be_repost=[],
+			distinct_item_and_warehouse={},
+			affected_transactions=[],
+			vouchers_to_recalculate=[],
+		)
+
+		decoder = json.JSONDecoder()
+		whitespace = re.compile(r"\s*")
+		idx = whitespace.match(content).end()
+		while idx < len(content):
+			record, idx = decoder.raw_decode(content, idx)
+			idx = whitespace.match(content, idx).end()
+
+			changes = record.get("changes")
+			if changes is None:
+				data.update(record)
+				continue
+
+			items_to_be_repost = data.items_to_be_repost
+			for args_idx, sle in changes["items_to_be_repost"].items():
+				if int(args_idx) < len(items_to_be_repost):
+					items_to_be_repost[int(args_idx)] = sle
+				else:
+					items_to_be_repost.append(sle)
+
+			data.distinct_item_and_warehouse.update(changes["distinct_item_and_warehouse"])
+			data.affected_transactions.extend(changes["affected_transactions"])
+			data.vouchers_to_recalculate = changes.get("vouchers_to_recalculate", [])
+
+		return data
+
+
 def create_json_gz_file(data, doc, file_name=None) -> str:
 	encoded_content = frappe.safe_encode(frappe.as_json(data))
 	compressed_content = gzip.compress(encoded_content)
@@ -432,7 +564,7 @@ def create_json_gz_file(data, doc, file_name=None) -> str:
 
 
 def get_items_to_be_repost(voucher_type=None, voucher_no=None, doc=None, reposting_data=None):
-	if not reposting_data and doc and doc.reposting_data_file:
+	if not reposting_data and doc and doc.get("reposting_data_file"):
 		reposting_data = get_reposting_data(doc.reposting_data_file)
 
 	if reposting_data and reposting_data.items_to_be_repost:
@@ -456,7 +588,7 @@ def get_items_to_be_repost(voucher_type=None, voucher_no=None, doc=None, reposti
 
 
 def get_distinct_item_warehouse(args=None, doc=None, reposting_data=None):
-	if not reposting_data and doc and doc.reposting_data_file:
+	if not reposting_data and doc and doc.get("reposting_data_file"):
 		reposting_data = get_reposting_data(doc.reposting_data_file)
 
 	if reposting_data and reposting_data.distinct_item_and_warehouse:
@@ -489,7 +621,7 @@ def parse_distinct_items_and_warehouses(distinct_items_and_warehouses):
 
 
 def get_affected_transactions(doc, reposting_data=None) -> set[tuple[str, str]]:
-	if not reposting_data and doc and doc.reposting_data_file:
+	if not reposting_data and doc and doc.get("reposting_data_file"):
 		reposting_data = get_reposting_data(doc.reposting_data_file)
 
 	if reposting_data and reposting_data.affected_transactions:
@@ -550,16 +682,40 @@ class update_entries_after:
 		self.company = frappe.get_cached_value("Warehouse", self.args.warehouse, "company")
 		self.set_precision()
 		self.valuation_method = get_valuation_method(self.item_code)
+		self.compact_stock_queue = cint(
+			frappe.db.get_single_value("Stock Settings", "compact_stock_queue", cache=True)
+		)
 
 		self.new_items_found = False
 		self.distinct_item_warehouses = args.get("distinct_item_warehouses", frappe._dict())
+		# vouchers to be recalculated once at the end of the repost, None to recalculate right away
+		self.vouchers_to_recalculate = args.get("vouchers_to_recalculate")
 		self.affected_transactions: set[tuple[str, str]] = set()
 		self.reserved_stock = flt(self.args.reserved_stock)
+		self.set_write_back_mode()
 
 		self.data = frappe._dict()
 		self.initialize_previous_data(self.args)
 		self.build()
 
+	def set_write_back_mode(self):
+		"""
+		While reposting future entries, optionally keep the recomputed SLE and Bin values
+		in memory and write them back in bulk (see Stock Reposting Settings).
+		"""
+		self.pending_sle_updates = {}
+		self.pending_bin_updates = {}
+		self.batched_write_back = False
+		self.write_back_batch_size = 1000
+
+		if self.args.get("sle_id"):
+			return
+
+		repost_settings = frappe.get_cached_doc("Stock Reposting Settings")
+		if cint(repost_settings.batched_write_back):
+			self.batched_write_back = True
+			self.write_back_batch_size = cint(repost_settings.write_back_batch_size) or 1000
+
 	def set_precision(self):
 		self.flt_precision = cint(frappe.db.get_default("float_precision")) or 2
 		self.currency_precision = get_field_precision(
@@ -588,6 +744,7 @@ class update_entries_after:
 		"""
 		self.data.setdefault(args.warehouse, frappe._dict())
 		warehouse_dict = self.data[args.warehouse]
+		invalidate_stock_ledger_checkpoints(self.item_code, args.warehouse, args.posting_date)
 		previous_sle = get_previous_sle_of_current_voucher(args)
 		warehouse_dict.previous_sle = previous_sle
 
@@ -597,7 +754,7 @@ class update_entries_after:
 		warehouse_dict.update(
 			{
 				"prev_stock_value": previous_sle.stock_value or 0.0,
-				"stock_queue": json.loads(previous_sle.stock_queue or "[]"),
+				"stock_queue": decode_stock_queue(previous_sle.stock_queue),
 				"stock_value_difference": 0.0,
 			}
 		)
@@ -610,19 +767,29 @@ class update_entries_after:
 			if not future_sle_exists(self.args):
 				self.update_bin()
 		else:
+			metrics = get_repost_metrics()
 			entries_to_fix: list = self.get_future_entries_to_fix()
+			metrics.incr("sles_read", len(entries_to_fix))
 
 			i = 0
 			# print(f"stock_ledger.update_entries_after().  Total entries to fix = {len(entries_to_fix)}.")
-			while i < len(entries_to_fix):
-				sle = entries_to_fix[i]
-				i += 1
+			with metrics.section("valuation"):
+				while i < len(entries_to_fix):
+					sle = entries_to_fix[i]
+					i += 1
 
-				self.process_sle(sle)
-				self.update_bin_data(sle)
+					if self.is_plain_moving_average_entry(sle):
+						self.process_moving_average_sle(sle)
+					else:
+						self.process_sle(sle)
+
+					self.update_bin_data(sle)
 
-				if sle.dependant_sle_voucher_detail_no:
-					entries_to_fix = self.get_dependent_entries_to_fix(entries_to_fix, sle)
+					if sle.dependant_sle_voucher_detail_no:
+						entries_to_fix = self.get_dependent_entries_to_fix(entries_to_fix, sle)
+
+			self.flush_sle_updates()
+			self.flush_bin_updates()
 
 		if self.exceptions:
 			self.raise_exceptions()
@@ -685,7 +852,9 @@ class update_entries_after:
 
 		if not dependant_sle:
 			return entries_to_fix
-		elif dependant_sle.item_code == self.item_code and dependant_sle.warehouse == self.args.warehouse:
+
+		get_repost_metrics().incr("dependent_vouchers")
+		if dependant_sle.item_code == self.item_code and dependant_sle.warehouse == self.args.warehouse:
 			return entries_to_fix
 		elif dependant_sle.item_code != self.item_code:
 			self.update_distinct_item_warehouses(dependant_sle)
@@ -693,6 +862,7 @@ class update_entries_after:
 		elif dependant_sle.item_code == self.item_code and dependant_sle.warehouse in self.data:
 			return entries_to_fix
 		else:
+			self.flush_sle_updates()
 			self.initialize_previous_data(dependant_sle)
 			self.update_distinct_item_warehouses(dependant_sle)
 			return entries_to_fix
@@ -794,6 +964,10 @@ class update_entries_after:
 				self.wh_data.qty_after_transaction += flt(sle.actual_qty)
 				return
 
+		if self.reads_stock_ledger(sle):
+			# pending values must be visible to the rate/qty lookups below
+			self.flush_sle_updates()
+
 		# Get dynamic incoming/outgoing rate
 		if not self.args.get("sle_id"):
 			self.get_dynamic_incoming_outgoing_rate(sle)
@@ -880,13 +1054,13 @@ class update_entries_after:
 		sle.qty_after_transaction = self.wh_data.qty_after_transaction
 		sle.valuation_rate = self.wh_data.valuation_rate
 		sle.stock_value = self.wh_data.stock_value
-		sle.stock_queue = json.dumps(self.wh_data.stock_queue)
+		sle.stock_queue = encode_stock_queue(self.wh_data.stock_queue, compact=self.compact_stock_queue)
 
 		if not sle.is_adjustment_entry or not self.args.get("sle_id"):
 			sle.stock_value_difference = stock_value_difference
 
 		sle.doctype = "Stock Ledger Entry"
-		frappe.get_doc(sle).db_update()
+		self.write_sle(sle)
 
 		if (
 			sle.serial_and_batch_bundle
@@ -902,6 +1076,101 @@ class update_entries_after:
 		):
 			self.update_outgoing_rate_on_transaction(sle)
 
+	def reads_stock_ledger(self, sle) -> bool:
+		"""Returns True if processing this SLE looks up other SLEs from the database"""
+		return bool(
+			sle.recalculate_rate
+			or sle.serial_no
+			or sle.batch_no
+			or sle.serial_and_batch_bundle
+			or sle.voucher_type == "Stock Reconciliation"
+			or (sle.voucher_type in ("Purchase Receipt", "Purchase Invoice") and flt(sle.actual_qty) < 0)
+		)
+
+	def is_plain_moving_average_entry(self, sle) -> bool:
+		"""
+		Moving average entries whose values depend only on the running qty and valuation rate,
+		these are reposted without the lookups of process_sle.
+		"""
+		return (
+			self.valuation_method == "Moving Average"
+			and not self.reads_stock_ledger(sle)
+			and not sle.has_serial_no
+			and not sle.has_batch_no
+			and not sle.dependant_sle_voucher_detail_no
+		)
+
+	def process_moving_average_sle(self, sle):
+		"""Reposting fast path of process_sle for plain moving average entries"""
+		self.wh_data = self.data[sle.warehouse]
+
+		self.validate_previous_sle_qty(sle)
+		self.affected_transactions.add((sle.voucher_type, sle.voucher_no))
+
+		if not cint(self.allow_negative_stock) and not self.validate_negative_stock(sle):
+			self.wh_data.qty_after_transaction += flt(sle.actual_qty)
+			return
+
+		self.get_moving_average_values(sle)
+		self.wh_data.qty_after_transaction += flt(sle.actual_qty)
+
+		stock_value = 0.0
+		if self.wh_data.qty_after_transaction:
+			stock_value = flt(
+				flt(self.wh_data.qty_after_transaction) * flt(self.wh_data.valuation_rate),
+				self.currency_precision,
+			)
+
+		self.wh_data.stock_value = stock_value
+		sle.stock_value_difference = stock_value - self.wh_data.prev_stock_value
+		self.wh_data.prev_stock_value = stock_value
+
+		sle.qty_after_transaction = self.wh_data.qty_after_transaction
+		sle.valuation_rate = self.wh_data.valuation_rate
+		sle.stock_value = stock_value
+		sle.stock_queue = encode_stock_queue(self.wh_data.stock_queue, compact=self.compact_stock_queue)
+
+		self.write_sle(sle)
+		self.update_outgoing_rate_on_transaction(sle)
+
+	def write_sle(self, sle):
+		if not self.batched_write_back:
+			get_repost_metrics().incr("sles_written")
+			frappe.get_doc(sle).db_update()
+			return
+
+		self.buffer_sle_update(sle)
+
+	def buffer_sle_update(self, sle):
+		get_repost_metrics().incr("sles_written")
+		self.pending_sle_updates[sle.name] = {
+			"actual_qty": sle.actual_qty,
+			"is_cancelled": sle.is_cancelled,
+			"incoming_rate": sle.incoming_rate,
+			"outgoing_rate": sle.outgoing_rate,
+			"qty_after_transaction": sle.qty_after_transaction,
+			"valuation_rate": sle.valuation_rate,
+			"stock_value": sle.stock_value,
+			"stock_queue": sle.stock_queue,
+			"stock_value_difference": sle.stock_value_difference,
+		}
+
+		if len(self.pending_sle_updates) >= self.write_back_batch_size:
+			self.flush_sle_updates()
+
+	def flush_sle_updates(self):
+		"""Write pending SLE values with multi-row updates"""
+		if not self.pending_sle_updates:
+			return
+
+		frappe.db.bulk_update(
+			"Stock Ledger Entry",
+			self.pending_sle_updates,
+			chunk_size=self.write_back_batch_size,
+			update_modified=False,
+		)
+		self.pending_sle_updates = {}
+
 	def get_serialized_values(self, sle):
 		from erpnext.stock.serial_batch_bundle import SerialNoValuation
 
@@ -1062,6 +1331,9 @@ class update_entries_after:
 			"Sales Invoice",
 			"Subcontracting Receipt",
 		):
+			# rates of the finished items are derived while recalculating the voucher
+			self.recalculate_pending_voucher(sle.voucher_type, sle.voucher_no)
+
 			if frappe.get_cached_value(sle.voucher_type, sle.voucher_no, "is_return"):
 				from erpnext.controllers.sales_and_purchase_return import (
 					get_rate_for_return,  # don't move this import to top
@@ -1153,33 +1425,53 @@ class update_entries_after:
 		Update outgoing rate in Stock Entry, Delivery Note, Sales Invoice and Sales Return
 		In case of Stock Entry, also calculate FG Item rate and total incoming/outgoing amount
 		"""
-		if sle.actual_qty and sle.voucher_detail_no:
-			outgoing_rate = abs(flt(sle.stock_value_difference)) / abs(sle.actual_qty)
-
-			if flt(sle.actual_qty) < 0 and sle.voucher_type == "Stock Entry":
-				self.update_rate_on_stock_entry(sle, outgoing_rate)
-			elif sle.voucher_type in ("Delivery Note", "Sales Invoice"):
-				self.update_rate_on_delivery_and_sales_return(sle, outgoing_rate)
-			elif flt(sle.actual_qty) < 0 and sle.voucher_type in ("Purchase Receipt", "Purchase Invoice"):
-				self.update_rate_on_purchase_receipt(sle, outgoing_rate)
-			elif flt(sle.actual_qty) < 0 and sle.voucher_type == "Subcontracting Receipt":
-				self.update_rate_on_subcontracting_receipt(sle, outgoing_rate)
-		elif sle.voucher_type == "Stock Reconciliation":
-			self.update_rate_on_stock_reconciliation(sle)
+		with get_repost_metrics().section("document_saves"):
+			if sle.voucher_type == "Stock Reconciliation" or (
+				self.vouchers_to_recalculate is None
+				and sle.voucher_type not in ("Delivery Note", "Sales Invoice")
+			):
+				# recalculation of the voucher reads the previous SLEs
+				self.flush_sle_updates()
+
+			if sle.actual_qty and sle.voucher_detail_no:
+				outgoing_rate = abs(flt(sle.stock_value_difference)) / abs(sle.actual_qty)
+
+				if flt(sle.actual_qty) < 0 and sle.voucher_type == "Stock Entry":
+					self.update_rate_on_stock_entry(sle, outgoing_rate)
+				elif sle.voucher_type in ("Delivery Note", "Sales Invoice"):
+					self.update_rate_on_delivery_and_sales_return(sle, outgoing_rate)
+				elif flt(sle.actual_qty) < 0 and sle.voucher_type in ("Purchase Receipt", "Purchase Invoice"):
+					self.update_rate_on_purchase_receipt(sle, outgoing_rate)
+				elif flt(sle.actual_qty) < 0 and sle.voucher_type == "Subcontracting Receipt":
+					self.update_rate_on_subcontracting_receipt(sle, outgoing_rate)
+			elif sle.voucher_type == "Stock Reconciliation":
+				self.update_rate_on_stock_reconciliation(sle)
 
 	def update_rate_on_stock_entry(self, sle, outgoing_rate):
 		frappe.db.set_value("Stock Entry Detail", sle.voucher_detail_no, "basic_rate", outgoing_rate)
 
 		# Update outgoing item's rate, recalculate FG Item's rate and total incoming/outgoing amount
 		if not sle.dependant_sle_voucher_detail_no:
-			self.recalculate_amounts_in_stock_entry(sle.voucher_no)
+			self.recalculate_voucher(sle.voucher_type, sle.voucher_no)
 
 	def recalculate_amounts_in_stock_entry(self, voucher_no):
-		stock_entry = frappe.get_doc("Stock Entry", voucher_no, for_update=True)
-		stock_entry.calculate_rate_and_amount(reset_outgoing_rate=False, raise_error_if_no_rate=False)
-		stock_entry.db_update()
-		for d in stock_entry.items:
-			d.db_update()
+		if self.vouchers_to_recalculate:
+			self.vouchers_to_recalculate.discard(("Stock Entry", voucher_no))
+
+		recalculate_voucher("Stock Entry", voucher_no)
+
+	def recalculate_voucher(self, voucher_type, voucher_no):
+		"""Recalculate the voucher once at the end of the repost instead of once per reposted row"""
+		if self.vouchers_to_recalculate is None:
+			recalculate_voucher(voucher_type, voucher_no)
+		else:
+			self.vouchers_to_recalculate.add((voucher_type, voucher_no))
+
+	def recalculate_pending_voucher(self, voucher_type, voucher_no):
+		voucher = (voucher_type, voucher_no)
+		if self.vouchers_to_recalculate and voucher in self.vouchers_to_recalculate:
+			self.vouchers_to_recalculate.discard(voucher)
+			recalculate_voucher(voucher_type, voucher_no)
 
 	def update_rate_on_delivery_and_sales_return(self, sle, outgoing_rate):
 		# Update item's incoming rate on transaction
@@ -1212,10 +1504,7 @@ class update_entries_after:
 
 		# Recalculate subcontracted item's rate in case of subcontracted purchase receipt/invoice
 		if frappe.get_cached_value(sle.voucher_type, sle.voucher_no, "is_subcontracted"):
-			doc = frappe.get_doc(sle.voucher_type, sle.voucher_no)
-			doc.update_valuation_rate(reset_outgoing_rate=False)
-			for d in doc.items + doc.supplied_items:
-				d.db_update()
+			self.recalculate_voucher(sle.voucher_type, sle.voucher_no)
 
 	def update_rate_on_subcontracting_receipt(self, sle, outgoing_rate):
 		if frappe.db.exists("Subcontracting Receipt Item", sle.voucher_detail_no):
@@ -1227,15 +1516,11 @@ class update_entries_after:
 				{"rate": outgoing_rate, "amount": abs(sle.actual_qty) * outgoing_rate},
 			)
 
-		scr = frappe.get_doc("Subcontracting Receipt", sle.voucher_no, for_update=True)
-		scr.calculate_items_qty_and_amount()
-		scr.db_update()
-		for d in scr.items:
-			d.db_update()
+		self.recalculate_voucher("Subcontracting Receipt", sle.voucher_no)
 
 	def update_rate_on_stock_reconciliation(self, sle):
 		if not sle.serial_no and not sle.batch_no:
-			sr = frappe.get_doc("Stock Reconciliation", sle.voucher_no, for_update=True)
+			sr = frappe.get_doc("Stock Reconciliation", sle.voucher_no)
 
 			for item in sr.items:
 				# Skip for Serial and Batch Items
@@ -1259,13 +1544,12 @@ class update_entries_after:
 				item.amount = flt(item.qty) * flt(item.valuation_rate)
 				item.quantity_difference = item.qty - item.current_qty
 				item.amount_difference = item.amount - item.current_amount
-			else:
-				sr.difference_amount = sum([item.amount_difference for item in sr.items])
-			sr.db_update()
 
-			for item in sr.items:
+				# only the reposted row is written, other rows may be reposted in parallel (see Repost Item Valuation)
 				item.db_update()
 
+			update_difference_amount_in_stock_reconciliation(sle.voucher_no)
+
 	def get_incoming_value_for_serial_nos(self, sle, serial_nos):
 		# get rate from serial nos within same company
 		all_serial_nos = frappe.get_all(
@@ -1376,7 +1660,9 @@ class update_entries_after:
 
 		stock_value_difference = stock_value - prev_stock_value
 
-		self.wh_data.stock_queue = stock_queue.state
+		# the FIFO deque is kept for the next entries of the warehouse, it's turned into a list only when
+		# the entry is serialized
+		self.wh_data.stock_queue = stock_queue.state if self.valuation_method == "LIFO" else stock_queue.queue
 		self.wh_data.stock_value = round_off_if_near_zero(self.wh_data.stock_value + stock_value_difference)
 
 		if not self.wh_data.stock_queue:
@@ -1441,6 +1727,7 @@ class update_entries_after:
 	def get_fallback_rate(self, sle) -> float:
 		"""When exact incoming rate isn't available use any of other "average" rates as fallback.
 		This should only get used for negative stock."""
+		self.flush_sle_updates()
 		return get_valuation_rate(
 			sle.item_code,
 			sle.warehouse,
@@ -1508,7 +1795,6 @@ class update_entries_after:
 				raise NegativeStockError(message)
 
 	def update_bin_data(self, sle):
-		bin_name = get_or_make_bin(sle.item_code, sle.warehouse)
 		values_to_update = {
 			"actual_qty": sle.qty_after_transaction,
 			"stock_value": sle.stock_value,
@@ -1517,8 +1803,22 @@ class update_entries_after:
 		if sle.valuation_rate is not None:
 			values_to_update["valuation_rate"] = sle.valuation_rate
 
+		if self.batched_write_back:
+			# only the last values per warehouse matter, written once in flush_bin_updates
+			self.pending_bin_updates[(sle.item_code, sle.warehouse)] = values_to_update
+			return
+
+		self.pending_bin_updates.pop((sle.item_code, sle.warehouse), None)
+		bin_name = get_or_make_bin(sle.item_code, sle.warehouse)
 		frappe.db.set_value("Bin", bin_name, values_to_update)
 
+	def flush_bin_updates(self):
+		for (item_code, warehouse), values_to_update in self.pending_bin_updates.items():
+			bin_name = get_or_make_bin(item_code, warehouse)
+			frappe.db.set_value("Bin", bin_name, values_to_update)
+
+		self.pending_bin_updates = {}
+
 	def update_bin(self):
 		# update bin for each warehouse
 		for warehouse, data in self.data.items():
@@ -1530,6 +1830,57 @@ class update_entries_after:
 			frappe.db.set_value("Bin", bin_name, updated_values, update_modified=True)
 
 
+def recalculate_voucher(voucher_type, voucher_no):
+	"""Recalculate the amounts and the rates of finished items after the rates of consumed items are reposted"""
+	metrics = get_repost_metrics()
+	metrics.incr("vouchers_recalculated")
+	with metrics.section("document_saves"):
+		if voucher_type == "Stock Entry":
+			stock_entry = frappe.get_doc("Stock Entry", voucher_no, for_update=True)
+			stock_entry.calculate_rate_and_amount(reset_outgoing_rate=False, raise_error_if_no_rate=False)
+			stock_entry.db_update()
+			for d in stock_entry.items:
+				d.db_update()
+
+		elif voucher_type == "Subcontracting Receipt":
+			scr = frappe.get_doc("Subcontracting Receipt", voucher_no, for_update=True)
+			scr.calculate_items_qty_and_amount()
+			scr.db_update()
+			for d in scr.items:
+				d.db_update()
+
+		else:
+			# subcontracted purchase receipt/invoice
+			doc = frappe.get_doc(voucher_type, voucher_no)
+			doc.update_valuation_rate(reset_outgoing_rate=False)
+			for d in doc.items + doc.supplied_items:
+				d.db_update()
+
+
+def recalculate_vouchers(vouchers):
+	for voucher_type, voucher_no in sorted(vouchers):
+		recalculate_voucher(voucher_type, voucher_no)
+
+	vouchers.clear()
+
+
+def update_difference_amount_in_stock_reconciliation(voucher_no):
+	sr_item = frappe.qb.DocType("Stock Reconciliation Item")
+	difference_amount = (
+		frappe.qb.from_(sr_item)
+		.select(Sum(sr_item.amount_difference))
+		.where((sr_item.parent == voucher_no) & (sr_item.parenttype == "Stock Reconciliation"))
+	).run()
+
+	frappe.db.set_value(
+		"Stock Reconciliation",
+		voucher_no,
+		"difference_amount",
+		flt(difference_amount[0][0]) if difference_amount else 0.0,
+		update_modified=False,
+	)
+
+
 def get_previous_sle_of_current_voucher(args, operator="<", exclude_current_voucher=False):
 	"""get stock ledger entries filtered by specific posting datetime conditions"""
 
@@ -2,7 +2,7 @@ import frappe
 from frappe.test_runner import make_test_records
 from frappe.tests.utils import FrappeTestCase
 
-from erpnext.stock.get_item_details import get_item_details
+from erpnext.stock.get_item_details import get_item_details, get_items_details
 
 test_ignore = ["BOM"]
 test_dependencies = ["Customer", "Supplier", "Item", "Price List", "Item Price"]
@@ -34,3 +34,29 @@ class TestGetItemDetail(FrappeTestCase):
 		)
 		details = get_item_details(args)
 		self.assertEqual(details.get("price_list_rate"), 100)
+
+	def test_get_items_details(self):
+		args = {
+			"company": "_Test Company",
+			"customer": "_Test Customer",
+			"currency": "INR",
+			"conversion_rate": 1.0,
+			"price_list": "_Test Price List",
+			"price_list_currency": "INR",
+			"plc_conversion_rate": 1.0,
+			"doctype": "Sales Order",
+			"name": None,
+			"transaction_date": "2024-01-10",
+			"ignore_pricing_rule": 1,
+		}
+		items = [
+			{"item_code": "_Test Item", "qty": 2, "warehouse": "_Test Warehouse - _TC"},
+			{"item_code": "_Test Item Home Desktop 100", "qty": 1},
+			{"item_code": "_Test Item", "qty": 5, "uom": "_Test UOM 1"},
+			{"item_code": "_Test Item 2", "qty": 1},
+		]
+
+		# the rows of the batch get the same details as each row on its own
+		expected = [get_item_details({**args, **item}) for item in items]
+		self.assertEqual(get_items_details(args, items), expected)
+		self.assertEqual(expected[0].price_list_rate, 100)
@@ -4,6 +4,7 @@ import frappe
 from frappe.tests.utils import FrappeTestCase
 
 from erpnext.stock.utils import scan_barcode
+from erpnext.stock.valuation import decode_stock_queue
 
 
 class StockTestMixin:
@@ -32,7 +33,7 @@ class StockTestMixin:
 			for k, v in exp_sle.items():
 				act_value = act_sle[k]
 				if k == "stock_queue":
-					act_value = json.loads(act_value)
+					act_value = decode_stock_queue(act_value)
 					if act_value and act_value[0][0] == 0:
 						# ignore empty fifo bins
 						continue
@@ -8,7 +8,14 @@ from hypothesis import strategies as st
 
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation, round_off_if_near_zero
+from erpnext.stock.valuation import (
+	COMPACT_QUEUE_PREFIX,
+	FIFOValuation,
+	LIFOValuation,
+	decode_stock_queue,
+	encode_stock_queue,
+	round_off_if_near_zero,
+)
 
 qty_gen = st.floats(min_value=-1e6, max_value=1e6)
 value_gen = st.floats(min_value=1, max_value=1e6)
@@ -195,6 +202,39 @@ class TestFIFOValuation(unittest.TestCase):
 			self.assertTotalValue(total_value)
 
 
+class TestStockQueueEncoding(unittest.TestCase):
+	@given(stock_queue_generator)
+	def test_compact_queue_roundtrip(self, stock_queue):
+		stock_queue = [list(stock_bin) for stock_bin in stock_queue]
+
+		encoded_queue = encode_stock_queue(stock_queue, compact=True)
+		self.assertTrue(encoded_queue.startswith(COMPACT_QUEUE_PREFIX))
+		self.assertEqual(decode_stock_queue(encoded_queue), stock_queue)
+
+	def test_json_queue_compatibility(self):
+		self.assertEqual(decode_stock_queue("[[10, 100]]"), [[10, 100]])
+		self.assertEqual(decode_stock_queue(None), [])
+		self.assertEqual(encode_stock_queue([[10, 100]]), "[[10, 100]]")
+		self.assertEqual(encode_stock_queue([], compact=True), "[]")
+
+	def test_fifo_consumption_by_outgoing_rate(self):
+		queue = FIFOValuation(
+			decode_stock_queue(encode_stock_queue([[1, 10], [2, 20], [3, 30]], compact=True))
+		)
+		queue.remove_stock(2, outgoing_rate=20)
+		self.assertEqual(queue, [[1, 10], [3, 30]])
+
+	def test_fifo_queue_carried_over(self):
+		queue = FIFOValuation([[1, 10]])
+		queue.add_stock(2, 20)
+
+		# the queue of the previous entry is used without being copied, and encoded as a list
+		next_queue = FIFOValuation(queue.queue)
+		self.assertIs(next_queue.queue, queue.queue)
+		next_queue.remove_stock(1)
+		self.assertEqual(encode_stock_queue(next_queue.queue), "[[2, 20]]")
+
+
 class TestLIFOValuation(unittest.TestCase):
 	def setUp(self):
 		self.stack = LIFOValuation([])
@@ -341,7 +381,7 @@ class TestLIFOValuationSLE(FrappeTestCase):
 		)
 		sle = frappe.get_doc("Stock Ledger Entry", sle_name)
 
-		stock_queue = json.loads(sle.stock_queue)
+		stock_queue = decode_stock_queue(sle.stock_queue)
 
 		total_qty, total_value = LIFOValuation(stock_queue).get_total_stock_and_value()
 		self.assertEqual(sle.qty_after_transaction, total_qty)
@@ -377,3 +417,19 @@ class TestLIFOValuationSLE(FrappeTestCase):
 
 		out5 = self._make_stock_entry(-5)
 		self.assertStockQueue(out5, [])
+
+	def test_lifo_values_with_compact_stock_queue(self):
+		frappe.db.set_single_value("Stock Settings", "compact_stock_queue", 1)
+		self.addCleanup(frappe.db.set_single_value, "Stock Settings", "compact_stock_queue", 0)
+
+		self._make_stock_entry(1, 1)
+		in2 = self._make_stock_entry(2, 2)
+		self.assertStockQueue(in2, [[1, 1], [2, 2]])
+
+		out1 = self._make_stock_entry(-1)
+		self.assertStockQueue(out1, [[1, 1], [1, 2]])
+		self.assertTrue(
+			frappe.db.get_value(
+				"Stock Ledger Entry", {"voucher_no": out1.name, "is_cancelled": 0}, "stock_queue"
+			).startswith(COMPACT_QUEUE_PREFIX)
+		)
@@ -6,6 +6,7 @@ import json
 
 import frappe
 from frappe import _
+from frappe.query_builder import Criterion
 from frappe.query_builder.functions import CombineDatetime, IfNull, Sum
 from frappe.utils import cstr, flt, get_link_to_form, get_time, getdate, nowdate, nowtime
 
@@ -15,7 +16,7 @@ from erpnext.stock.doctype.serial_and_batch_bundle.serial_and_batch_bundle impor
 )
 from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
 from erpnext.stock.serial_batch_bundle import BatchNoValuation, SerialNoValuation
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation
+from erpnext.stock.valuation import FIFOValuation, LIFOValuation, decode_stock_queue
 
 BarcodeScanResult = dict[str, str | None]
 
@@ -79,6 +80,9 @@ def get_stock_value_on(
 			if frappe.db.get_value("Warehouse", wh, "is_group"):
 				warehouses.update(get_child_warehouses(wh))
 
+		if item_code:
+			return get_item_stock_value_on(item_code, warehouses, posting_date)
+
 		query = query.where(sle.warehouse.isin(warehouses))
 
 	if item_code:
@@ -87,6 +91,36 @@ def get_stock_value_on(
 	return query.run(as_list=True)[0][0]
 
 
+def get_item_stock_value_on(item_code: str, warehouses: set, posting_date: str) -> float:
+	"""Stock value of an item in the warehouses, summing only the entries after their nearest checkpoint."""
+	from erpnext.stock.doctype.stock_ledger_checkpoint.stock_ledger_checkpoint import (
+		get_stock_ledger_checkpoints,
+	)
+
+	checkpoints = get_stock_ledger_checkpoints(item_code, list(warehouses), posting_date, inclusive=True)
+
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	warehouse_conditions = [
+		(sle.warehouse == warehouse) & (sle.posting_date > checkpoint.checkpoint_date)
+		for warehouse, checkpoint in checkpoints.items()
+	]
+	if warehouses_without_checkpoint := [d for d in warehouses if d not in checkpoints]:
+		warehouse_conditions.append(sle.warehouse.isin(warehouses_without_checkpoint))
+
+	value_after_checkpoints = (
+		frappe.qb.from_(sle)
+		.select(IfNull(Sum(sle.stock_value_difference), 0))
+		.where(
+			(sle.item_code == item_code)
+			& (sle.posting_date <= posting_date)
+			& (sle.is_cancelled == 0)
+			& Criterion.any(warehouse_conditions)
+		)
+	).run()[0][0]
+
+	return sum(flt(d.stock_value) for d in checkpoints.values()) + flt(value_after_checkpoints)
+
+
 @frappe.whitelist()
 def get_stock_balance(
 	item_code,
@@ -101,6 +135,9 @@ def get_stock_balance(
 
 	If `with_valuation_rate` is True, will return tuple (qty, rate)"""
 
+	from erpnext.stock.doctype.stock_ledger_checkpoint.stock_ledger_checkpoint import (
+		get_stock_ledger_checkpoint,
+	)
 	from erpnext.stock.stock_ledger import get_previous_sle
 
 	if posting_date is None:
@@ -123,6 +160,9 @@ def get_stock_balance(
 			extra_cond += f" and {field} = %({field})s"
 
 	last_entry = get_previous_sle(args, extra_cond=extra_cond)
+	if not last_entry and not inventory_dimensions_dict:
+		# the balance carried by the checkpoint, if its entries are not found
+		last_entry = get_stock_ledger_checkpoint(item_code, warehouse, posting_date)
 
 	if with_valuation_rate:
 		if with_serial_no:
@@ -298,7 +338,7 @@ def get_incoming_rate(args, raise_error_if_no_rate=True):
 		previous_sle = get_previous_sle(args)
 		if valuation_method in ("FIFO", "LIFO"):
 			if previous_sle:
-				previous_stock_queue = json.loads(previous_sle.get("stock_queue", "[]") or "[]")
+				previous_stock_queue = decode_stock_queue(previous_sle.get("stock_queue"))
 				in_rate = (
 					_get_fifo_lifo_rate(previous_stock_queue, args.get("qty") or 0, valuation_method)
 					if previous_stock_queue
@@ -1,4 +1,10 @@
+import base64
+import json
+import sys
+import zlib
 from abc import ABC, abstractmethod, abstractproperty
+from array import array
+from collections import deque
 from collections.abc import Callable
 from typing import NewType
 
@@ -10,6 +16,9 @@ StockBin = NewType("StockBin", list[float])  # [[qty, rate], ...]
 QTY = 0
 RATE = 1
 
+# Compact queues are stored as little-endian float64 (qty, rate) pairs, zlib compressed and base64 encoded
+COMPACT_QUEUE_PREFIX = "z64:"
+
 
 class BinWiseValuation(ABC):
 	@abstractmethod
@@ -30,7 +39,7 @@ class BinWiseValuation(ABC):
 		total_qty = 0.0
 		total_value = 0.0
 
-		for qty, rate in self.state:
+		for qty, rate in self:
 			total_qty += flt(qty)
 			total_value += flt(qty) * flt(rate)
 
@@ -55,6 +64,7 @@ class FIFOValuation(BinWiseValuation):
 	Qty consumption happens on First In First Out basis.
 
 	Queue is implemented using "bins" of [qty, rate].
+	Bins are kept in a deque, so consuming from the front doesn't shift the whole queue.
 
 	ref: https://en.wikipedia.org/wiki/FIFO_and_LIFO_accounting
 	"""
@@ -63,13 +73,20 @@ class FIFOValuation(BinWiseValuation):
 	# ref: https://docs.python.org/3/reference/datamodel.html#slots
 	__slots__ = ["queue"]
 
-	def __init__(self, state: list[StockBin] | None):
-		self.queue: list[StockBin] = state if state is not None else []
+	def __init__(self, state: list[StockBin] | deque[StockBin] | None):
+		# a deque is used as is, so that the queue is not copied for every entry when it's carried over
+		if isinstance(state, deque):
+			self.queue: deque[StockBin] = state
+		else:
+			self.queue = deque(state) if state is not None else deque()
 
 	@property
 	def state(self) -> list[StockBin]:
 		"""Get current state of queue."""
-		return self.queue
+		return list(self.queue)
+
+	def __iter__(self):
+		return iter(self.queue)
 
 	def add_stock(self, qty: float, rate: float) -> None:
 		"""Update fifo queue with new stock.
@@ -133,7 +150,11 @@ class FIFOValuation(BinWiseValuation):
 			if qty >= fifo_bin[QTY]:
 				# consume current bin
 				qty = round_off_if_near_zero(qty - fifo_bin[QTY])
-				to_consume = self.queue.pop(index)
+				if index == 0:
+					to_consume = self.queue.popleft()
+				else:
+					to_consume = self.queue[index]
+					del self.queue[index]
 				consumed_bins.append(list(to_consume))
 
 				if not self.queue and qty:
@@ -253,3 +274,39 @@ def round_off_if_near_zero(number: float, precision: int = 7) -> float:
 		return 0.0
 
 	return flt(number)
+
+
+def encode_stock_queue(stock_queue: list[StockBin] | deque[StockBin], compact: bool = False) -> str:
+	"""Serialize stock queue for Stock Ledger Entry.
+
+	args:
+	        stock_queue: bins of [qty, rate]
+	        compact: store bins as packed float64 pairs instead of JSON.
+	"""
+	if not compact or not stock_queue:
+		return json.dumps(list(stock_queue))
+
+	values = array("d", (flt(value) for stock_bin in stock_queue for value in stock_bin))
+	if sys.byteorder == "big":
+		values.byteswap()
+
+	return COMPACT_QUEUE_PREFIX + base64.b64encode(zlib.compress(values.tobytes(), 1)).decode()
+
+
+def decode_stock_queue(value: str | list | None) -> list[StockBin]:
+	"""Deserialize stock queue stored in either JSON or compact format."""
+	if not value:
+		return []
+
+	if isinstance(value, list):
+		return value
+
+	if not value.startswith(COMPACT_QUEUE_PREFIX):
+		return json.loads(value)
+
+	values = array("d")
+	values.frombytes(zlib.decompress(base64.b64decode(value[len(COMPACT_QUEUE_PREFIX) :])))
+	if sys.byteorder == "big":
+		values.byteswap()
+
+	return [[values[idx], values[idx + 1]] for idx in range(0, len(values), 2)]
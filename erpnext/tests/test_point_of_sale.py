@@ -7,6 +7,7 @@ import frappe
 
 from erpnext.accounts.doctype.pos_profile.test_pos_profile import make_pos_profile
 from erpnext.selling.page.point_of_sale.point_of_sale import get_items
+from erpnext.selling.page.point_of_sale.pos_catalog import get_catalog, get_catalog_changes
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
 
@@ -61,3 +62,52 @@ class TestPointOfSale(unittest.TestCase):
 
 		self.assertEqual(len(filtered_items), 1)
 		self.assertEqual(filtered_items[0]["item_code"], item2.item_code)
+
+	def test_item_catalog(self):
+		pos_profile = make_pos_profile(name="Test POS Profile for Catalog")
+		item = make_item("Test Catalog Stock Item", {"is_stock_item": 1})
+		make_stock_entry(
+			item_code=item.name,
+			qty=10,
+			to_warehouse="_Test Warehouse - _TC",
+			rate=500,
+		)
+		item_price = frappe.get_doc(
+			{
+				"doctype": "Item Price",
+				"item_code": item.name,
+				"price_list": "_Test Price List",
+				"price_list_rate": 100,
+			}
+		).insert()
+
+		def get_rows(items):
+			return [d for d in items if d["item_code"] == item.name]
+
+		catalog = get_catalog(pos_profile.name, "_Test Price List")
+		rows = get_rows(catalog["items"])
+		self.assertEqual(len(rows), 1)
+		self.assertEqual(rows[0]["actual_qty"], 10)
+		self.assertEqual(rows[0]["price_list_rate"], 100)
+		self.assertIn(rows[0]["item_group"], catalog["item_groups"][item.item_group])
+
+		# only the rows of the changed items are sent
+		make_stock_entry(
+			item_code=item.name,
+			qty=5,
+			to_warehouse="_Test Warehouse - _TC",
+			rate=500,
+		)
+		item_price.db_set("price_list_rate", 120, update_modified=True)
+
+		changes = get_catalog_changes(pos_profile.name, "_Test Price List", catalog["version"])
+		self.assertIn(item.name, changes["item_codes"])
+		rows = get_rows(changes["items"])
+		self.assertEqual(rows[0]["actual_qty"], 15)
+		self.assertEqual(rows[0]["price_list_rate"], 120)
+
+		# the cached catalog is brought up to date
+		rows = get_rows(get_catalog(pos_profile.name, "_Test Price List")["items"])
+		self.assertEqual(len(rows), 1)
+		self.assertEqual(rows[0]["actual_qty"], 15)
+		self.assertEqual(rows[0]["price_list_rate"], 120)